@@ -0,0 +1,96 @@
+"""
+Compare the semantic analysis of a script made of functions, after a one-line edit in one of them,
+without and with a DrawScriptAnalysisCache filled by the analysis of the script before the edit,
+like two runs in the editor.
+
+Run from the root of the project:
+    python -m Benchmarks.analysisCacheBenchmark [size of the script in characters]
+"""
+import gc
+import sys
+
+from Benchmarks.benchmarkUtils import SCRIPT_LINES, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
+from DrawScript.Core.drawScriptAnalysisCache import DrawScriptAnalysisCache
+
+# Number of lines of SCRIPT_LINES in each function
+FUNCTION_LINES = 30
+
+# Edits made in a function in the middle of the script: (name, text searched, replacement)
+EDITS = [
+    ("change a number", "drawCircle(x{i}, ", "drawCircle(x{i} + 1, "),
+    ("change a type", "var scale = 2;", "var scale = 2.5;"),
+]
+
+
+def generate_functions(size: int) -> str:
+    """
+    Generate a DrawScript of about 'size' characters, the lines of SCRIPT_LINES in functions
+    that use a variable of the script
+    """
+    functions = ["var scale = 2;"]
+    length = 0
+    i = 0
+    while length < size:
+        body = [f"var base{i} = scale * {i};"]
+        for _ in range(FUNCTION_LINES):
+            body.append(SCRIPT_LINES[i % len(SCRIPT_LINES)].format(i=i // len(SCRIPT_LINES)))
+            i += 1
+        function = f"function f{len(functions)}() {{\n" + '\n'.join(body) + "\n}"
+        functions.append(function)
+        length += len(function) + 1
+    return '\n'.join(functions) + '\n'
+
+
+def analyze(ast_nodes, code, cache=None):
+    """
+    Returns the errors of the semantic analysis, with the cache when one is given
+    """
+    return SemanticAnalyzer(cache, code).analyze(ast_nodes)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    code = generate_functions(size)
+    tokenizer = DrawScriptTokenizer()
+    token_document = tokenizer.tokenize_document(code)
+    # Index of the lines in the function in the middle of the script (see SCRIPT_LINES)
+    middle = code.count("function ") * FUNCTION_LINES // 2 // len(SCRIPT_LINES)
+
+    document = DrawScriptParser(token_document.tokens).parse_document()
+    assert not document.errors and not analyze(document.nodes, code)
+    print(f"Script: {len(code)} characters, {len(document.nodes)} functions")
+    print(f"{'':<18}{'no cache':>12}{'cache':>12}{'speedup':>10}{'reused':>10}")
+
+    for name, search, replacement in EDITS:
+        search, replacement = search.format(i=middle), replacement.format(i=middle)
+        position = code.index(search)
+        edited = code[:position] + replacement + code[position + len(search):]
+        edited_tokens = tokenizer.update_document(token_document, edited).tokens
+
+        full_time = cached_time = float('inf')
+        for _ in range(3):
+            # The reused nodes are moved in place, so each run starts from a fresh document and cache
+            cache = DrawScriptAnalysisCache()
+            previous = DrawScriptParser(token_document.tokens).parse_document()
+            analyze(previous.nodes, code, cache)
+            hits = cache.hits
+            updated = DrawScriptParser(edited_tokens).update_document(previous)
+
+            gc.collect()
+            run_time, cached_errors = measure(lambda: analyze(updated.nodes, edited, cache), repeat=1)
+            cached_time = min(cached_time, run_time)
+            reused = cache.hits - hits
+            run_time, full_errors = measure(lambda: analyze(updated.nodes, edited), repeat=1)
+            full_time = min(full_time, run_time)
+            assert cached_errors == full_errors
+
+        print(f"{name:<18}{full_time:>11.3f}s{cached_time:>11.3f}s{full_time / cached_time:>9.1f}x"
+              f"{reused:>7}/{len(updated.nodes) - 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare a run of the front end of the compiler (tokenizer, parser and semantic analysis)
+with the same script loaded back from DrawScriptAstCache, like when Run is pressed again on an unchanged script.
+
+Run from the root of the project:
+    python -m Benchmarks.astCacheBenchmark [size of the script in characters]
+"""
+import sys
+import tempfile
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
+from DrawScript.Core.drawScriptAstCache import DrawScriptAstCache
+
+
+def front_end(code: str) -> tuple:
+    """
+    Returns (ast_nodes, parse_errors, semantic_errors) of 'code', without the cache
+    """
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+    ast_nodes, parse_errors = DrawScriptParser(tokens).parse()
+    semantic_errors = [] if parse_errors else SemanticAnalyzer().analyze(ast_nodes)
+    return ast_nodes, parse_errors, semantic_errors
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    code = generate_script(size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DrawScriptAstCache(directory)
+        parse_time, result = measure(front_end, code, repeat=3)
+        store_time, _ = measure(cache.store, code, *result, repeat=1)
+        load_time, cached = measure(cache.load, code, repeat=3)
+        assert cached == result
+        entry_size = cache.size()
+
+    print(f"Script: {len(code)} characters, {len(result[0])} statements, cache entry {entry_size / 1e6:.1f}MB")
+    print(f"{'tokenize + parse + analyze':<28}{parse_time:>9.3f}s")
+    print(f"{'store in the cache':<28}{store_time:>9.3f}s")
+    print(f"{'load from the cache':<28}{load_time:>9.3f}s")
+    print(f"speedup: {parse_time / load_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Compare the slotted AST nodes of DrawScript.Core.drawScriptAst with the dictionaries the parser used to build:
+the memory taken by the AST, and the time of the same analyzer walk on both.
+LegacySemanticAnalyzer, the walk of SemanticAnalyzer before the node classes, is run on the dictionaries
+and on the nodes (which read like them), then TableSemanticAnalyzer does the same checks on the nodes
+the way SemanticAnalyzer reads them: attributes, and dispatch tables on the node kind instead of
+the if/elif chain on "node_type". The current SemanticAnalyzer does much more (scopes, types...),
+it would not compare the nodes.
+
+Run from the root of the project:
+    python -m Benchmarks.astNodeBenchmark [number of statements]
+"""
+import sys
+import tracemalloc
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptAst import (
+    VAR_DECLARATION, CURSOR_DECLARATION, IF_STATEMENT, FOR_STATEMENT, WHILE_STATEMENT, DO_WHILE_STATEMENT,
+    EXPRESSION_STATEMENT, EMPTY_STATEMENT, BINARY_OP, UNARY_OP, IDENTIFIER, CALL_EXPR, NODE_TYPES,
+    to_dict, from_dict,
+)
+from DrawScript.Core.globals import GLOBAL_SYMBOLS_FUNCTIONS, GLOBAL_SYMBOLS_VARIABLES
+
+
+class LegacySemanticAnalyzer:
+    """
+    The walk of SemanticAnalyzer before the node classes, on the AST as dictionaries
+    (or on the nodes, read like dictionaries). Only used to compare the traversal speed
+    """
+
+    def __init__(self):
+        self.symbols = {}
+        self.errors = []
+
+    def analyze(self, ast_nodes):
+        for node in ast_nodes:
+            self.analyze_statement(node)
+        return self.errors
+
+    def analyze_statement(self, node):
+        node_type = node["node_type"]
+        if node_type == "var_declaration":
+            if node["name"] in self.symbols:
+                self.errors.append(f"Line {node['line']}: Variable '{node['name']}' already declared.")
+            else:
+                self.symbols[node["name"]] = "number"
+        elif node_type == "cursor_declaration":
+            self.symbols[node["name"]] = "cursor"
+        elif node_type == "if_statement":
+            self.analyze_expression(node["condition"])
+            self.analyze_block(node["then_block"])
+            if node["else_block"] is not None:
+                self.analyze_block(node["else_block"])
+        elif node_type in ("for_statement", "while_statement", "do_while_statement"):
+            if node.get("init") is not None:
+                self.analyze_statement(node["init"])
+            if node["condition"] is not None:
+                self.analyze_expression(node["condition"])
+            if node.get("increment") is not None:
+                self.analyze_expression(node["increment"])
+            self.analyze_block(node["body"])
+        elif node_type == "expression_statement":
+            self.analyze_expression(node["expression"])
+        elif node_type != "empty_statement":
+            self.errors.append(f"Unknown statement: {node_type}")
+
+    def analyze_block(self, block_node):
+        for stmt in block_node["statements"]:
+            self.analyze_statement(stmt)
+
+    def analyze_expression(self, expr):
+        node_type = expr["node_type"]
+        if node_type == "binary_op":
+            self.analyze_expression(expr["left"])
+            self.analyze_expression(expr["right"])
+        elif node_type == "unary_op":
+            self.analyze_expression(expr["expr"])
+        elif node_type == "identifier":
+            if expr["value"] not in self.symbols and expr["value"] not in GLOBAL_SYMBOLS_VARIABLES:
+                self.errors.append("Undeclared variable: " + expr["value"])
+        elif node_type in ("number", "string", "bool_literal"):
+            pass
+        elif node_type == "call_expr":
+            if expr["callee"] in GLOBAL_SYMBOLS_FUNCTIONS:
+                expected_args = GLOBAL_SYMBOLS_FUNCTIONS[expr["callee"]]
+                if len(expr["arguments"]) != expected_args:
+                    self.errors.append(
+                        f"Function '{expr['callee']}' expects {expected_args} argument(s), received {len(expr['arguments'])}."
+                    )
+            for arg in expr["arguments"]:
+                self.analyze_expression(arg)
+
+
+class TableSemanticAnalyzer(LegacySemanticAnalyzer):
+    """
+    The same walk and checks as LegacySemanticAnalyzer, written like SemanticAnalyzer:
+    the fields are read as attributes and the visitor is found in a table indexed by the kind of the node.
+    Only works on the nodes
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.statement_visitors = [self.analyze_unknown] * len(NODE_TYPES)
+        self.statement_visitors[VAR_DECLARATION] = self.analyze_var_declaration
+        self.statement_visitors[CURSOR_DECLARATION] = self.analyze_cursor_declaration
+        self.statement_visitors[IF_STATEMENT] = self.analyze_if_statement
+        self.statement_visitors[FOR_STATEMENT] = self.analyze_for_statement
+        self.statement_visitors[WHILE_STATEMENT] = self.analyze_while_statement
+        self.statement_visitors[DO_WHILE_STATEMENT] = self.analyze_while_statement
+        self.statement_visitors[EXPRESSION_STATEMENT] = self.analyze_expression_statement
+        self.statement_visitors[EMPTY_STATEMENT] = self.analyze_nothing
+        # The literals and the other expressions are not checked
+        self.expression_visitors = [self.analyze_nothing] * len(NODE_TYPES)
+        self.expression_visitors[BINARY_OP] = self.analyze_binary_op
+        self.expression_visitors[UNARY_OP] = self.analyze_unary_op
+        self.expression_visitors[IDENTIFIER] = self.analyze_identifier
+        self.expression_visitors[CALL_EXPR] = self.analyze_call_expr
+
+    def analyze_statement(self, node):
+        self.statement_visitors[node.kind](node)
+
+    def analyze_expression(self, expr):
+        self.expression_visitors[expr.kind](expr)
+
+    def analyze_block(self, block_node):
+        for stmt in block_node.statements:
+            self.statement_visitors[stmt.kind](stmt)
+
+    def analyze_nothing(self, node):
+        pass
+
+    def analyze_unknown(self, node):
+        self.errors.append(f"Unknown statement: {node.node_type}")
+
+    def analyze_var_declaration(self, node):
+        if node.name in self.symbols:
+            self.errors.append(f"Line {node.line}: Variable '{node.name}' already declared.")
+        else:
+            self.symbols[node.name] = "number"
+
+    def analyze_cursor_declaration(self, node):
+        self.symbols[node.name] = "cursor"
+
+    def analyze_if_statement(self, node):
+        self.analyze_expression(node.condition)
+        self.analyze_block(node.then_block)
+        if node.else_block is not None:
+            self.analyze_block(node.else_block)
+
+    def analyze_for_statement(self, node):
+        if node.init is not None:
+            self.analyze_statement(node.init)
+        if node.condition is not None:
+            self.analyze_expression(node.condition)
+        if node.increment is not None:
+            self.analyze_expression(node.increment)
+        self.analyze_block(node.body)
+
+    def analyze_while_statement(self, node):
+        self.analyze_expression(node.condition)
+        self.analyze_block(node.body)
+
+    def analyze_expression_statement(self, node):
+        self.analyze_expression(node.expression)
+
+    def analyze_binary_op(self, expr):
+        self.analyze_expression(expr.left)
+        self.analyze_expression(expr.right)
+
+    def analyze_unary_op(self, expr):
+        self.analyze_expression(expr.expr)
+
+    def analyze_identifier(self, expr):
+        if expr.value not in self.symbols and expr.value not in GLOBAL_SYMBOLS_VARIABLES:
+            self.errors.append("Undeclared variable: " + expr.value)
+
+    def analyze_call_expr(self, expr):
+        arguments = expr.arguments
+        if expr.callee in GLOBAL_SYMBOLS_FUNCTIONS:
+            expected_args = GLOBAL_SYMBOLS_FUNCTIONS[expr.callee]
+            if len(arguments) != expected_args:
+                self.errors.append(
+                    f"Function '{expr.callee}' expects {expected_args} argument(s), received {len(arguments)}."
+                )
+        for arg in arguments:
+            self.analyze_expression(arg)
+
+
+def retained_memory(function, *args):
+    """
+    Returns the memory (in bytes) still allocated by the result of 'function'
+    """
+    tracemalloc.start()
+    result = function(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    code = generate_script(count * 60)
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+    nodes, _ = DrawScriptParser(tokens).parse()
+    nodes = nodes[:count]
+    dicts = to_dict(nodes)
+
+    node_memory = retained_memory(from_dict, dicts)
+    dict_memory = retained_memory(to_dict, nodes)
+
+    # The same walk on both, then the same checks with the attributes and the dispatch tables
+    dict_time, dict_errors = measure(lambda: LegacySemanticAnalyzer().analyze(dicts), repeat=5)
+    node_time, node_errors = measure(lambda: LegacySemanticAnalyzer().analyze(nodes), repeat=5)
+    table_time, table_errors = measure(lambda: TableSemanticAnalyzer().analyze(nodes), repeat=5)
+    assert dict_errors == node_errors == table_errors
+
+    print(f"Script: {len(nodes)} statements")
+    print(f"{'':<30}{'memory':>12}{'analyze':>12}{'statements/s':>16}")
+    for name, memory, analyze_time in (
+        ("dict nodes", dict_memory, dict_time),
+        ("slotted nodes, same walk", node_memory, node_time),
+        ("slotted nodes, dispatch tables", node_memory, table_time),
+    ):
+        print(f"{name:<30}{memory / 1e6:>10.1f}MB{analyze_time:>11.3f}s{len(nodes) / analyze_time:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
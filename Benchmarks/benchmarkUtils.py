@@ -0,0 +1,57 @@
+import contextlib
+import io
+import time
+
+# Statements used to build the generated scripts, like the ones produced by our batch jobs
+SCRIPT_LINES = [
+    'var x{i} = {i} * 2 + CANVAS_WIDTH / 4;',
+    'drawCircle(x{i}, {i} % 300, 25);',
+    'drawSegment(0, {i} % 500, x{i}, 42.5);',
+    'if (x{i} > 100 && x{i} < 700) {{ drawPoint(x{i}, 10); }}',
+    '/* generated\n   block {i} */',
+    'drawRectangle(x{i} - 10, 20, 30, 40); // shape {i}',
+]
+
+
+def generate_script(size: int) -> str:
+    """
+    Generate a DrawScript of about 'size' characters
+
+    Parameters
+    -----------
+    size : int
+        The number of characters wanted
+
+    Returns
+    -----------
+    str
+        The generated script
+    """
+    lines = []
+    length = 0
+    i = 0
+    while length < size:
+        line = SCRIPT_LINES[i % len(SCRIPT_LINES)].format(i=i // len(SCRIPT_LINES))
+        lines.append(line)
+        length += len(line) + 1
+        i += 1
+    return '\n'.join(lines) + '\n'
+
+
+def measure(function, *args, repeat: int = 3):
+    """
+    Run 'function' 'repeat' times, silencing what it prints
+
+    Returns
+    -----------
+    tuple
+        (best time in seconds, result of the last run)
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function(*args)
+            best = min(best, time.perf_counter() - start)
+    return best, result
@@ -0,0 +1,115 @@
+"""
+Compare the build of the C code of a generated script with the same build found in DrawScriptBuildCache,
+like when Run is pressed again on an unchanged script, or after the canvas was only cleared.
+
+The sources are compiled without being linked (gcc -c), the link needs the Windows libraries of DrawLibrary/C/SDL2.
+
+Run from the root of the project:
+    python -m Benchmarks.buildCacheBenchmark [size of the script in characters]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
+from DrawScript.Core.drawScriptDeserializerC import DrawScriptDeserializerC
+from DrawScript.Core.drawScriptBuildCache import DrawScriptBuildCache
+
+# The sources compiled by the editor, besides main.c
+LIBRARY_SOURCES = [
+    "DrawLibrary/C/Utils/shapes.c",
+    "DrawLibrary/C/Utils/cursor.c",
+    "DrawLibrary/C/Utils/utils.c",
+    "DrawLibrary/C/Utils/output.c",
+    "DrawLibrary/C/SDL2_gfx/SDL2_gfxPrimitives.c",
+    "DrawLibrary/C/SDL2_gfx/SDL2_rotozoom.c",
+]
+
+
+def write_main(code: str, directory: str) -> None:
+    """
+    Write main.c and globals.h of 'code' in 'directory', a copy of the C sources of the project
+    """
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+    ast_nodes, parse_errors = DrawScriptParser(tokens).parse()
+    assert not parse_errors and not SemanticAnalyzer().analyze(ast_nodes)
+    current_directory = os.getcwd()
+    os.chdir(directory)
+    try:
+        DrawScriptDeserializerC(ast_nodes).write_c()
+    finally:
+        os.chdir(current_directory)
+
+
+def build(directory: str, sources: list) -> None:
+    """
+    Compile each source to an object file, main.o is the one kept by the cache
+    """
+    for source in sources:
+        subprocess.run([
+            "gcc", "-c",
+            f"-I{directory}/DrawLibrary/C/SDL2/src/include",
+            f"-I{directory}/DrawLibrary/C/SDL2_gfx",
+            f"-I{directory}/DrawLibrary/C/Utils",
+            source,
+            f"-o{directory}/{os.path.splitext(os.path.basename(source))[0]}.o",
+        ], check=True)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    if shutil.which("gcc") is None:
+        print("gcc is needed for this benchmark")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for folder in ("DrawLibrary/C/Utils", "DrawLibrary/C/SDL2_gfx", "DrawLibrary/C/SDL2/src/include"):
+            shutil.copytree(folder, f"{directory}/{folder}")
+        shutil.copy("body.c", directory)
+        write_main(generate_script(size), directory)
+
+        sources = [f"{directory}/{source}" for source in (*LIBRARY_SOURCES, "main.c")]
+        command = [
+            "gcc",
+            f"-I{directory}/DrawLibrary/C/SDL2/src/include",
+            f"-I{directory}/DrawLibrary/C/SDL2_gfx",
+            f"-I{directory}/DrawLibrary/C/Utils",
+            *sources,
+        ]
+        executable = f"{directory}/main.o"
+        cache = DrawScriptBuildCache(f"{directory}/Cache")
+
+        key_time, key = measure(cache.key, command, repeat=1)
+        warm_key_time, _ = measure(cache.key, command, repeat=3)
+        build_time, _ = measure(build, directory, sources, repeat=3)
+        assert not cache.load(key, executable)
+        cache.store(key, executable, build_time)
+
+        # Run again: the executable is already the one of the key
+        hit_time, hit = measure(lambda: cache.load(cache.key(command), executable), repeat=3)
+        assert hit
+
+        # Another script was built in between: the executable is copied back from the cache
+        os.utime(executable, ns=(0, 0))
+        start = time.perf_counter()
+        assert cache.load(cache.key(command), executable)
+        copy_time = time.perf_counter() - start
+
+    print(f"Script: {size} characters, {len(sources)} sources, {len(cache.digests)} files hashed")
+    print(f"key, first run            {key_time:>9.3f}s")
+    print(f"key, files unchanged      {warm_key_time:>9.3f}s")
+    print(f"gcc -c of the sources     {build_time:>9.3f}s")
+    print(f"hit, same executable      {hit_time:>9.3f}s")
+    print(f"hit, executable copied    {copy_time:>9.3f}s")
+    print(f"Build cache: {cache.report()}")
+
+
+if __name__ == "__main__":
+    main()
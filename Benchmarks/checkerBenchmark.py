@@ -0,0 +1,46 @@
+"""
+Measure drawScriptChecker.check_files on many small scripts, like the ones linted in the CI,
+in this process and in a pool of processes.
+
+Run from the root of the project:
+    python -m Benchmarks.checkerBenchmark [number of scripts] [size of each script in characters]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from Benchmarks.benchmarkUtils import generate_script
+
+from DrawScript.Core.drawScriptChecker import PHASES, check_files, total_times
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    workers = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"script{i}.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(generate_script(size))
+            paths.append(path)
+
+        print(f"{count} scripts of {size} characters, {workers} CPU(s)")
+        print(f"{'':<14}{'wall time':>11}{'files/s':>10}  " + "".join(f"{phase:>10}" for phase in PHASES))
+        # At least 2 processes, so the pool is measured on a machine with one CPU too
+        for jobs in (1, max(2, workers)):
+            name = "1 process" if jobs == 1 else f"{jobs} processes"
+            start = time.perf_counter()
+            results = check_files(paths, workers=jobs)
+            wall_time = time.perf_counter() - start
+            assert all(result.ok for result in results)
+            totals = total_times(results)
+            print(f"{name:<14}{wall_time:>10.3f}s{count / wall_time:>10.0f}  "
+                  + "".join(f"{totals[phase]:>9.3f}s" for phase in PHASES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Time the parsing of broken scripts, where most of the work is the error recovery,
+with all the errors collected (max_errors=None) and with the default limit MAX_PARSE_ERRORS.
+
+Run from the root of the project:
+    python -m Benchmarks.errorRecoveryBenchmark [size of the scripts in characters]
+"""
+import sys
+
+from Benchmarks.benchmarkUtils import measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+
+# Broken scripts, each one is a piece of code repeated up to the size wanted
+BROKEN_SCRIPTS = [
+    ("stray braces", "} "),
+    ("invalid declarations", "var = 3; "),
+    ("if without braces", "if (x) drawPoint(1, 2); "),
+    ("missing operands", "drawCircle(1, , 3); x = * 2; "),
+]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tokenizer = DrawScriptTokenizer()
+
+    print(f"Scripts of {size} characters")
+    print(f"{'':<22}{'tokens':>10}{'all errors':>22}{'limited':>22}")
+    for name, piece in BROKEN_SCRIPTS:
+        tokens, _ = tokenizer.tokenize(piece * (size // len(piece)))
+        full_time, (_, full_errors) = measure(lambda: DrawScriptParser(tokens, max_errors=None).parse(), repeat=3)
+        limited_time, (_, limited_errors) = measure(lambda: DrawScriptParser(tokens).parse(), repeat=3)
+        print(
+            f"{name:<22}{len(tokens):>10}"
+            f"{full_time:>9.3f}s ({len(full_errors):>7} err)"
+            f"{limited_time:>9.3f}s ({len(limited_errors):>7} err)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare the recursive expression parser of DrawScriptParser (one function per level of precedence)
+with the Pratt expression parser (DrawScriptParser(tokens, pratt=True)) on deeply nested arithmetic.
+
+Run from the root of the project:
+    python -m Benchmarks.expressionParserBenchmark [number of statements] [depth]
+"""
+import sys
+
+from Benchmarks.benchmarkUtils import measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+
+OPERATORS = ['+', '*', '-', '/', '%', '<', '==', '&&', '||', '>=']
+
+
+def nested_expression(depth: int, i: int) -> str:
+    """
+    Returns an arithmetic expression with 'depth' levels of parentheses
+    """
+    expression = f"x{i}"
+    for level in range(depth):
+        op = OPERATORS[(i + level) % len(OPERATORS)]
+        other = OPERATORS[(i + level + 3) % len(OPERATORS)]
+        expression = f"({level} {op} {expression} {other} -{level + 1}.5)"
+    return expression
+
+
+def generate_expressions(count: int, depth: int) -> str:
+    """
+    Generate a DrawScript of 'count' variable declarations, each one holding a nested expression
+    """
+    return '\n'.join(f"var e{i} = {nested_expression(depth, i)} * 2 + 1;" for i in range(count)) + '\n'
+
+
+def count_nodes(node) -> int:
+    """
+    Returns the number of AST nodes in 'node' (a node or a list of nodes)
+    """
+    if isinstance(node, list):
+        return sum(count_nodes(child) for child in node)
+    return 1 + sum(count_nodes(child) for child in node.children())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    code = generate_expressions(count, depth)
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+
+    recursive_time, recursive_result = measure(lambda: DrawScriptParser(tokens).parse(), repeat=5)
+    pratt_time, pratt_result = measure(lambda: DrawScriptParser(tokens, pratt=True).parse(), repeat=5)
+    assert pratt_result == recursive_result
+
+    nodes = count_nodes(recursive_result[0])
+    print(f"Script: {count} statements, depth {depth}, {len(tokens)} tokens, {nodes} nodes")
+    print(f"{'':<12}{'parse':>10}{'nodes/s':>14}")
+    for name, parse_time in (("recursive", recursive_time), ("pratt", pratt_time)):
+        print(f"{name:<12}{parse_time:>9.3f}s{nodes / parse_time:>14.0f}")
+    print(f"speedup: {recursive_time / pratt_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare a full parse with DrawScriptParser.update_document after a small edit in the middle of a script,
+like the ones made in the editor between two runs.
+
+Run from the root of the project:
+    python -m Benchmarks.incrementalParserBenchmark [size of the script in characters]
+"""
+import gc
+import sys
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptAst import to_dict
+
+# Edits made in the middle of the script: (name, text searched, replacement)
+EDITS = [
+    ("change a number", "drawCircle(x{i}, ", "drawCircle(x{i} + 1, "),
+    ("add a line", "drawSegment(0, {i} % 500", "drawPoint(1, 2);\ndrawSegment(0, {i} % 500"),
+    ("remove a brace", "{{ drawPoint(x{i}", "drawPoint(x{i}"),
+]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    code = generate_script(size)
+    tokenizer = DrawScriptTokenizer()
+    token_document = tokenizer.tokenize_document(code)
+    middle = code.count('\n') // 12  # Index of the lines near the middle of the script (see SCRIPT_LINES)
+
+    statements = len(DrawScriptParser(token_document.tokens).parse_document().nodes)
+    print(f"Script: {len(code)} characters, {len(token_document.tokens)} tokens, {statements} statements")
+    print(f"{'':<18}{'full parse':>12}{'incremental':>14}{'speedup':>10}")
+
+    for name, search, replacement in EDITS:
+        search, replacement = search.format(i=middle), replacement.format(i=middle)
+        position = code.index(search)
+        edited = code[:position] + replacement + code[position + len(search):]
+        edited_tokens = tokenizer.update_document(token_document, edited).tokens
+
+        gc.collect()
+        full_time, (full_nodes, full_errors) = measure(lambda: DrawScriptParser(edited_tokens).parse(), repeat=3)
+        # The reused nodes are moved in place, so each run starts from a fresh document
+        incremental_time = float('inf')
+        for _ in range(3):
+            updated = None
+            previous = DrawScriptParser(token_document.tokens).parse_document()
+            gc.collect()
+            run_time, updated = measure(lambda: DrawScriptParser(edited_tokens).update_document(previous), repeat=1)
+            incremental_time = min(incremental_time, run_time)
+        assert to_dict(updated.nodes) == to_dict(full_nodes) and updated.errors == full_errors
+
+        print(f"{name:<18}{full_time:>11.3f}s{incremental_time:>13.3f}s{full_time / incremental_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
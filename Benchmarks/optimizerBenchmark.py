@@ -0,0 +1,158 @@
+"""
+Measure what DrawScriptOptimizer removes from a generated script, where some drawings are in dead branches
+or out of the canvas, and some are in small for loops it unrolls (within UNROLL_BUDGET),
+and what it changes in the C code written by DrawScriptDeserializerC.
+When gcc is there, it also checks that the C code draws the same shapes, with the same colors, with and without
+the optimizer: the code of a smaller script is compiled against drawing functions that print their arguments.
+
+Run from the root of the project:
+    python -m Benchmarks.optimizerBenchmark [size of the script in characters]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
+from DrawScript.Core.drawScriptOptimizer import DrawScriptOptimizer, shape_bounds
+from DrawScript.Core.drawScriptBuiltins import BUILTINS, DRAW
+from DrawScript.Core.drawScriptDeserializerC import DrawScriptDeserializerC
+
+# Lines added between the lines of generate_script, like the debug code left in the scripts
+EXTRA_LINES = [
+    'if (false) {{ drawCircle({i}, {i}, 5); }}',
+    'drawRectangle(CANVAS_WIDTH + {i}, 10, 20, 20);',
+    'drawCircle(CANVAS_WIDTH / 2 + {i} % 100, CANVAS_HEIGHT / 2, 10 * 3);',
+    'for (var j = 0; j < 8; j = j + 1) {{ drawCircle(j * 120 + {i} % 7, 40, 10); }}',
+    'if (false) {{ setRGBA({c}, 0, 0, 255); }}',
+    'for (var j = 0; j < 3; j = j + 1) {{ if (j == 1) {{ setRGBA(0, {c}, 0, 255); }} drawCircle(j * 50, 300, 5); }}',
+    'for (var j = 0; j < 3; j = j + 1) {{ drawCircle(j * 50, 400, 5); setRGBA(0, 0, {c}, 255); }}',
+]
+
+# Size of the script whose C code is compiled to compare the shapes drawn
+CHECK_SIZE = 20_000
+
+
+def build_script(size):
+    """
+    Returns a generated script of about 'size' characters with the EXTRA_LINES between its lines
+    """
+    lines = generate_script(size // 2).split('\n')
+    extra = [EXTRA_LINES[i % len(EXTRA_LINES)].format(i=i, c=i % 256) for i in range(len(lines))]
+    return '\n'.join(line for pair in zip(lines, extra) for line in pair)
+
+
+def front_end(code):
+    """
+    Returns the analyzed statements of 'code'
+    """
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+    ast_nodes, parse_errors = DrawScriptParser(tokens).parse()
+    assert not parse_errors and not SemanticAnalyzer().analyze(ast_nodes)
+    return ast_nodes
+
+
+def emit(ast_nodes):
+    """
+    Returns the C code of the statements, without writing main.c
+    """
+    deserializer = DrawScriptDeserializerC(ast_nodes)
+    return ''.join(deserializer.deserialize_node_type(node) for node in ast_nodes)
+
+
+def optimize(ast_nodes, width, height):
+    """
+    Returns the optimizer and the optimized statements
+    """
+    optimizer = DrawScriptOptimizer(width, height)
+    return optimizer, optimizer.optimize(ast_nodes)
+
+
+def drawn_shapes(c_code, width, height):
+    """
+    Returns the shapes drawn by 'c_code' (statements written by emit), in order, as (function, arguments and color).
+    The code is compiled with gcc against drawing functions that print their arguments,
+    the shapes fully out of the canvas are left out since the optimizer removes them
+    """
+    stubs = []
+    for builtin in BUILTINS:
+        if builtin.emit != DRAW or builtin.c_symbol is None:
+            continue
+        # The arguments, the c_args then the color
+        count = builtin.arity + len(builtin.c_args) + 4
+        params = ", ".join(f"int a{i}" for i in range(count))
+        formats = " ".join(["%d"] * count)
+        values = ", ".join(f"a{i}" for i in range(count))
+        stubs.append(
+            f'static void {builtin.c_symbol}(SDL_Renderer *renderer, {params}) '
+            f'{{ printf("{builtin.name} {formats}\\n", {values}); }}\n'
+        )
+    source = (
+        '#include <stdio.h>\n#include <stdbool.h>\n#include <math.h>\n'
+        'typedef struct SDL_Renderer SDL_Renderer;\n'
+        f'#define SCREEN_WIDTH {width}\n#define SCREEN_HEIGHT {height}\n'
+        'static void Output_Position(int x, int y) {}\n'
+        + ''.join(stubs) +
+        f'int main(void) {{\nSDL_Renderer *renderer = NULL;\n{c_code}return 0;\n}}\n'
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        subprocess.run(["gcc", "-x", "c", "-", "-o", os.path.join(directory, "shapes")],
+                       input=source, text=True, check=True)
+        output = subprocess.run([os.path.join(directory, "shapes")], capture_output=True, text=True, check=True).stdout
+
+    shapes = []
+    for line in output.splitlines():
+        name, *values = line.split()
+        values = [int(value) for value in values]
+        bounds = shape_bounds(name, values)
+        if bounds is not None:
+            x0, y0, x1, y1 = bounds
+            if x1 < 0 or y1 < 0 or x0 >= width or y0 >= height:
+                continue
+        shapes.append((name, *values))
+    return shapes
+
+
+def same_shapes(width, height):
+    """
+    Returns True if the C code of a script of CHECK_SIZE characters draws the same shapes with and without the optimizer
+    """
+    ast_nodes = front_end(build_script(CHECK_SIZE))
+    _, optimized = optimize(ast_nodes, width, height)
+    return drawn_shapes(emit(ast_nodes), width, height) == drawn_shapes(emit(optimized), width, height)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    code = build_script(size)
+    ast_nodes = front_end(code)
+
+    width, height = DrawScriptDeserializerC.canvas_size()
+    # A new optimizer for each run, it adds up what it removed
+    optimize_time, (optimizer, optimized) = measure(lambda: optimize(ast_nodes, width, height), repeat=3)
+    plain_time, plain_code = measure(lambda: emit(ast_nodes), repeat=3)
+    optimized_time, optimized_code = measure(lambda: emit(optimized), repeat=3)
+
+    print(f"Script: {len(code)} characters, {len(ast_nodes)} statements, canvas {width}x{height}")
+    print(f"optimization              {optimize_time:>9.3f}s")
+    for line in optimizer.report():
+        print(f"  {line}")
+    print(f"{'':<26}{'C code':>12}{'draw calls':>12}{'emit time':>12}")
+    print(f"{'without the optimizer':<26}{len(plain_code):>12}{plain_code.count('Output_Position('):>12}{plain_time:>11.3f}s")
+    print(f"{'with the optimizer':<26}{len(optimized_code):>12}{optimized_code.count('Output_Position('):>12}{optimized_time:>11.3f}s")
+
+    if shutil.which("gcc") is None:
+        print("gcc is needed to check the shapes drawn")
+        return
+    same = same_shapes(width, height)
+    print(f"same shapes drawn with and without the optimizer: {'yes' if same else 'NO'}")
+    assert same
+
+
+if __name__ == "__main__":
+    main()
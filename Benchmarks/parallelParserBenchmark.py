@@ -0,0 +1,46 @@
+"""
+Compare DrawScriptParser.parse with DrawScriptParallelParser.parse, which parses the top-level statements
+in chunks in a pool of processes, on a big generated script.
+
+Run from the root of the project:
+    python -m Benchmarks.parallelParserBenchmark [size of the script in characters] [number of workers]
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptParallelParser import DrawScriptParallelParser
+from DrawScript.Core.drawScriptAst import to_dict
+
+# Declarations of functions, added between the lines of generate_script
+FUNCTION = "function shape{i}() {{ drawCircle(x{i}, 10, {i} % 50); drawPoint(20, x{i} * 2); }}"
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    lines = generate_script(size // 2).split('\n')
+    functions = [FUNCTION.format(i=i) for i in range(len(lines))]
+    code = '\n'.join(line for pair in zip(lines, functions) for line in pair)
+    tokens, _ = DrawScriptTokenizer().tokenize(code)
+
+    serial_time, serial_result = measure(lambda: DrawScriptParser(tokens).parse(), repeat=3)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Start the processes before measuring
+        list(executor.map(abs, range(workers)))
+        pool_time, pool_result = measure(lambda: DrawScriptParallelParser(tokens, executor=executor, workers=workers).parse(), repeat=3)
+    new_pool_time, _ = measure(lambda: DrawScriptParallelParser(tokens, workers=workers).parse(), repeat=1)
+    assert to_dict(pool_result[0]) == to_dict(serial_result[0]) and pool_result[1] == serial_result[1]
+
+    print(f"Script: {len(code)} characters, {len(tokens)} tokens, {len(serial_result[0])} statements, {workers} workers on {os.cpu_count()} CPUs")
+    print(f"{'serial':<26}{serial_time:>9.3f}s")
+    print(f"{'parallel (started pool)':<26}{pool_time:>9.3f}s{serial_time / pool_time:>8.2f}x")
+    print(f"{'parallel (new pool)':<26}{new_pool_time:>9.3f}s{serial_time / new_pool_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
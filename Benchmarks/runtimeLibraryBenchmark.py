@@ -0,0 +1,61 @@
+"""
+Compare the compilation of a Run when every source of the runtime is compiled with main.c,
+with the compilation of main.c alone against the runtime built once into libdrawpp.a by DrawScriptRuntime.
+
+The sources are compiled without being linked (gcc -c), the link needs the Windows libraries of DrawLibrary/C/SDL2.
+
+Run from the root of the project:
+    python -m Benchmarks.runtimeLibraryBenchmark [size of the scripts in characters...]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+from Benchmarks.buildCacheBenchmark import write_main
+
+from DrawScript.Core.drawScriptRuntime import DrawScriptRuntime
+
+
+def compile_sources(directory: str, runtime: DrawScriptRuntime, sources: list) -> None:
+    """
+    Compile 'sources' to object files in 'directory', with the options of a Run
+    """
+    subprocess.run(["gcc", "-c", *runtime.includes(), *sources], check=True, cwd=directory)
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000, 100_000]
+    if shutil.which("gcc") is None or shutil.which("ar") is None:
+        print("gcc and ar are needed for this benchmark")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for folder in ("DrawLibrary/C/Utils", "DrawLibrary/C/SDL2_gfx", "DrawLibrary/C/SDL2/src"):
+            shutil.copytree(folder, f"{directory}/{folder}")
+        shutil.copy("body.c", directory)
+        runtime = DrawScriptRuntime(directory)
+        objects = f"{directory}/objects"
+        os.makedirs(objects)
+
+        library_time, built = measure(runtime.ensure, repeat=1)
+        assert built
+        unchanged_time, built = measure(runtime.ensure, repeat=3)
+        assert not built
+
+        print(f"Runtime library, first build   {library_time:>9.3f}s")
+        print(f"Runtime library, unchanged     {unchanged_time:>9.3f}s")
+        print()
+        print(f"{'Script':>10} {'all sources':>12} {'main.c only':>12} {'speedup':>8}")
+        for size in sizes:
+            write_main(generate_script(size), directory)
+            main_c = f"{directory}/main.c"
+            all_time, _ = measure(compile_sources, objects, runtime, [*runtime.sources(), main_c], repeat=3)
+            main_time, _ = measure(compile_sources, objects, runtime, [main_c], repeat=3)
+            print(f"{size:>10} {all_time:>11.3f}s {main_time:>11.3f}s {all_time / main_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
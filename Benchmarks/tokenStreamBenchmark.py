@@ -0,0 +1,72 @@
+"""
+Compare the list of dictionaries returned by DrawScriptTokenizer.tokenize
+with the DrawScriptTokenStream returned by DrawScriptTokenizer.tokenize_stream.
+
+Run from the root of the project:
+    python -m Benchmarks.tokenStreamBenchmark [size in characters]
+"""
+import gc
+import sys
+import tracemalloc
+
+from Benchmarks.benchmarkUtils import generate_script, measure
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+
+
+def retained_memory(function, *args):
+    """
+    Returns the memory (in bytes) still allocated by the result of 'function'
+    """
+    tracemalloc.start()
+    _, result = measure(function, *args, repeat=1)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def measure_parse(tokens):
+    """
+    Returns the best time to parse 'tokens', without keeping the AST:
+    the AST of a run left alive would make the garbage collector slower in the next ones
+    """
+    time, result = measure(lambda: DrawScriptParser(tokens).parse(), repeat=5)
+    del result
+    gc.collect()
+    return time
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    code = generate_script(size)
+    tokenizer = DrawScriptTokenizer()
+
+    dict_time, (tokens, errors) = measure(tokenizer.tokenize, code)
+    stream_time, stream = measure(tokenizer.tokenize_stream, code)
+    assert stream == tokens and stream.errors == errors
+
+    dict_memory = retained_memory(tokenizer.tokenize, code)
+    stream_memory = retained_memory(tokenizer.tokenize_stream, code)
+
+    dict_parse_time = measure_parse(tokens)
+    stream_parse_time = measure_parse(stream)
+    # The types and values the parser copies out of the stream, on top of the stream itself
+    parser_memory = retained_memory(DrawScriptParser, stream)
+
+    count = len(tokens)
+    print(f"Script: {len(code)} characters, {count} tokens")
+    print(f"{'':<14}{'memory':>12}{'bytes/token':>14}{'tokenize':>12}{'tokens/s':>14}{'parse':>10}")
+    for name, memory, tokenize_time, parse_time in (
+        ("dict list", dict_memory, dict_time, dict_parse_time),
+        ("token stream", stream_memory, stream_time, stream_parse_time),
+    ):
+        print(f"{name:<14}{memory / 1e6:>10.1f}MB{memory / count:>14.1f}"
+              f"{tokenize_time:>11.3f}s{count / tokenize_time:>14.0f}{parse_time:>9.3f}s")
+    print(f"Parsing the stream keeps {parser_memory / 1e6:.1f}MB more ({parser_memory / count:.1f} bytes/token), "
+          f"{(stream_parse_time / dict_parse_time - 1) * 100:+.0f}% parse time")
+
+
+if __name__ == "__main__":
+    main()
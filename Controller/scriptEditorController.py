@@ -1,9 +1,14 @@
 import tkinter as tk
 import subprocess
 import os
+import time
 from tkinter import filedialog
 from pathlib import Path
 
+from PIL import Image
+
+from config import BATCHED_OUTPUT, STREAMED_OUTPUT, STREAM_REFRESH
+
 from Controller.canvasController import CanvasController
 
 from DrawLibrary.Graphics.canvasImage import CanvasImage
@@ -13,10 +18,19 @@ from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
 from DrawScript.Core.drawScriptParser import DrawScriptParser
 from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
 from DrawScript.Core.drawScriptDeserializerC import DrawScriptDeserializerC
+from DrawScript.Core.drawScriptOptimizer import DrawScriptOptimizer
+from DrawScript.Core.drawScriptAstCache import DrawScriptAstCache
+from DrawScript.Core.drawScriptAnalysisCache import DrawScriptAnalysisCache
+from DrawScript.Core.drawScriptBuildCache import DrawScriptBuildCache
+from DrawScript.Core.drawScriptRuntime import DrawScriptRuntime
+from DrawScript.Core.drawScriptLayers import LAYERS_FILE, read_layers, read_stream
+from DrawScript.Core.drawScriptLogger import get_logger
 
 from View.Resources.Widgets.terminal import Terminal
 from View.Resources.Widgets.multiTextEditor import MultiTextEditor
 
+logger = get_logger("editor")
+
 class ScriptEditorController:
     """
     Controller that handle the drawScript.
@@ -61,6 +75,18 @@ class ScriptEditorController:
         self.terminal = terminal
         self.CC = CC
         self.tokenizer = DrawScriptTokenizer()
+        # Tokens of the last run, so the next run only re-lex what was edited
+        self.tokenDocument = None
+        # Top-level statements of the last run, so the next run only re-parse the statements that were edited
+        self.parseDocument = None
+        # AST and errors of the scripts already run, an unchanged script is not parsed again
+        self.astCache = DrawScriptAstCache()
+        # Analysis of the functions of the last run, only the functions that changed are analyzed again
+        self.analysisCache = DrawScriptAnalysisCache()
+        # Executables already built, gcc is not run again for the same C code and sources
+        self.buildCache = DrawScriptBuildCache()
+        # The C runtime built once into a library, a run only compiles main.c
+        self.runtime = DrawScriptRuntime(cache=self.buildCache)
 
         self.refresh_widgets_event = None  # Callback attribute
 
@@ -75,129 +101,240 @@ class ScriptEditorController:
         """
         self.refresh_widgets_event = event
 
-    def executeCode(self):
+    def executeCode(self, headless: bool = False, code: str = None):
         """
         Execute the code inside the textEditor
+
+        Parameters
+        -----------
+        headless : bool
+            For batch use, when True the terminal, the text editor and the canvas are not touched,
+            the errors only go to the "DrawScript" logger and the output of gcc and of the program is captured
+        code : str
+            The code to execute, the content of the opened tab if None
         """
         # Retrieve the entire text content from the text editor starting at line 1, character 0, to the end
-        code = self.textEditor.openedTab.get("1.0", tk.END)
+        if code is None:
+            code = self.textEditor.openedTab.get("1.0", tk.END)
 
-        # Temporarily enable editing
-        self.terminal.text_widget.config(state=tk.NORMAL)  
+        if not headless:
+            # Temporarily enable editing
+            self.terminal.text_widget.config(state=tk.NORMAL)  
 
-        # Clear the terminal widget before executing the code
-        self.terminal.text_widget.delete("1.0", tk.END)
+            # Clear the terminal widget before executing the code
+            self.terminal.text_widget.delete("1.0", tk.END)
 
-        # Remove all previously highlighted "error" tags from the text editor
-        self.textEditor.openedTab.tag_remove("error", "1.0", tk.END)
+            # Remove all previously highlighted "error" tags from the text editor
+            self.textEditor.openedTab.tag_remove("error", "1.0", tk.END)
 
         try:
-            # Clear all elements on the canvas to remove any previous drawings
-            self.CC.deleteAll()
+            if not headless:
+                # Clear all elements on the canvas to remove any previous drawings
+                self.CC.deleteAll()
+
+            cached = self.astCache.load(code)
+            if cached is not None:
+                # The nodes come back with the symbols and the types of the analysis, nothing is analyzed again
+                logger.info("Script unchanged, AST and analysis loaded from the cache.")
+                ast_nodes, parse_errors, semantic_errors = cached
+            else:
+                self.tokenDocument = self.tokenizer.update_document(self.tokenDocument, code)
+                tokens, errors = self.tokenDocument.tokens, self.tokenDocument.errors
 
-            tokenizer = DrawScriptTokenizer()
-            tokens, errors = tokenizer.tokenize(code)
+                parser = DrawScriptParser(tokens)
+                self.parseDocument = parser.update_document(self.parseDocument)
+                ast_nodes, parse_errors = self.parseDocument.nodes, self.parseDocument.errors
 
-            parser = DrawScriptParser(tokens)
-            ast_nodes, parse_errors = parser.parse()
+                # The semantic analysis is only done on a script without parsing errors
+                semantic_errors = []
+                if not parse_errors:
+                    analyzer = SemanticAnalyzer(self.analysisCache, code)
+                    semantic_errors = analyzer.analyze(ast_nodes)
+                    logger.info("Semantic analysis, %s", self.analysisCache.report())
+                self.astCache.store(code, ast_nodes, parse_errors, semantic_errors)
 
             # -- If the parser has error, show them
             if parse_errors:
-                print("=== Parsing errors detected ===")
                 for err in parse_errors:
-                    # Each error is a dict: {"message": str(e), "line": line}
+                    # Each error is a dict: {"message": str(e), "line": line, "start": offset, "end": offset}
                     ligne = err["line"]
                     message = err["message"]
-                    self.terminal.text_widget.insert(tk.END, f"Ligne {ligne}: {message}\n")
-                    print(f"Ligne {ligne}: {message}")
-
-                    # Put the error line in red
-                    self.highlight_error(message, ligne)
-                print("Impossible to continue with the semantic analysis.")
+                    logger.error("Ligne %s: %s", ligne, message)
+                    if not headless:
+                        self.terminal.text_widget.insert(tk.END, f"Ligne {ligne}: {message}\n")
+                        # Put the error in red
+                        self.highlight_error(message, ligne, err.get("start"), err.get("end"))
+                logger.info("Impossible to continue with the semantic analysis.")
                 raise Exception
             else:
-                print("No parsing errors.")
-                # Do the semantic analysis
-                analyzer = SemanticAnalyzer()
-                semantic_errors = analyzer.analyze(ast_nodes)
-
+                logger.info("No parsing errors.")
                 if semantic_errors:
-                    print("=== Semantic errors detected ===")
                     for err in semantic_errors:
-                        self.terminal.text_widget.insert(tk.END, err)
-                        print(err)
-                    print("Cancel generation of code C")
+                        logger.error("%s", err)
+                        if not headless:
+                            self.terminal.text_widget.insert(tk.END, err)
+                    logger.info("Cancel generation of code C")
                     raise Exception
                 else:
-                    print("No semantic errors, generating code C")
+                    logger.info("No semantic errors, generating code C")
+                    # Fold the constants and remove what can't be seen before anything goes through gcc
+                    optimizer = DrawScriptOptimizer(*DrawScriptDeserializerC.canvas_size(self.CC))
+                    ast_nodes = optimizer.optimize(ast_nodes)
+                    for line in optimizer.report():
+                        logger.info("Optimization, %s", line)
+
                     interpreter = DrawScriptDeserializerC(ast_nodes, self.CC)
                     interpreter.write_c()
 
                     # Indicate successful execution in the terminal
-                    self.terminal.text_widget.insert(tk.END, "Compilation successful !\n")
+                    if not headless:
+                        self.terminal.text_widget.insert(tk.END, "Compilation successful !\n")
 
                     # Get the directory where the code is ran
                     current_directory = os.getcwd()
 
-                    gcc_command = [
-                        "gcc",
-                        f"-I{current_directory}/DrawLibrary/C/SDL2/src/include",
-                        f"-I{current_directory}/DrawLibrary/C/SDL2_gfx",
-                        f"-I{current_directory}/DrawLibrary/C/Utils",
-                        f"{current_directory}/DrawLibrary/C/Utils/shapes.c",
-                        f"{current_directory}/DrawLibrary/C/Utils/cursor.c",
-                        f"{current_directory}/DrawLibrary/C/Utils/utils.c",
-                        f"{current_directory}/main.c",
-                        f"{current_directory}/DrawLibrary/C/SDL2_gfx/SDL2_gfxPrimitives.c",
-                        f"{current_directory}/DrawLibrary/C/SDL2_gfx/SDL2_rotozoom.c",
-                        f"-L{current_directory}/DrawLibrary/C/SDL2/src/lib",
-                        "-lmingw32",
-                        "-lSDL2main",
-                        "-lSDL2",
-                        f"-o{current_directory}/DrawLibrary/C/SDL2/main.exe",
-                    ]
-
-                    # Compile the C code
+                    # The runtime is only built again when its sources changed
                     try:
-                        subprocess.run(gcc_command, check=True)
-                        print("Build successful!")
-                    except subprocess.CalledProcessError as e:
-                        print(f"Build failed: {e}")
-
-                    output_folder = f'{current_directory}/Data/Outputs'
-                    Utils.RemoveFilesInDirectory(output_folder, ".gitignore")
-
-                    # Run the C code
-                    try:
-                        subprocess.run(f"{current_directory}/DrawLibrary/C/SDL2/main.exe", check=True)  # This will run the exe and wait for it to finish
-                        print(f"Successfully launched {current_directory}/DrawLibrary/C/SDL2/main.exe")
-                    except subprocess.CalledProcessError as e:
-                        print(f"Failed to launch {current_directory}/DrawLibrary/C/SDL2/main.exe: {e}")
-
-                    with open(f'{current_directory}/Data/Outputs/drawing_positions.txt', "r") as file:
-                        lines = file.readlines()
-
-                    for i in range(0, len(lines)):
-                        line = lines[i]
-                        image = CanvasImage.fromPath(f'{output_folder}/drawing_{i + 1}.bmp')
-                        image.removeWhiteBackground()
-                        x, y = line.strip().split(',')
-                        self.CC.drawImage(image, int(x), int(y))
+                        self.runtime.ensure(capture_output=headless)
+                    except (subprocess.CalledProcessError, OSError) as e:
+                        logger.error("Runtime library build failed: %s", e)
+
+                    # Only main.c is compiled, then linked with the runtime
+                    gcc_command = self.runtime.command(f"{current_directory}/main.c",
+                                                       f"{current_directory}/DrawLibrary/C/SDL2/main.exe")
+
+                    # Compile the C code, in headless mode its output is kept out of the console.
+                    # Nothing to compile when the same C code was already built with the same sources
+                    build_key = self.buildCache.key(gcc_command)
+                    if self.buildCache.load(build_key, f"{current_directory}/DrawLibrary/C/SDL2/main.exe"):
+                        logger.info("C code unchanged, the executable is reused.")
+                    else:
+                        start = time.perf_counter()
+                        try:
+                            subprocess.run(gcc_command, check=True, capture_output=headless)
+                            logger.info("Build successful!")
+                            self.buildCache.store(build_key, f"{current_directory}/DrawLibrary/C/SDL2/main.exe", time.perf_counter() - start)
+                        except subprocess.CalledProcessError as e:
+                            logger.error("Build failed: %s", e)
+                    logger.info("Build cache, %s", self.buildCache.report())
+                    if not headless:
+                        self.terminal.text_widget.insert(tk.END, f"Build cache: {self.buildCache.report()}\n")
+
+                    run_command = [f"{current_directory}/DrawLibrary/C/SDL2/main.exe"]
+                    # In the editor the drawings come through a pipe, and are put on the canvas as they arrive.
+                    # Not with --batch, the drawings would only be sent at the end: streaming replaces batching here
+                    if STREAMED_OUTPUT and not headless:
+                        start = time.perf_counter()
+                        count = self.draw_stream(run_command + ["--stream"])
+                        logger.info("%d drawing(s) streamed in %.3fs", count, time.perf_counter() - start)
+                    else:
+                        output_folder = f'{current_directory}/Data/Outputs'
+                        Utils.RemoveFilesInDirectory(output_folder, ".gitignore")
+
+                        # Run the C code, in batch mode all the drawings are read back at once
+                        if BATCHED_OUTPUT:
+                            run_command.append("--batch")
+                        try:
+                            subprocess.run(run_command, check=True, capture_output=headless)  # This will run the exe and wait for it to finish
+                            logger.info("Successfully launched %s/DrawLibrary/C/SDL2/main.exe", current_directory)
+                        except subprocess.CalledProcessError as e:
+                            logger.error("Failed to launch %s/DrawLibrary/C/SDL2/main.exe: %s", current_directory, e)
+
+                        # In headless mode the drawings stay in Data/Outputs, there is no canvas to put them on
+                        if headless:
+                            return
+
+                        start = time.perf_counter()
+                        count = self.draw_layers(f'{output_folder}/{LAYERS_FILE}')
+                        logger.info("%d drawing(s) loaded in %.3fs", count, time.perf_counter() - start)
 
         except Exception as e:
+            if headless:
+                # The errors were already logged, only the unexpected ones have a message
+                if str(e):
+                    logger.error("%s", e)
+                return
+
             # Display the error message in the terminal
             self.terminal.text_widget.insert(tk.END, str(e) + "\n")
 
             # Highlight the line where the error occurred in the text editor
             #self.highlight_error(e, line_number)
 
-        self.terminal.text_widget.config(state=tk.DISABLED)  # Disable editing again
+        if not headless:
+            self.terminal.text_widget.config(state=tk.DISABLED)  # Disable editing again
+
+    def draw_layers(self, path: str) -> int:
+        """
+        Put the drawings of the layered file written by the C program on the canvas.
+        The file is mapped in memory, the pixels of each drawing are given to PIL without reading them in Python,
+        and copied once in its own CanvasImage. Returns the number of drawings
+        """
+        count = 0
+        with read_layers(path) as layers:
+            for layer in layers.layers:
+                # A drawing out of the canvas has no pixel
+                if layer.empty:
+                    continue
+                pixels = layers.pixels(layer)
+                image = self.layer_image(layer, pixels)
+                if not layer.angle:
+                    # The image must not keep the file mapped after it's closed
+                    image = image.copy()
+                self.CC.drawImage(CanvasImage.fromImage(image), layer.x, layer.y)
+                pixels.release()
+                count += 1
+        return count
+
+    def draw_stream(self, command: list) -> int:
+        """
+        Run the C program with 'command' and put its drawings on the canvas as they arrive through its standard output,
+        the canvas is refreshed every STREAM_REFRESH seconds while the program runs. Returns the number of drawings
+        """
+        count = 0
+        refreshed = time.perf_counter()
+        with subprocess.Popen(command, stdout=subprocess.PIPE) as process:
+            try:
+                for layer, pixels in read_stream(process.stdout):
+                    # A drawing out of the canvas has no pixel
+                    if layer.empty:
+                        continue
+                    self.CC.drawImage(CanvasImage.fromImage(self.layer_image(layer, pixels)), layer.x, layer.y)
+                    count += 1
+                    if time.perf_counter() - refreshed > STREAM_REFRESH:
+                        # Only redraw, the events wait for the end of the run
+                        self.CC.view.update_idletasks()
+                        refreshed = time.perf_counter()
+            except ValueError as e:
+                logger.error("Failed to read the drawings of %s: %s", command[0], e)
+                process.kill()
+        if process.returncode != 0:
+            logger.error("Failed to launch %s: exit code %s", command[0], process.returncode)
+        else:
+            logger.info("Successfully launched %s", command[0])
+        return count
+
+    @staticmethod
+    def layer_image(layer, pixels) -> Image:
+        """
+        The PIL image of a drawing of the C program, over its pixels without copying them, rotated by its angle.
+        The white background is already transparent
+        """
+        image = Image.frombuffer("RGBA", layer.size, pixels, "raw", "RGBA", 0, 1)
+        if layer.angle:
+            # Counterclockwise around the center, like SDL2_rotozoom did
+            image = image.rotate(layer.angle, Image.BILINEAR, expand=True)
+        return image
 
     # Fonction pour souligner la ligne contenant une erreur
-    def highlight_error(self, error, line_number):
+    def highlight_error(self, error, line_number, start=None, end=None):
         error_message = str(error)
-        # On extrait le numéro de ligne de l'erreur
-        self.textEditor.openedTab.tag_add("error", f"{line_number}.0", f"{line_number}.end")
+        if start is not None and end is not None and end > start:
+            # The error has a span, the offsets are counted in characters like the tk.Text indexes
+            self.textEditor.openedTab.tag_add("error", f"1.0 + {start} chars", f"1.0 + {end} chars")
+        else:
+            # On extrait le numéro de ligne de l'erreur
+            self.textEditor.openedTab.tag_add("error", f"{line_number}.0", f"{line_number}.end")
         self.textEditor.openedTab.tag_config("error", underlinefg="red", underline=True)
 
     def load_file(self):
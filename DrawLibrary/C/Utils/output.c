@@ -0,0 +1,361 @@
+#include <stdlib.h>
+#include <stdio.h>
+#include <SDL2/SDL.h>
+#ifdef _WIN32
+#include <io.h>
+#include <fcntl.h>
+#else
+#include <unistd.h>
+#endif
+
+#include "output.h"
+#include "utils.h"
+
+typedef struct {
+    int x, y;             // The position given by the program
+    SDL_Rect box;         // The part of the canvas captured, empty when the shape is out of the canvas
+    int angle;            // The rotation of the drawing, applied when it is loaded
+    Uint8* pixels;        // Read back mode: its own pixels
+    int page;             // Batch mode: where the pixels are in the atlas
+    int atlasX, atlasY;
+} Layer;
+
+typedef struct {
+    Uint8* pixels;        // The part of the page used, read back from the atlas
+    int width, height;
+} Page;
+
+static int outputMode = OUTPUT_READBACK;
+// Stream: the layers are sent in frames on the standard output of the program instead of the layered file
+static FILE* stream = NULL;
+
+// Batch mode: the shapes are drawn on 'canvas', then copied in a free place of the current page of 'atlas'
+static SDL_Texture* canvas = NULL;
+static SDL_Texture* atlas = NULL;
+static int pageWidth, pageHeight;
+// The next free place in the page, the shapes are put side by side on shelves
+static int shelfX, shelfY, shelfHeight;
+// The part of the page used, only this part is read back
+static int usedWidth;
+
+static Layer* layers = NULL;
+static int layerCount = 0, layerCapacity = 0;
+// The pages already read back
+static Page* pages = NULL;
+static int pageCount = 0;
+// Number of layers in the current page
+static int pageLayers = 0;
+
+static SDL_Texture* CreateTarget(SDL_Renderer* renderer, int width, int height) {
+    SDL_Texture* texture = SDL_CreateTexture(renderer, SDL_PIXELFORMAT_RGBA32, SDL_TEXTUREACCESS_TARGET, width, height);
+    if (texture) {
+        // The pixels are copied as they are, without blending them with the white of the atlas
+        SDL_SetTextureBlendMode(texture, SDL_BLENDMODE_NONE);
+    }
+    return texture;
+}
+
+static void WriteInt(FILE* file, Sint32 value) {
+    Sint32 littleEndian = SDL_SwapLE32(value);
+    fwrite(&littleEndian, sizeof(littleEndian), 1, file);
+}
+
+static void WriteInt64(FILE* file, Sint64 value) {
+    Sint64 littleEndian = SDL_SwapLE64(value);
+    fwrite(&littleEndian, sizeof(littleEndian), 1, file);
+}
+
+static int OpenStream() {
+    // The frames take the place of the standard output, the messages of the program go to the error output
+    fflush(stdout);
+    int fd = dup(fileno(stdout));
+    if (fd < 0 || dup2(fileno(stderr), fileno(stdout)) < 0) {
+        printf("Stream output unavailable.\n");
+        return 1;
+    }
+#ifdef _WIN32
+    _setmode(fd, _O_BINARY);
+#endif
+    stream = fdopen(fd, "wb");
+    if (stream == NULL) {
+        printf("Stream output unavailable.\n");
+        return 1;
+    }
+    fwrite(STREAM_MAGIC, 1, 4, stream);
+    WriteInt(stream, STREAM_VERSION);
+    return 0;
+}
+
+int Output_Begin(SDL_Renderer* renderer, int mode, int streamed) {
+    if (streamed && OpenStream() != 0) {
+        return 1;
+    }
+    if (mode == OUTPUT_BATCH) {
+        pageWidth = CanvasWidth() > ATLAS_PAGE_SIZE ? CanvasWidth() : ATLAS_PAGE_SIZE;
+        pageHeight = CanvasHeight() > ATLAS_PAGE_SIZE ? CanvasHeight() : ATLAS_PAGE_SIZE;
+        canvas = CreateTarget(renderer, CanvasWidth(), CanvasHeight());
+        atlas = CreateTarget(renderer, pageWidth, pageHeight);
+        if (canvas && atlas && SDL_SetRenderTarget(renderer, atlas) == 0) {
+            ClearCanvas(renderer, 255, 255, 255, 255);
+            SDL_SetRenderTarget(renderer, canvas);
+            outputMode = OUTPUT_BATCH;
+            return 0;
+        }
+        printf("Batch output unavailable (%s), each drawing is read back on its own.\n", SDL_GetError());
+        if (canvas) SDL_DestroyTexture(canvas);
+        if (atlas) SDL_DestroyTexture(atlas);
+        canvas = atlas = NULL;
+    }
+
+    outputMode = OUTPUT_READBACK;
+    return 0;
+}
+
+int Output_IsBatched() {
+    return outputMode == OUTPUT_BATCH;
+}
+
+static void ClearWhite(Uint8* pixels, size_t count) {
+    // The white of the canvas is the background, it becomes transparent like in CanvasImage.removeWhiteBackground
+    for (size_t i = 0; i < count; i++, pixels += 4) {
+        if (pixels[0] == 255 && pixels[1] == 255 && pixels[2] == 255) {
+            pixels[3] = 0;
+        }
+    }
+}
+
+static Uint8* ReadPixels(SDL_Renderer* renderer, SDL_Rect rect) {
+    Uint8* pixels = malloc((size_t)rect.w * rect.h * 4);
+    if (!pixels) {
+        printf("Not enough memory for the drawings.\n");
+        return NULL;
+    }
+    if (SDL_RenderReadPixels(renderer, &rect, SDL_PIXELFORMAT_RGBA32, pixels, rect.w * 4) != 0) {
+        printf("Failed to read pixels: %s\n", SDL_GetError());
+        free(pixels);
+        return NULL;
+    }
+    ClearWhite(pixels, (size_t)rect.w * rect.h);
+    return pixels;
+}
+
+static int ReadPage(SDL_Renderer* renderer) {
+    // Read back the part of the page used at once, the only transfer from the GPU
+    SDL_Rect used = { 0, 0, usedWidth, shelfY + shelfHeight };
+    Page* grown = realloc(pages, sizeof(Page) * (pageCount + 1));
+    if (!grown) {
+        printf("Not enough memory for the atlas.\n");
+        return 1;
+    }
+    pages = grown;
+    SDL_SetRenderTarget(renderer, atlas);
+    Uint8* pixels = ReadPixels(renderer, used);
+    if (!pixels) {
+        SDL_SetRenderTarget(renderer, canvas);
+        return 1;
+    }
+    pages[pageCount].pixels = pixels;
+    pages[pageCount].width = used.w;
+    pages[pageCount].height = used.h;
+    pageCount++;
+
+    // The next page starts empty
+    ClearCanvas(renderer, 255, 255, 255, 255);
+    SDL_SetRenderTarget(renderer, canvas);
+    shelfX = shelfY = shelfHeight = usedWidth = 0;
+    pageLayers = 0;
+    return 0;
+}
+
+static int PlaceLayer(SDL_Renderer* renderer, Layer* layer) {
+    int width = layer->box.w, height = layer->box.h;
+    if (shelfX + width > pageWidth) {
+        // Next shelf
+        shelfX = 0;
+        shelfY += shelfHeight;
+        shelfHeight = 0;
+    }
+    if (shelfY + height > pageHeight) {
+        // The page is full
+        if (ReadPage(renderer) != 0) {
+            return 1;
+        }
+    }
+    layer->page = pageCount;
+    layer->atlasX = shelfX;
+    layer->atlasY = shelfY;
+    shelfX += width;
+    if (shelfX > usedWidth) {
+        usedWidth = shelfX;
+    }
+    if (height > shelfHeight) {
+        shelfHeight = height;
+    }
+    pageLayers++;
+    return 0;
+}
+
+int Output_AddLayer(SDL_Renderer* renderer, SDL_Rect captureRect, int angle) {
+    if (layerCount == layerCapacity) {
+        int capacity = layerCapacity ? layerCapacity * 2 : 256;
+        Layer* grown = realloc(layers, sizeof(Layer) * capacity);
+        if (!grown) {
+            printf("Not enough memory for the layers.\n");
+            return 1;
+        }
+        layers = grown;
+        layerCapacity = capacity;
+    }
+    Layer* layer = &layers[layerCount++];
+    layer->x = layer->y = 0;
+    layer->angle = angle;
+    layer->pixels = NULL;
+    layer->page = layer->atlasX = layer->atlasY = 0;
+
+    // Only the part on the canvas can be copied
+    SDL_Rect canvasRect = { 0, 0, CanvasWidth(), CanvasHeight() };
+    if (!SDL_IntersectRect(&captureRect, &canvasRect, &layer->box)) {
+        layer->box.w = layer->box.h = 0;
+    }
+
+    int result = 0;
+    if (layer->box.w > 0 && layer->box.h > 0 && outputMode == OUTPUT_READBACK) {
+        layer->pixels = ReadPixels(renderer, layer->box);
+        if (!layer->pixels) {
+            layer->box.w = layer->box.h = 0;
+            result = 1;
+        }
+    } else if (layer->box.w > 0 && layer->box.h > 0) {
+        result = PlaceLayer(renderer, layer);
+        if (result == 0) {
+            // Copy on the GPU, nothing is read back here
+            SDL_Rect slot = { layer->atlasX, layer->atlasY, layer->box.w, layer->box.h };
+            SDL_SetRenderTarget(renderer, atlas);
+            SDL_RenderCopy(renderer, canvas, &layer->box, &slot);
+            SDL_SetRenderTarget(renderer, canvas);
+        }
+    }
+
+    ClearCanvas(renderer, 255, 255, 255, 255);
+    return result;
+}
+
+static void WritePixels(FILE* file, Layer* layer) {
+    if (layer->box.w <= 0 || layer->box.h <= 0) {
+        return;
+    }
+    if (layer->pixels) {
+        fwrite(layer->pixels, 4, (size_t)layer->box.w * layer->box.h, file);
+        return;
+    }
+    // Batch mode, the rows of the layer in its page
+    Page* page = &pages[layer->page];
+    for (int row = 0; row < layer->box.h; row++) {
+        fwrite(page->pixels + ((size_t)(layer->atlasY + row) * page->width + layer->atlasX) * 4, 4, layer->box.w, file);
+    }
+}
+
+static void SendFrame(int kind, Layer* layer) {
+    WriteInt(stream, kind);
+    WriteInt(stream, layer ? layer->x : 0);
+    WriteInt(stream, layer ? layer->y : 0);
+    WriteInt(stream, layer ? layer->box.w : 0);
+    WriteInt(stream, layer ? layer->box.h : 0);
+    WriteInt(stream, layer ? layer->angle : 0);
+    if (layer) {
+        WritePixels(stream, layer);
+    }
+    // The editor draws it as soon as it arrives
+    fflush(stream);
+}
+
+void Output_Position(int x, int y) {
+    if (layerCount > 0) {
+        Layer* layer = &layers[layerCount - 1];
+        layer->x = x;
+        layer->y = y;
+        if (stream && outputMode == OUTPUT_READBACK) {
+            // Complete, it is sent right away and its pixels are no longer needed
+            SendFrame(FRAME_LAYER, layer);
+            free(layer->pixels);
+            layer->pixels = NULL;
+        }
+    }
+}
+
+static int WriteLayers() {
+    FILE* file = fopen(LAYERS_FILE, "wb");
+    if (file == NULL) {
+        printf("Error opening %s!\n", LAYERS_FILE);
+        return 1;
+    }
+    fwrite(LAYERS_MAGIC, 1, 4, file);
+    WriteInt(file, LAYERS_VERSION);
+    WriteInt(file, layerCount);
+
+    // The index, the pixels of the layers follow it in the same order
+    Sint64 offset = 12 + (Sint64)layerCount * 28;
+    for (int i = 0; i < layerCount; i++) {
+        Layer* layer = &layers[i];
+        WriteInt(file, layer->x);
+        WriteInt(file, layer->y);
+        WriteInt(file, layer->box.w);
+        WriteInt(file, layer->box.h);
+        WriteInt(file, layer->angle);
+        WriteInt64(file, offset);
+        offset += (Sint64)layer->box.w * layer->box.h * 4;
+    }
+
+    for (int i = 0; i < layerCount; i++) {
+        WritePixels(file, &layers[i]);
+    }
+    int failed = ferror(file);
+    fclose(file);
+    return failed ? 1 : 0;
+}
+
+static int SendLayers() {
+    // In batch mode the layers are only complete now, the others were already sent
+    if (outputMode == OUTPUT_BATCH) {
+        for (int i = 0; i < layerCount; i++) {
+            SendFrame(FRAME_LAYER, &layers[i]);
+        }
+    }
+    SendFrame(FRAME_END, NULL);
+    int failed = ferror(stream);
+    fclose(stream);
+    stream = NULL;
+    return failed ? 1 : 0;
+}
+
+int Output_End(SDL_Renderer* renderer) {
+    int result = 0;
+    if (outputMode == OUTPUT_BATCH && pageLayers > 0) {
+        result = ReadPage(renderer);
+    }
+    if (result == 0 && stream) {
+        result = SendLayers();
+    } else if (result == 0) {
+        result = WriteLayers();
+    }
+
+    // Clean
+    if (outputMode == OUTPUT_BATCH) {
+        SDL_SetRenderTarget(renderer, NULL);
+        SDL_DestroyTexture(canvas);
+        SDL_DestroyTexture(atlas);
+        canvas = atlas = NULL;
+    }
+    for (int i = 0; i < layerCount; i++) {
+        free(layers[i].pixels);
+    }
+    for (int i = 0; i < pageCount; i++) {
+        free(pages[i].pixels);
+    }
+    free(pages);
+    free(layers);
+    pages = NULL;
+    layers = NULL;
+    pageCount = layerCount = layerCapacity = pageLayers = 0;
+    return result;
+}
@@ -0,0 +1,48 @@
+#ifndef OUTPUT_H
+#define OUTPUT_H
+
+#include <SDL2/SDL.h>
+
+// How the drawings are read back from the renderer, chosen when the program starts (see Output_Begin).
+// Both save every drawing in LAYERS_FILE, or send them in the stream
+#define OUTPUT_READBACK 0  // Each shape is read back as soon as it is drawn
+#define OUTPUT_BATCH 1     // Every shape copied in an offscreen atlas, read back once per page at the end
+
+#define LAYERS_FILE "Data/Outputs/drawings.layers"
+
+// The layered file, the numbers are little-endian integers of 32 bits, the offsets of 64 bits:
+// "DSLY", version, number of layers,
+// then the index, for each layer (x, y, width, height, angle, offset of its pixels in the file),
+// then the pixels of each layer, RGBA, row by row, the white pixels are transparent
+#define LAYERS_MAGIC "DSLY"
+#define LAYERS_VERSION 2
+
+// The stream, on the standard output of the program, same numbers:
+// "DSST", version, then frames (kind, x, y, width, height, angle), a FRAME_LAYER is followed by its pixels,
+// the stream ends with a FRAME_END
+#define STREAM_MAGIC "DSST"
+#define STREAM_VERSION 1
+#define FRAME_END 0
+#define FRAME_LAYER 1
+
+// Size of a page of the atlas, a page is at least the size of the canvas
+#define ATLAS_PAGE_SIZE 2048
+
+// Start the output in 'mode', batch mode falls back to read back when the renderer can't draw in a texture.
+// When 'streamed', the drawings are sent in the stream instead of the layered file.
+// Returns 1 if the output couldn't be started
+int Output_Begin(SDL_Renderer* renderer, int mode, int streamed);
+
+// True when the drawings are batched
+int Output_IsBatched();
+
+// Add the part 'captureRect' of the canvas as a new layer, then clear the canvas
+int Output_AddLayer(SDL_Renderer* renderer, SDL_Rect captureRect, int angle);
+
+// Set the position of the last drawing saved
+void Output_Position(int x, int y);
+
+// Write the layered file or end the stream, and close the output. Returns 1 if it couldn't be written
+int Output_End(SDL_Renderer* renderer);
+
+#endif
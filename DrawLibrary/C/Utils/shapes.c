@@ -5,58 +5,45 @@
 
 #include "shapes.h"
 #include "utils.h"
-#include "globals.h"
 
 void drawCircle(SDL_Renderer *renderer, 
                 int x, int y, 
                 int radius, 
-                int r, int g, int b, int a, 
-                char* filename) {
+                int r, int g, int b, int a) {
     // Draw the circle on the renderer
     aacircleRGBA(renderer, x, y, radius, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box
     SDL_Rect captureRect = { x - radius, y - radius, 2 * radius + 1, 2 * radius + 1 };
 
     AdjustCaptureRect(&captureRect);
 
-    SaveDrawing(renderer, captureRect, 0, filename);
+    SaveDrawing(renderer, captureRect, 0);
 }
 
 void drawFilledCircle(SDL_Renderer *renderer, 
                 int x, int y, 
                 int radius, 
-                int r, int g, int b, int a, 
-                char* filename) {
+                int r, int g, int b, int a) {
     
     filledCircleRGBA(renderer, x, y, radius, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box
     SDL_Rect captureRect = { x - radius, y - radius, 2 * radius + 1, 2 * radius + 1 };
 
     AdjustCaptureRect(&captureRect);
 
-    SaveDrawing(renderer, captureRect, 0, filename);
+    SaveDrawing(renderer, captureRect, 0);
 }
 
 void drawEllipse(SDL_Renderer *renderer, 
                    int x, int y, 
                    int rx, int ry, 
                    int angle, 
-                   int r, int g, int b, int a, 
-                   char* filename) {
+                   int r, int g, int b, int a) {
     // Draw the anti-aliased ellipse on the renderer
     aaellipseRGBA(renderer, x, y, rx, ry, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box
     SDL_Rect captureRect = {
         x - rx, 
@@ -68,21 +55,17 @@ void drawEllipse(SDL_Renderer *renderer,
     AdjustCaptureRect(&captureRect);
 
     // Save the captured drawing
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawFilledEllipse(SDL_Renderer *renderer, 
                    int x, int y, 
                    int rx, int ry, 
                    int angle, 
-                   int r, int g, int b, int a, 
-                   char* filename) {
+                   int r, int g, int b, int a) {
     // Draw the filled ellipse on the renderer
     filledEllipseRGBA(renderer, x, y, rx, ry, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box
     SDL_Rect captureRect = {
         x - rx, 
@@ -94,19 +77,15 @@ void drawFilledEllipse(SDL_Renderer *renderer,
     AdjustCaptureRect(&captureRect);
 
     // Save the captured drawing
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawSegment(SDL_Renderer *renderer, 
                 int x0, int y0, int x1, int y1, 
                 int thickness, 
-                int r, int g, int b, int a, 
-                char* filename) {
+                int r, int g, int b, int a) {
     thickLineRGBA(renderer, x0, y0, x1, y1, thickness, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the area to capture (based on the line's bounding box)
     int minX = x0 < x1 ? x0 : x1;
     int minY = y0 < y1 ? y0 : y1;
@@ -120,36 +99,28 @@ void drawSegment(SDL_Renderer *renderer,
         (maxY - minY) + thickness * 2
     };
 
-    SaveDrawing(renderer, captureRect, 0, filename);
+    SaveDrawing(renderer, captureRect, 0);
 }
 
 void drawRectangle(SDL_Renderer *renderer, 
                 int x, int y, 
                 int width, int height, 
                 int angle, 
-                int r, int g, int b, int a,
-                char* filename) {
+                int r, int g, int b, int a) {
     // Draw the rectangle on the renderer
     rectangleRGBA(renderer, x, y, x + width, y + height, r, g, b, a);
     
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-    
     // Define the area to capture
     SDL_Rect captureRect = { x, y, width, height };
     
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawTriangle(SDL_Renderer *renderer,
                 int x1, int y1, int x2, int y2, int x3, int y3, 
-                int angle, int r, int g, int b, int a, 
-                char* filename) {
+                int angle, int r, int g, int b, int a) {
     aatrigonRGBA(renderer, x1, y1, x2, y2, x3, y3, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box of the trigon
     // https://www.sunshine2k.de/coding/java/TriangleRasterization/boundingbox.png
     int minX = (x1 < x2 ? (x1 < x3 ? x1 : x3) : (x2 < x3 ? x2 : x3));
@@ -164,21 +135,17 @@ void drawTriangle(SDL_Renderer *renderer,
         maxY - minY
     };
 
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawRoundedRectangle(SDL_Renderer *renderer,
                           int x, int y, 
                           int width, int height, 
                           int radius, 
-                          int angle, int r, int g, int b, int a, 
-                          char* filename) {
+                          int angle, int r, int g, int b, int a) {
     // Draw the rounded rectangle on the renderer
     roundedRectangleRGBA(renderer, x, y, x + width, y + height, radius, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box of the rounded rectangle
     SDL_Rect captureRect = {
         x, 
@@ -187,21 +154,17 @@ void drawRoundedRectangle(SDL_Renderer *renderer,
         height
     };
 
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawBox(SDL_Renderer *renderer, 
                 int x, int y, 
                 int width, int height, 
                 int angle, 
-                int r, int g, int b, int a,
-                char* filename) {
+                int r, int g, int b, int a) {
     // Draw the box on the renderer
     boxRGBA(renderer, x, y, x + width, y + height, r, g, b, a);
     
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-    
     // Define the bounding box
     SDL_Rect captureRect = {
         x, 
@@ -210,21 +173,17 @@ void drawBox(SDL_Renderer *renderer,
         height
     };
     
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
 
 void drawRoundedBox(SDL_Renderer *renderer,
                           int x, int y, 
                           int width, int height, 
                           int radius, 
-                          int angle, int r, int g, int b, int a, 
-                          char* filename) {
+                          int angle, int r, int g, int b, int a) {
     // Draw the rounded rectangle on the renderer
     roundedBoxRGBA(renderer, x, y, x + width, y + height, radius, r, g, b, a);
 
-    // Render the drawing to the window
-    SDL_RenderPresent(renderer);
-
     // Define the bounding box of the rounded rectangle
     SDL_Rect captureRect = {
         x, 
@@ -233,5 +192,5 @@ void drawRoundedBox(SDL_Renderer *renderer,
         height
     };
 
-    SaveDrawing(renderer, captureRect, angle, filename);
+    SaveDrawing(renderer, captureRect, angle);
 }
\ No newline at end of file
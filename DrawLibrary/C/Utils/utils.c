@@ -2,7 +2,10 @@
 #include <SDL2_rotozoom.h>
 
 #include "utils.h"
-#include "globals.h"
+#include "output.h"
+
+// The size of the window, the library doesn't depend on the globals.h of the script
+static int canvasWidth = 0, canvasHeight = 0;
 
 int SDL_Start(){
     // Initialisation de SDL
@@ -14,6 +17,8 @@ int SDL_Start(){
 }
 
 SDL_Window* CreateWindow(int screen_width, int screen_height){
+    canvasWidth = screen_width;
+    canvasHeight = screen_height;
     SDL_Window *window = SDL_CreateWindow(
     "Exemple SDL2", SDL_WINDOWPOS_CENTERED, SDL_WINDOWPOS_CENTERED, screen_width, screen_height, SDL_WINDOW_HIDDEN);
     if (!window) {
@@ -24,6 +29,14 @@ SDL_Window* CreateWindow(int screen_width, int screen_height){
     return window;
 }
 
+int CanvasWidth(){
+    return canvasWidth;
+}
+
+int CanvasHeight(){
+    return canvasHeight;
+}
+
 SDL_Renderer* CreateRenderer(SDL_Window* window){
     SDL_Renderer *renderer = SDL_CreateRenderer(window, -1, SDL_RENDERER_ACCELERATED);
     if (!renderer) {
@@ -84,26 +97,9 @@ int SaveBMP(SDL_Surface* surface, char* filename){
     return 0;
 }
 
-int SaveDrawing(SDL_Renderer* renderer, SDL_Rect captureRect, int angle, char* filename) {
-    // Capture the current content of the renderer into an SDL_Surface
-    SDL_Surface *surface = CreateSurface(captureRect.w, captureRect.h);
-    // Copy the rendered content to the surface
-    if (CopyRenderToSurface(renderer, captureRect, surface) != 0){
-        return 1;
-    }
-    // Rotate the surface
-    SDL_Surface *rotatedSurface = RotateSurface(surface, angle);
-    // Save the rotated surface as a BMP file
-    if (SaveBMP(rotatedSurface, filename) != 0){
-        return 1;
-    }
-    // Clean up
-    SDL_FreeSurface(surface);
-    SDL_FreeSurface(rotatedSurface);
-    // Clean the window
-    ClearCanvas(renderer, 255, 255, 255, 255);
-
-    return 0;
+int SaveDrawing(SDL_Renderer* renderer, SDL_Rect captureRect, int angle) {
+    // Read back now, or kept on the GPU until the end in batch mode (see output.c)
+    return Output_AddLayer(renderer, captureRect, angle);
 }
 
 void ClearCanvas(SDL_Renderer *renderer, int r, int g, int b, int a){
@@ -124,11 +120,11 @@ void AdjustCaptureRect(SDL_Rect *captureRect) {
     }
 
     // Check if the rectangle extends beyond the window (right and bottom)
-    if (captureRect->x + captureRect->w > SCREEN_WIDTH) {  
-        captureRect->w = SCREEN_WIDTH - captureRect->x;  // Adjust the width to fit within the window
+    if (captureRect->x + captureRect->w > canvasWidth) {  
+        captureRect->w = canvasWidth - captureRect->x;  // Adjust the width to fit within the window
     }
 
-    if (captureRect->y + captureRect->h > SCREEN_HEIGHT) {  
-        captureRect->h = SCREEN_HEIGHT - captureRect->y;  // Adjust the height to fit within the window
+    if (captureRect->y + captureRect->h > canvasHeight) {  
+        captureRect->h = canvasHeight - captureRect->y;  // Adjust the height to fit within the window
     }
 }
\ No newline at end of file
@@ -9,6 +9,10 @@ int SDL_Start();
 // Create a window given the width and height
 SDL_Window* CreateWindow(int screen_width, int screen_height);
 
+// The size of the window created, where the drawings are
+int CanvasWidth();
+int CanvasHeight();
+
 // Create a renderer, where the drawings will be rendered
 SDL_Renderer* CreateRenderer(SDL_Window* window);
 
@@ -27,8 +31,8 @@ SDL_Texture* CreateTexture(SDL_Renderer* renderer, SDL_Surface* surface);
 // Save the surface as BMP, and write it given the filename
 int SaveBMP(SDL_Surface* surface, char* filename);
 
-// Save a drawing present on the renderer
-int SaveDrawing(SDL_Renderer* renderer, SDL_Rect captureRect, int angle, char* filename);
+// Save a drawing present on the renderer as a new layer of the layered file (see output.h)
+int SaveDrawing(SDL_Renderer* renderer, SDL_Rect captureRect, int angle);
 
 // Clear the canvas, and recolor it with the color given
 void ClearCanvas(SDL_Renderer *renderer, int r, int g, int b, int a);
@@ -91,6 +91,25 @@ class CanvasImage:
         except FileNotFoundError as e:
             print(e)
 
+    @classmethod
+    def fromImage(cls, image: Image) -> 'CanvasImage':
+        """
+        Create a CanvasImage from a PIL image already loaded
+
+        Parameters
+        -----------
+        image : Image
+            The image, a drawing cut from the layered file of the C program for example
+        """
+        canvasImage = CanvasImage()
+        canvasImage.originalImage = image
+        canvasImage.image = image
+        canvasImage.photoImage = ImageTk.PhotoImage(image)
+        canvasImage.width = image.width
+        canvasImage.height = image.height
+        canvasImage.angle = 0
+        return canvasImage
+
     #endregion Constructor
 
     def __repr__(self) -> str:
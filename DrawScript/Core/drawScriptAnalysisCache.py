@@ -0,0 +1,120 @@
+import hashlib
+
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("cache")
+
+
+class DrawScriptFunctionAnalysis:
+    """
+    What SemanticAnalyzer found in the body of a function, enough to skip the body when it is analyzed again.
+
+    The nodes of the body keep what the analysis put on them (the bindings of the locals, the types),
+    so an entry is only used for the same body node, the one DrawScriptParser.update_document kept.
+
+    Attributes
+    -----------
+    body : Block
+        The body of the function
+    line : int
+        The line of the function, the errors have the line numbers of this analysis
+    errors : list
+        The semantic errors found in the body
+    frame_size : int
+        The number of slots of the frame of the function
+    dependencies : dict
+        The type of the symbol ("number", "cursor", "function", "builtin") each name declared outside of the
+        function refers to, None for an undeclared name
+    free_nodes : list
+        The (node, name) of the nodes of the body bound to a symbol declared outside of the function,
+        they are bound again to the symbols of the new analysis
+    summary : list
+        How the body changes the types outside of the function: (port, type, sources) for each port (a variable
+        declared outside of the function, or None for the return of the function), the type that flows into it
+        from the body and the ports whose types flow into it
+    port_types : dict
+        The type each port resolved to in the analysis that recorded the entry, the types of the body depend on them
+    """
+
+    __slots__ = ('body', 'line', 'errors', 'frame_size', 'dependencies', 'free_nodes', 'summary', 'port_types')
+
+    def __init__(self, body, line):
+        self.body = body
+        self.line = line
+        self.errors = []
+        self.frame_size = 0
+        self.dependencies = {}
+        self.free_nodes = []
+        self.summary = []
+        self.port_types = {}
+
+
+class DrawScriptAnalysisCache:
+    """
+    In-memory cache of the analysis of the functions of a script, between two runs in the editor.
+    An entry is keyed by the hash of the code of the function, SemanticAnalyzer only analyzes again
+    the functions whose code changed, or that use a name that now refers to another kind of symbol.
+
+    Only the functions of the last analysis are kept.
+
+    Attributes
+    -----------
+    entries : dict
+        The DrawScriptFunctionAnalysis of each function, by key
+    hits : int
+        The number of functions whose body was not analyzed again
+    misses : int
+        The number of functions analyzed
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a new, empty, DrawScriptAnalysisCache.
+        """
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(code: str) -> str:
+        """
+        Returns the key of a function in the cache, the hash of its code
+
+        Parameters
+        -----------
+        code : str
+            The code of the function declaration, from 'function' to the closing brace
+        """
+        return hashlib.sha256(code.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the DrawScriptFunctionAnalysis of 'key', or None
+        """
+        return self.entries.get(key)
+
+    def store(self, key: str, entry: DrawScriptFunctionAnalysis) -> None:
+        """
+        Save the analysis of a function
+        """
+        self.entries[key] = entry
+
+    def discard(self, key: str) -> None:
+        """
+        Remove the entry of 'key', if there is one
+        """
+        self.entries.pop(key, None)
+
+    def retain(self, keys) -> None:
+        """
+        Remove the entries of the functions that are not in 'keys' anymore (deleted or edited)
+        """
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keys}
+
+    def report(self) -> str:
+        """
+        Returns the number of hits and misses, for the logs
+        """
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{self.hits} function(s) reused, {self.misses} analyzed ({rate:.0%} reused)"
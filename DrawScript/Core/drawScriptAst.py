@@ -0,0 +1,533 @@
+# Every type a node can have, the index in this tuple is the 'kind' of the node
+NODE_TYPES = (
+    'var_declaration', 'var_declaration_no_semi', 'cursor_declaration', 'if_statement', 'for_statement',
+    'while_statement', 'do_while_statement', 'function_declaration', 'return_statement', 'copy_statement',
+    'animate_statement', 'cursor_method', 'expression_statement', 'empty_statement', 'block',
+    'assignment_expr', 'binary_op', 'unary_op', 'call_expr', 'identifier', 'number', 'string', 'bool_literal',
+)
+
+(
+    VAR_DECLARATION, VAR_DECLARATION_NO_SEMI, CURSOR_DECLARATION, IF_STATEMENT, FOR_STATEMENT,
+    WHILE_STATEMENT, DO_WHILE_STATEMENT, FUNCTION_DECLARATION, RETURN_STATEMENT, COPY_STATEMENT,
+    ANIMATE_STATEMENT, CURSOR_METHOD, EXPRESSION_STATEMENT, EMPTY_STATEMENT, BLOCK,
+    ASSIGNMENT_EXPR, BINARY_OP, UNARY_OP, CALL_EXPR, IDENTIFIER, NUMBER, STRING, BOOL_LITERAL,
+) = range(len(NODE_TYPES))
+
+# Reverse lookup, from the name of a type to its kind
+NODE_KINDS = {node_type: kind for kind, node_type in enumerate(NODE_TYPES)}
+
+
+class DrawScriptNode:
+    """
+    Base class of the nodes of the AST built by DrawScriptParser.
+    Each node only stores its fields in slots, and its type as the class attribute 'kind' (see NODE_TYPES),
+    so the analyzer and the C emitter can dispatch with a table instead of comparing strings.
+
+    A node still reads like the dictionaries the parser used to return
+    (node["node_type"], node["line"]...), and to_dict returns that dictionary.
+
+    The nodes that declare or use a name also have a 'binding' slot, out of FIELDS,
+    where SemanticAnalyzer records the DrawScriptSymbol the name resolves to (None before the analysis).
+    The operations and the calls have a 'value_type' slot, out of FIELDS too, with the type SemanticAnalyzer
+    inferred for their result (see drawScriptTypes). The type of an identifier is the one of its binding.
+
+    Attributes
+    -----------
+    start : int
+        The offset in the source where the node starts
+    end : int
+        The offset in the source where the node ends
+    """
+
+    __slots__ = ('start', 'end')
+
+    kind = -1
+    node_type = None
+    # The fields of the node, in the order of the dictionaries
+    FIELDS = ()
+
+    def __getitem__(self, key: str):
+        if key == 'node_type':
+            return self.node_type
+        if key in self.FIELDS or key == 'start' or key == 'end':
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in self.FIELDS or key == 'start' or key == 'end':
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key == 'node_type' or key in self.FIELDS or key == 'start' or key == 'end'
+
+    def get(self, key: str, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self) -> tuple:
+        return ('node_type',) + self.FIELDS + ('start', 'end')
+
+    def children(self):
+        """
+        Yields the nodes directly under this node
+        """
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, DrawScriptNode):
+                yield value
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, DrawScriptNode):
+                        yield item
+
+    def replace(self, **fields):
+        """
+        Returns a copy of the node with some fields changed, the node itself is left as it is
+        (the nodes of a DrawScriptParseDocument are reused by the next parse, they can't be modified)
+
+        Parameters
+        -----------
+        **fields
+            The new value of each field to change
+        """
+        node_class = self.__class__
+        node = object.__new__(node_class)
+        for slot in NODE_SLOTS[node_class.kind]:
+            setattr(node, slot, fields[slot] if slot in fields else getattr(self, slot))
+        return node
+
+    def shift(self, delta: int, line_delta: int) -> None:
+        """
+        Move the node and the nodes under it by 'delta' characters and 'line_delta' lines,
+        used when an edit before the node moved it in the source
+
+        Parameters
+        -----------
+        delta : int
+            The number of characters added before the node (negative if removed)
+        line_delta : int
+            The number of lines added before the node (negative if removed)
+        """
+        # Walked with a stack, a statement can hold thousands of nested nodes
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.start += delta
+            node.end += delta
+            for field in node.FIELDS:
+                value = getattr(node, field)
+                if isinstance(value, DrawScriptNode):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack.extend(item for item in value if isinstance(item, DrawScriptNode))
+                elif field == 'line' and line_delta:
+                    node.line += line_delta
+
+    def to_dict(self) -> dict:
+        """
+        Returns the node and the nodes under it as dictionaries, like the ones DrawScriptParser used to return
+        """
+        node = {'node_type': self.node_type}
+        for field in self.FIELDS:
+            node[field] = to_dict(getattr(self, field))
+        node['start'] = self.start
+        node['end'] = self.end
+        return node
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DrawScriptNode):
+            if self.kind != other.kind:
+                return False
+            return all(getattr(self, key) == getattr(other, key) for key in self.FIELDS + ('start', 'end'))
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickled as a call to the constructor with the fields in order,
+        # it is much faster to load than the slot states pickle builds by default (see DrawScriptAstCache)
+        arguments = tuple(getattr(self, key) for key in self.FIELDS) + (self.start, self.end)
+        # What SemanticAnalyzer recorded (binding, value_type...) goes with the node, as the last arguments
+        # of the constructor, only when the node was analyzed
+        slots = ANALYSIS_SLOTS[self.kind]
+        if slots and getattr(self, slots[0], None) is not None:
+            arguments += tuple(getattr(self, slot) for slot in slots)
+        return self.__class__, arguments
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+
+def to_dict(value):
+    """
+    Returns 'value' with every node in it replaced by its dictionary (see DrawScriptNode.to_dict)
+
+    Parameters
+    -----------
+    value : DrawScriptNode | list | any
+        A node, a list of nodes (like the one returned by DrawScriptParser.parse), or a plain value
+    """
+    if isinstance(value, DrawScriptNode):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_dict(item) for item in value]
+    return value
+
+
+def from_dict(value):
+    """
+    Inverse of to_dict, returns 'value' with every dictionary that has a "node_type" replaced by its node
+
+    Parameters
+    -----------
+    value : dict | list | any
+        A node as a dictionary, a list of them, or a plain value
+    """
+    if isinstance(value, dict) and 'node_type' in value:
+        node_class = NODE_CLASSES[NODE_KINDS[value['node_type']]]
+        node = node_class(*(from_dict(value.get(field)) for field in node_class.FIELDS))
+        node.start = value.get('start', 0)
+        node.end = value.get('end', 0)
+        return node
+    if isinstance(value, list):
+        return [from_dict(item) for item in value]
+    return value
+
+
+# ----------------- Statements -------------------
+class VarDeclaration(DrawScriptNode):
+    """var name [: type] = expression;"""
+    __slots__ = ('name', 'type', 'expression', 'line', 'binding')
+    kind = VAR_DECLARATION
+    node_type = 'var_declaration'
+    FIELDS = ('name', 'type', 'expression', 'line')
+
+    def __init__(self, name, type, expression, line, start=0, end=0, binding=None):
+        self.name = name
+        self.type = type
+        self.expression = expression
+        self.line = line
+        self.binding = binding
+        self.start = start
+        self.end = end
+
+
+class VarDeclarationNoSemi(VarDeclaration):
+    """var name = expression, in the init part of a for loop"""
+    __slots__ = ()
+    kind = VAR_DECLARATION_NO_SEMI
+    node_type = 'var_declaration_no_semi'
+
+
+class CursorDeclaration(DrawScriptNode):
+    """Cursor name = Cursor(constructor_args);"""
+    __slots__ = ('name', 'constructor_args', 'line', 'binding')
+    kind = CURSOR_DECLARATION
+    node_type = 'cursor_declaration'
+    FIELDS = ('name', 'constructor_args', 'line')
+
+    def __init__(self, name, constructor_args, line, start=0, end=0, binding=None):
+        self.name = name
+        self.constructor_args = constructor_args
+        self.line = line
+        self.binding = binding
+        self.start = start
+        self.end = end
+
+
+class IfStatement(DrawScriptNode):
+    """if (condition) then_block [else else_block]"""
+    __slots__ = ('condition', 'then_block', 'else_block', 'line')
+    kind = IF_STATEMENT
+    node_type = 'if_statement'
+    FIELDS = __slots__
+
+    def __init__(self, condition, then_block, else_block, line, start=0, end=0):
+        self.condition = condition
+        self.then_block = then_block
+        self.else_block = else_block
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class ForStatement(DrawScriptNode):
+    """for (init; condition; increment) body"""
+    __slots__ = ('init', 'condition', 'increment', 'body', 'line')
+    kind = FOR_STATEMENT
+    node_type = 'for_statement'
+    FIELDS = __slots__
+
+    def __init__(self, init, condition, increment, body, line, start=0, end=0):
+        self.init = init
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class WhileStatement(DrawScriptNode):
+    """while (condition) body"""
+    __slots__ = ('condition', 'body', 'line')
+    kind = WHILE_STATEMENT
+    node_type = 'while_statement'
+    FIELDS = __slots__
+
+    def __init__(self, condition, body, line, start=0, end=0):
+        self.condition = condition
+        self.body = body
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class DoWhileStatement(WhileStatement):
+    """do body while (condition);"""
+    __slots__ = ()
+    kind = DO_WHILE_STATEMENT
+    node_type = 'do_while_statement'
+
+
+class FunctionDeclaration(DrawScriptNode):
+    """function name(params) body"""
+    __slots__ = ('name', 'params', 'body', 'line', 'binding', 'frame_size')
+    kind = FUNCTION_DECLARATION
+    node_type = 'function_declaration'
+    FIELDS = ('name', 'params', 'body', 'line')
+
+    def __init__(self, name, params, body, line, start=0, end=0, binding=None, frame_size=0):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.line = line
+        self.binding = binding
+        self.frame_size = frame_size
+        self.start = start
+        self.end = end
+
+
+class ReturnStatement(DrawScriptNode):
+    """return [expression];"""
+    __slots__ = ('expression', 'line')
+    kind = RETURN_STATEMENT
+    node_type = 'return_statement'
+    FIELDS = __slots__
+
+    def __init__(self, expression, line, start=0, end=0):
+        self.expression = expression
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class CopyStatement(DrawScriptNode):
+    """copy(source) to (destination);"""
+    __slots__ = ('source', 'destination', 'line')
+    kind = COPY_STATEMENT
+    node_type = 'copy_statement'
+    FIELDS = __slots__
+
+    def __init__(self, source, destination, line, start=0, end=0):
+        self.source = source
+        self.destination = destination
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class AnimateStatement(DrawScriptNode):
+    """animate(obj_or_expr1, expr2) body"""
+    __slots__ = ('obj_or_expr1', 'expr2', 'body', 'line')
+    kind = ANIMATE_STATEMENT
+    node_type = 'animate_statement'
+    FIELDS = __slots__
+
+    def __init__(self, obj_or_expr1, expr2, body, line, start=0, end=0):
+        self.obj_or_expr1 = obj_or_expr1
+        self.expr2 = expr2
+        self.body = body
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class CursorMethod(DrawScriptNode):
+    """cursor_name.method(arguments);"""
+    __slots__ = ('cursor_name', 'method', 'arguments', 'line', 'binding')
+    kind = CURSOR_METHOD
+    node_type = 'cursor_method'
+    FIELDS = ('cursor_name', 'method', 'arguments', 'line')
+
+    def __init__(self, cursor_name, method, arguments, line, start=0, end=0, binding=None):
+        self.cursor_name = cursor_name
+        self.method = method
+        self.arguments = arguments
+        self.line = line
+        self.binding = binding
+        self.start = start
+        self.end = end
+
+
+class ExpressionStatement(DrawScriptNode):
+    """expression;"""
+    __slots__ = ('expression', 'line')
+    kind = EXPRESSION_STATEMENT
+    node_type = 'expression_statement'
+    FIELDS = __slots__
+
+    def __init__(self, expression, line, start=0, end=0):
+        self.expression = expression
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class EmptyStatement(DrawScriptNode):
+    """;"""
+    __slots__ = ()
+    kind = EMPTY_STATEMENT
+    node_type = 'empty_statement'
+
+    def __init__(self, start=0, end=0):
+        self.start = start
+        self.end = end
+
+
+class Block(DrawScriptNode):
+    """{ statements }"""
+    __slots__ = ('statements', 'line')
+    kind = BLOCK
+    node_type = 'block'
+    FIELDS = __slots__
+
+    def __init__(self, statements, line, start=0, end=0):
+        self.statements = statements
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+# ----------------- Expressions -------------------
+class AssignmentExpr(DrawScriptNode):
+    """target = value"""
+    __slots__ = ('target', 'value', 'line')
+    kind = ASSIGNMENT_EXPR
+    node_type = 'assignment_expr'
+    FIELDS = __slots__
+
+    def __init__(self, target, value, line, start=0, end=0):
+        self.target = target
+        self.value = value
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class BinaryOp(DrawScriptNode):
+    """left op right"""
+    __slots__ = ('op', 'left', 'right', 'value_type')
+    kind = BINARY_OP
+    node_type = 'binary_op'
+    FIELDS = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right, start=0, end=0, value_type=None):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.value_type = value_type
+        self.start = start
+        self.end = end
+
+
+class UnaryOp(DrawScriptNode):
+    """op expr"""
+    __slots__ = ('op', 'expr', 'value_type')
+    kind = UNARY_OP
+    node_type = 'unary_op'
+    FIELDS = ('op', 'expr')
+
+    def __init__(self, op, expr, start=0, end=0, value_type=None):
+        self.op = op
+        self.expr = expr
+        self.value_type = value_type
+        self.start = start
+        self.end = end
+
+
+class CallExpr(DrawScriptNode):
+    """callee(arguments)"""
+    __slots__ = ('callee', 'arguments', 'value_type')
+    kind = CALL_EXPR
+    node_type = 'call_expr'
+    FIELDS = ('callee', 'arguments')
+
+    def __init__(self, callee, arguments, start=0, end=0, value_type=None):
+        self.callee = callee
+        self.arguments = arguments
+        self.value_type = value_type
+        self.start = start
+        self.end = end
+
+
+class Identifier(DrawScriptNode):
+    """A variable"""
+    __slots__ = ('value', 'binding')
+    kind = IDENTIFIER
+    node_type = 'identifier'
+    FIELDS = ('value',)
+
+    def __init__(self, value, start=0, end=0, binding=None):
+        self.value = value
+        self.binding = binding
+        self.start = start
+        self.end = end
+
+
+class Number(Identifier):
+    """An int or a float"""
+    __slots__ = ()
+    kind = NUMBER
+    node_type = 'number'
+
+
+class String(Identifier):
+    """A string literal"""
+    __slots__ = ()
+    kind = STRING
+    node_type = 'string'
+
+
+class BoolLiteral(Identifier):
+    """A boolean, "true" or "false" """
+    __slots__ = ()
+    kind = BOOL_LITERAL
+    node_type = 'bool_literal'
+
+
+# The class of each kind of node
+NODE_CLASSES = (
+    VarDeclaration, VarDeclarationNoSemi, CursorDeclaration, IfStatement, ForStatement,
+    WhileStatement, DoWhileStatement, FunctionDeclaration, ReturnStatement, CopyStatement,
+    AnimateStatement, CursorMethod, ExpressionStatement, EmptyStatement, Block,
+    AssignmentExpr, BinaryOp, UnaryOp, CallExpr, Identifier, Number, String, BoolLiteral,
+)
+
+# Every slot of each kind of node, with the ones of its base classes (see DrawScriptNode.replace)
+NODE_SLOTS = tuple(
+    tuple(slot for cls in node_class.__mro__[:-1] for slot in cls.__slots__) for node_class in NODE_CLASSES
+)
+
+# The slots of each kind of node that SemanticAnalyzer fills, out of FIELDS, in the order the constructor
+# takes them after start and end (see DrawScriptNode.__reduce__)
+ANALYSIS_SLOTS = tuple(
+    tuple(slot for slot in slots if slot not in node_class.FIELDS and slot not in ('start', 'end'))
+    for node_class, slots in zip(NODE_CLASSES, NODE_SLOTS)
+)
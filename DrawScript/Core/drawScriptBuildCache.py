@@ -0,0 +1,212 @@
+import glob
+import hashlib
+import os
+import shutil
+
+from DrawScript.Core.drawScriptDiskCache import DrawScriptDiskCache, DEFAULT_MAX_SIZE
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("cache")
+
+# Extension of the executables in the cache directory
+CACHE_EXTENSION = ".bin"
+
+# The key of the executable built or copied last, with its size and modification time, then the time of the last build
+INSTALLED_FILE = "build.installed"
+
+# The files of a gcc command that change what is built, besides the headers of the -I directories
+SOURCE_EXTENSIONS = (".c", ".h", ".a")
+
+
+class DrawScriptBuildCache(DrawScriptDiskCache):
+    """
+    On-disk cache of the executables built by gcc from the generated C code.
+    An entry is keyed by the hash of the gcc command and of every file it reads: main.c, the sources
+    of the libraries, and the headers of its -I directories (globals.h, the SDL headers...).
+    When the key is found the executable is reused and gcc is not run.
+
+    Each entry is a copy of an executable "<key>.bin" in 'directory' (see DrawScriptDiskCache).
+    The executable that gcc writes is only replaced by a copy of an entry when its key changed,
+    running the same script again copies nothing. 'hits' and 'misses' count the builds skipped and run.
+
+    Attributes
+    -----------
+    build_time : float
+        How long the last build took, in seconds, 0 when no build was measured yet
+    time_saved : float
+        The time of the builds skipped, in seconds, each one counted as long as the last build
+    """
+
+    EXTENSION = CACHE_EXTENSION
+    NAME = "Build cache"
+
+    def __init__(self, directory: str = None, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """
+        Constructs a new DrawScriptBuildCache, see DrawScriptDiskCache for the parameters.
+        """
+        super().__init__(directory, max_size)
+        self.build_time = 0.0
+        self.time_saved = 0.0
+        # The digest of each file already hashed, with the size and modification time it had,
+        # the unchanged files (the SDL headers...) are not read again
+        self.digests = {}
+
+    @staticmethod
+    def dependencies(command: list) -> list:
+        """
+        Returns the files read by the gcc 'command': its sources, and the headers of its -I directories
+
+        Parameters
+        -----------
+        command : list
+            The arguments of gcc
+        """
+        files = []
+        for argument in command:
+            if argument.startswith("-I"):
+                files.extend(sorted(glob.glob(os.path.join(argument[2:], "**", "*.h"), recursive=True)))
+            elif argument.endswith(SOURCE_EXTENSIONS):
+                files.append(argument)
+        return files
+
+    def digest(self, path: str) -> str:
+        """
+        Returns the hash of the content of the file at 'path', only read if it changed since the last time
+        """
+        stat = os.stat(path)
+        known = self.digests.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        with open(path, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        self.digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def key(self, command: list, excluded: tuple = ()) -> str:
+        """
+        Returns the key of the executable built by 'command', the hash of the command and of the files it reads
+
+        Parameters
+        -----------
+        command : list
+            The arguments of gcc
+        excluded : tuple
+            The names of the headers that the build doesn't read, even if they are in an -I directory
+        """
+        key = hashlib.sha256("\0".join(command).encode("utf-8", "surrogatepass"))
+        for path in self.dependencies(command):
+            if os.path.basename(path) in excluded:
+                continue
+            try:
+                key.update(f"\0{path}\0{self.digest(path)}".encode("utf-8", "surrogatepass"))
+            except OSError:
+                # A missing file makes gcc fail, the key only has to be different
+                key.update(f"\0{path}\0missing".encode("utf-8", "surrogatepass"))
+        return key.hexdigest()
+
+    def installed(self, executable: str) -> tuple:
+        """
+        Returns the (key, time of the last build) of 'executable', the key is None when it was not built or copied
+        by the cache, or changed since
+        """
+        try:
+            with open(os.path.join(self.directory, INSTALLED_FILE), "r") as file:
+                key, size, mtime, build_time = file.read().split()
+            stat = os.stat(executable)
+            if stat.st_size != int(size) or stat.st_mtime_ns != int(mtime):
+                return None, float(build_time)
+            return key, float(build_time)
+        except (OSError, ValueError):
+            return None, 0.0
+
+    def install(self, key: str, executable: str) -> None:
+        """
+        Remember that 'executable' is now the one of 'key'
+        """
+        stat = os.stat(executable)
+        with open(os.path.join(self.directory, INSTALLED_FILE), "w") as file:
+            file.write(f"{key} {stat.st_size} {stat.st_mtime_ns} {self.build_time}\n")
+
+    def load(self, key: str, executable: str) -> bool:
+        """
+        Put the executable of 'key' at 'executable' if it is in the cache
+
+        Parameters
+        -----------
+        key : str
+            The key of the build, see key
+        executable : str
+            Where gcc writes the executable
+
+        Returns
+        -----------
+        bool
+            True when the build can be skipped
+        """
+        installed, build_time = self.installed(executable)
+        if not self.build_time:
+            # The time of a build from an earlier session, to count the time saved
+            self.build_time = build_time
+        path = self.path(key)
+        if installed != key:
+            try:
+                shutil.copy(path, executable)
+                self.install(key, executable)
+            except FileNotFoundError:
+                self.misses += 1
+                return False
+            except OSError as e:
+                logger.warning("The executable %s can't be reused: %s", path, e)
+                self.misses += 1
+                return False
+
+        self.touch(path)
+        self.hits += 1
+        self.time_saved += self.build_time
+        logger.debug("Build cache hit %s", path)
+        return True
+
+    def store(self, key: str, executable: str, build_time: float) -> None:
+        """
+        Save the executable built for 'key', then remove the least recently used entries
+        if the cache is bigger than max_size
+
+        Parameters
+        -----------
+        key : str
+            The key of the build, see key
+        executable : str
+            The executable gcc wrote
+        build_time : float
+            How long the build took, in seconds
+        """
+        self.build_time = build_time
+        path = self.path(key)
+        # Written next to the entry then renamed, so a load never copies half of an entry
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            shutil.copy(executable, temporary_path)
+            os.replace(temporary_path, path)
+            self.install(key, executable)
+        except OSError as e:
+            logger.warning("The executable can't be saved in the cache: %s", e)
+            self.remove(temporary_path)
+            return
+
+        self.evict()
+
+    def report(self) -> str:
+        """
+        Returns the number of builds skipped and the time saved, like "3 hit(s), 1 miss(es) (75% hits), 12.4s saved"
+        """
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        return f"{self.hits} hit(s), {self.misses} miss(es) ({rate:.0f}% hits), {self.time_saved:.1f}s saved"
+
+    def clear(self) -> None:
+        """
+        Remove every entry, and what is known of the executable installed
+        """
+        super().clear()
+        self.remove(os.path.join(self.directory, INSTALLED_FILE))
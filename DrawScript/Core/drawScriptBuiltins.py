@@ -0,0 +1,110 @@
+from DrawScript.Core.drawScriptTypes import NUMERIC_TYPES
+
+# How the C code of a builtin is written (see DrawScriptDeserializerC.builtin_writers)
+DRAW = "draw"      # A shape, saved with its position as a layer of the layered file (see drawScriptLayers)
+COLOR = "color"    # setRGBA, the color of the next shapes, given to their C function when the code is written
+CALL = "call"      # A plain call of the C function
+
+# The box a shape covers, for DrawScriptOptimizer (see shape_bounds)
+CIRCLE = "circle"        # x, y, radius
+ELLIPSE = "ellipse"      # x, y, rx, ry
+RECTANGLE = "rectangle"  # x, y, width, height
+POINTS = "points"        # x0, y0, x1, y1...
+
+
+class DrawScriptBuiltin:
+    """
+    A builtin of DrawScript: a function ('drawCircle(x, y, radius)') or a method of the cursors ('c.move(x, y)').
+    Every builtin is described once in BUILTINS or CURSOR_BUILTINS, SemanticAnalyzer, DrawScriptDeserializerC
+    and DrawScriptOptimizer find it in BUILTIN_FUNCTIONS or CURSOR_METHODS.
+
+    Attributes
+    -----------
+    name : str
+        The name in the DrawScript
+    params : tuple
+        The names of the parameters
+    arity : int
+        The number of parameters
+    arg_types : tuple
+        The types (see drawScriptTypes) each argument can have, all the numbers by default
+    emit : str
+        How the C code is written: DRAW, COLOR or CALL
+    c_symbol : str
+        The C function, None when there is none yet (nothing is written)
+    c_args : tuple
+        The constants given to the C function after the arguments (the angle, the thickness...)
+    shape : str
+        The box the shape covers (CIRCLE, ELLIPSE, RECTANGLE, POINTS), None if it is not known
+    cursor : DrawScriptBuiltin
+        The method of the cursors that draws the same shape from the position of the cursor, None if there is none
+    """
+
+    __slots__ = ('name', 'params', 'arity', 'arg_types', 'emit', 'c_symbol', 'c_args', 'shape', 'cursor')
+
+    def __init__(self, name, params, emit=CALL, c_symbol=None, c_args=(), shape=None, cursor=None, arg_types=None):
+        self.name = name
+        self.params = params
+        self.arity = len(params)
+        self.arg_types = (NUMERIC_TYPES,) * len(params) if arg_types is None else arg_types
+        self.emit = emit
+        self.c_symbol = c_symbol
+        self.c_args = c_args
+        self.shape = shape
+        self.cursor = cursor
+
+    def __repr__(self) -> str:
+        return f"DrawScriptBuiltin({self.name!r}, {self.params!r}, {self.emit!r}, {self.c_symbol!r})"
+
+
+# The functions, with the method of the cursors that draws the same shape.
+# The C functions of the shapes take the renderer, the arguments, the c_args then the color (see shapes.h)
+BUILTINS = (
+    DrawScriptBuiltin("setRGBA", ("r", "g", "b", "a"), COLOR,
+                      cursor=DrawScriptBuiltin("setRGBA", ("r", "g", "b", "a"), CALL, "Cursor_SetRGBA")),
+    DrawScriptBuiltin("drawCircle", ("x", "y", "radius"), DRAW, "drawCircle", shape=CIRCLE,
+                      cursor=DrawScriptBuiltin("drawCircle", ("radius",), DRAW, "Cursor_DrawCircle")),
+    DrawScriptBuiltin("drawFilledCircle", ("x", "y", "radius"), DRAW, "drawFilledCircle", shape=CIRCLE,
+                      cursor=DrawScriptBuiltin("drawFilledCircle", ("radius",), DRAW, "Cursor_DrawFilledCircle")),
+    DrawScriptBuiltin("drawEllipse", ("x", "y", "rx", "ry"), DRAW, "drawEllipse", (0,), ELLIPSE,
+                      cursor=DrawScriptBuiltin("drawEllipse", ("rx", "ry"), DRAW, "Cursor_DrawEllipse")),
+    DrawScriptBuiltin("drawFilledEllipse", ("x", "y", "rx", "ry"), DRAW, "drawFilledEllipse", (0,), ELLIPSE,
+                      cursor=DrawScriptBuiltin("drawFilledEllipse", ("rx", "ry"), DRAW, "Cursor_DrawFilledEllipse")),
+    DrawScriptBuiltin("drawRoundedRectangle", ("x", "y", "width", "height", "radius"), DRAW, "drawRoundedRectangle",
+                      (0,), RECTANGLE,
+                      cursor=DrawScriptBuiltin("drawRoundedRectangle", ("width", "height", "radius"), DRAW,
+                                               "Cursor_DrawRoundedRectangle")),
+    DrawScriptBuiltin("drawBox", ("x", "y", "width", "height"), DRAW, "drawBox", (0,), RECTANGLE,
+                      cursor=DrawScriptBuiltin("drawBox", ("width", "height"), DRAW, "Cursor_DrawBox")),
+    DrawScriptBuiltin("drawRoundedBox", ("x", "y", "width", "height", "radius"), DRAW, "drawRoundedBox", (0,), RECTANGLE,
+                      cursor=DrawScriptBuiltin("drawRoundedBox", ("width", "height", "radius"), DRAW,
+                                               "Cursor_DrawRoundedBox")),
+    # The thickness of the segment is 1
+    DrawScriptBuiltin("drawSegment", ("x0", "y0", "x1", "y1"), DRAW, "drawSegment", (1,), POINTS,
+                      cursor=DrawScriptBuiltin("drawSegment", ("length",), DRAW, "Cursor_DrawSegment")),
+    DrawScriptBuiltin("drawTriangle", ("x0", "y0", "x1", "y1", "x2", "y2"), DRAW, "drawTriangle", (0,), POINTS,
+                      cursor=DrawScriptBuiltin("drawTriangle", ("x0", "y0", "x1", "y1"), DRAW, "Cursor_DrawTriangle")),
+    DrawScriptBuiltin("drawRectangle", ("x", "y", "width", "height"), DRAW, "drawRectangle", (0,), RECTANGLE,
+                      cursor=DrawScriptBuiltin("drawRectangle", ("width", "height"), DRAW, "Cursor_DrawRectangle")),
+    # No C function draws a point yet
+    DrawScriptBuiltin("drawPoint", ("x", "y"), DRAW, shape=POINTS,
+                      cursor=DrawScriptBuiltin("drawPoint", (), DRAW)),
+)
+
+# The methods of the cursors that are not a function
+CURSOR_BUILTINS = (
+    DrawScriptBuiltin("move", ("x", "y"), CALL, "Cursor_Move"),
+    DrawScriptBuiltin("rotate", ("degrees",), CALL, "Cursor_Rotate"),
+    DrawScriptBuiltin("setThickness", ("thickness",), CALL, "Cursor_SetThickness"),
+)
+
+# The builtins by name, looked up once per call
+BUILTIN_FUNCTIONS = {builtin.name: builtin for builtin in BUILTINS}
+CURSOR_METHODS = {
+    method.name: method
+    for method in (*(builtin.cursor for builtin in BUILTINS if builtin.cursor is not None), *CURSOR_BUILTINS)
+}
+
+# The names of the functions and of the methods that draw a shape
+DRAWING_FUNCTIONS = frozenset(name for name, builtin in BUILTIN_FUNCTIONS.items() if builtin.emit == DRAW)
+DRAWING_METHODS = frozenset(name for name, method in CURSOR_METHODS.items() if method.emit == DRAW)
@@ -0,0 +1,176 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
+from DrawScript.Core.drawScriptParser import DrawScriptParser
+from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("checker")
+
+# The phases timed for each script, in the order they run
+PHASES = ("read", "tokenize", "parse", "analyze")
+
+# Number of files given to a worker at once, sending them one by one costs more than checking a small script
+FILES_PER_TASK = 16
+
+
+class DrawScriptCheckResult:
+    """
+    What DrawScriptChecker found in one script: the errors of the parser and of the semantic analysis,
+    like ScriptEditorController.executeCode, but without touching the canvas or calling gcc.
+
+    Attributes
+    -----------
+    path : str
+        The file of the script, None for a script given as a string
+    read_error : str
+        Why the file couldn't be read, None if it was
+    internal_error : str
+        The exception raised by the compiler itself while checking the script (a bug of the compiler, not of the script),
+        None if there was none. The other files are still checked
+    parse_errors : list
+        The errors returned by DrawScriptParser.parse, dictionaries with "message" and "line"
+    semantic_errors : list
+        The errors returned by SemanticAnalyzer.analyze, only analyzed when there are no parse errors
+    times : dict
+        The time in seconds of each phase (see PHASES), 0 for a phase that didn't run
+    """
+
+    __slots__ = ('path', 'read_error', 'internal_error', 'parse_errors', 'semantic_errors', 'times')
+
+    def __init__(self, path=None):
+        self.path = path
+        self.read_error = None
+        self.internal_error = None
+        self.parse_errors = []
+        self.semantic_errors = []
+        self.times = dict.fromkeys(PHASES, 0.0)
+
+    @property
+    def ok(self) -> bool:
+        """
+        True when the script has no error
+        """
+        return (self.read_error is None and self.internal_error is None
+                and not self.parse_errors and not self.semantic_errors)
+
+    def messages(self) -> list:
+        """
+        Returns the errors as lines "<path>:<line>: <message>", like the compilers write them
+        """
+        name = self.path if self.path is not None else "<script>"
+        if self.read_error is not None:
+            return [f"{name}: {self.read_error}"]
+        lines = [f"{name}:{error['line']}: {error['message']}" for error in self.parse_errors]
+        lines.extend(f"{name}: {error}" for error in self.semantic_errors)
+        if self.internal_error is not None:
+            lines.append(f"{name}: internal error: {self.internal_error}")
+        return lines
+
+    def __repr__(self) -> str:
+        return (f"DrawScriptCheckResult({self.path!r}, {len(self.parse_errors)} parse error(s), "
+                f"{len(self.semantic_errors)} semantic error(s))")
+
+
+def check(code: str, path: str = None) -> DrawScriptCheckResult:
+    """
+    Check a script: tokenizer, parser and semantic analysis, without generating any C
+
+    Parameters
+    -----------
+    code : str
+        The DrawScript code
+    path : str
+        The file the code comes from, for the messages
+
+    Returns
+    -----------
+    DrawScriptCheckResult
+        The errors and the time of each phase, and the internal_error when the compiler itself failed
+    """
+    result = DrawScriptCheckResult(path)
+    times = result.times
+
+    try:
+        start = time.perf_counter()
+        tokens, _ = DrawScriptTokenizer().tokenize(code)
+        parsed = time.perf_counter()
+        times["tokenize"] = parsed - start
+
+        ast_nodes, result.parse_errors = DrawScriptParser(tokens).parse()
+        analyzed = time.perf_counter()
+        times["parse"] = analyzed - parsed
+
+        # Like in the editor, the semantic analysis is only done on a script without parsing errors
+        if not result.parse_errors:
+            result.semantic_errors = SemanticAnalyzer().analyze(ast_nodes)
+            times["analyze"] = time.perf_counter() - analyzed
+    except Exception as e:
+        # A bug of the compiler on one script must not stop the check of all the others
+        logger.exception("The compiler failed on %s", path if path is not None else "<script>")
+        result.internal_error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def check_file(path: str) -> DrawScriptCheckResult:
+    """
+    Read a file and check it like check does, a file that can't be read gives a result with its read_error
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            code = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        result = DrawScriptCheckResult(path)
+        result.read_error = str(e)
+        return result
+    read_time = time.perf_counter() - start
+
+    result = check(code, path)
+    result.times["read"] = read_time
+    return result
+
+
+def check_files(paths, workers: int = None, executor: ProcessPoolExecutor = None) -> list:
+    """
+    Check many files, in a pool of processes when there are several files and several workers
+
+    Parameters
+    -----------
+    paths : list
+        The paths of the files
+    workers : int
+        The number of processes, the number of CPUs if None
+    executor : ProcessPoolExecutor
+        A pool of processes to reuse between calls
+
+    Returns
+    -----------
+    list
+        The DrawScriptCheckResult of each file, in the order of 'paths'
+    """
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if executor is None and (workers <= 1 or len(paths) <= 1):
+        return [check_file(path) for path in paths]
+
+    chunksize = max(1, min(FILES_PER_TASK, len(paths) // (workers * 4)))
+    logger.info("Checking %d files in %d processes", len(paths), workers)
+    if executor is not None:
+        return list(executor.map(check_file, paths, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(check_file, paths, chunksize=chunksize))
+
+
+def total_times(results) -> dict:
+    """
+    Returns the time of each phase (see PHASES) added up over 'results'
+    """
+    totals = dict.fromkeys(PHASES, 0.0)
+    for result in results:
+        for phase, seconds in result.times.items():
+            totals[phase] += seconds
+    return totals
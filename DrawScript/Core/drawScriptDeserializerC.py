@@ -1,6 +1,17 @@
 from Controller.canvasController import CanvasController
 
-from DrawScript.Core.globals import GLOBAL_SYMBOLS_FUNCTIONS, GLOBAL_SYMBOLS_CURSOR_FUNCTIONS, GLOBAL_SYMBOLS_VARIABLES
+from DrawScript.Core.globals import GLOBAL_SYMBOLS_VARIABLES
+from DrawScript.Core.drawScriptBuiltins import BUILTIN_FUNCTIONS, CURSOR_METHODS, DRAW, COLOR, CALL
+from DrawScript.Core.drawScriptLogger import get_logger
+from DrawScript.Core.drawScriptTypes import INT, FLOAT, BOOL, C_TYPES
+from DrawScript.Core.drawScriptAst import (
+    VAR_DECLARATION, VAR_DECLARATION_NO_SEMI, CURSOR_DECLARATION, IF_STATEMENT, FOR_STATEMENT, WHILE_STATEMENT,
+    DO_WHILE_STATEMENT,
+    CURSOR_METHOD, EXPRESSION_STATEMENT, BLOCK, BINARY_OP, UNARY_OP, CALL_EXPR, IDENTIFIER, NUMBER, BOOL_LITERAL,
+    NODE_TYPES,
+)
+
+logger = get_logger("deserializer")
 
 class DrawScriptDeserializerC:
     def __init__(self, ast_nodes, canvasController: CanvasController = None):
@@ -12,6 +23,26 @@ class DrawScriptDeserializerC:
         self.code = ""
         self.current_color = [0, 0, 0, 255]  # Default color is black (in RGBA)
         self.CC = canvasController
+        # Deserializer of each kind of node, indexed by the 'kind' of the node
+        self.visitors = [self.deserialize_unhandled] * len(NODE_TYPES)
+        self.visitors[BINARY_OP] = self.deserialize_binary_op
+        self.visitors[BOOL_LITERAL] = self.deserialize_bool_literal
+        self.visitors[CURSOR_DECLARATION] = self.deserialize_cursor_declaration
+        self.visitors[CURSOR_METHOD] = self.deserialize_cursor_method
+        self.visitors[CALL_EXPR] = self.deserialize_call_expr
+        self.visitors[EXPRESSION_STATEMENT] = self.deserialize_expression_statement
+        self.visitors[IDENTIFIER] = self.deserialize_identifier
+        self.visitors[IF_STATEMENT] = self.deserialize_if_statement
+        self.visitors[NUMBER] = self.deserialize_number
+        self.visitors[FOR_STATEMENT] = self.deserialize_for_statement
+        self.visitors[VAR_DECLARATION] = self.deserialize_var_declaration_statement
+        self.visitors[WHILE_STATEMENT] = self.deserialize_while_statement
+        self.visitors[DO_WHILE_STATEMENT] = self.deserialize_do_while_statement
+        # A block on its own, left by DrawScriptOptimizer in place of an if or a do-while whose condition is constant
+        self.visitors[BLOCK] = self.deserialize_block
+        # Writer of the C code of the builtin functions and of the methods of the cursors, by their 'emit'
+        self.builtin_writers = {DRAW: self.write_draw, COLOR: self.write_color, CALL: self.write_call}
+        self.cursor_writers = {DRAW: self.write_cursor_draw, CALL: self.write_cursor_call}
 
     def write_c(self):
         """
@@ -28,14 +59,14 @@ class DrawScriptDeserializerC:
         # Insert variable declarations
         variables = ""  
         for ast_node in self.ast_nodes:
-            if ast_node["node_type"] == "var_declaration":
+            if ast_node.kind == VAR_DECLARATION:
                 variables += self.deserialize_node_type(ast_node) 
         bodyCode = bodyCode.replace("// INSERT VARIABLES", variables)
 
         # Insert drawing operations or other statements
         drawings = ""
         for ast_node in self.ast_nodes:
-            if ast_node["node_type"] != "var_declaration":
+            if ast_node.kind != VAR_DECLARATION:
                 drawings += self.deserialize_node_type(ast_node)
         bodyCode = bodyCode.replace("// INSERT DRAWINGS", drawings)
 
@@ -49,11 +80,8 @@ class DrawScriptDeserializerC:
         If a CanvasController is available, the width and height are taken from its current view.
         Otherwise, default values are used.
         """
-        if self.CC is not None:
-            globals_code = (f'#define SCREEN_WIDTH {self.CC.view.winfo_width()}\n'
-                            f'#define SCREEN_HEIGHT {self.CC.view.winfo_height()}\n')
-        else:
-            globals_code = f'#define SCREEN_WIDTH 800\n#define SCREEN_HEIGHT 600\n'
+        width, height = self.canvas_size(self.CC)
+        globals_code = f'#define SCREEN_WIDTH {width}\n#define SCREEN_HEIGHT {height}\n'
 
         base_code = (
             f'#ifndef GLOBALS_H\n'
@@ -68,67 +96,116 @@ class DrawScriptDeserializerC:
         with open("DrawLibrary/C/Utils/globals.h", "w") as file:
             file.write(base_code)
 
+    @staticmethod
+    def canvas_size(canvasController: CanvasController = None):
+        """
+        Returns the (width, height) of the canvas written in 'globals.h',
+        the size of the view of the CanvasController if there is one, 800x600 otherwise.
+        """
+        if canvasController is not None:
+            return canvasController.view.winfo_width(), canvasController.view.winfo_height()
+        return 800, 600
+
+    @staticmethod
+    def expression_type(ast_node):
+        """
+        Returns the type SemanticAnalyzer inferred for an expression (see drawScriptTypes),
+        None if it was not analyzed or has no type.
+        """
+        kind = ast_node.kind
+        if kind == NUMBER:
+            return INT if isinstance(ast_node.value, int) else FLOAT
+        if kind == BOOL_LITERAL:
+            return BOOL
+        if kind == IDENTIFIER:
+            binding = ast_node.binding
+            return None if binding is None else binding.value_type
+        if kind == BINARY_OP or kind == UNARY_OP or kind == CALL_EXPR:
+            return ast_node.value_type
+        return None
+
     def detect_expression_type(self, ast_node):
         """
-        Attempts to detect the resulting type of an expression based on its node type.
-        For division or binary operations, it defaults to 'float'.
+        Returns the C type of an expression, from the type inferred by SemanticAnalyzer.
+        Without it (an AST that was not analyzed), guesses it from the node type:
+        'float' for binary operations, nothing for the rest.
         """
-        if ast_node["node_type"] == "binary_op" and ast_node["op"] == '/':
-            return "float"
-        elif ast_node["node_type"] == "binary_op":
+        value_type = self.expression_type(ast_node)
+        if value_type is not None:
+            return C_TYPES[value_type]
+        if ast_node.kind == BINARY_OP:
             return "float"
-        
         return ""
+
+    def as_int(self, ast_node, code):
+        """
+        Returns the C code of an expression given where an int is expected,
+        with a cast only if the expression is not known to be an int already.
+        """
+        if self.expression_type(ast_node) in (INT, BOOL):
+            return code
+        return f'(int){code}'
         
     def deserialize_node_type(self, ast_node):
         """
-        Dispatch method: selects the deserialization function based on 'node_type'.
+        Dispatch method: selects the deserialization function based on the 'kind' of the node, through visitors.
         Returns a string representing the C code equivalent of the provided AST node.
         """
-        if ast_node["node_type"] == "binary_op":
-            return self.deserialize_binary_op(ast_node)
-        elif ast_node["node_type"] == "bool_literal":
-            return ast_node["value"]
-        elif ast_node["node_type"] == "cursor_declaration":
-            return self.deserialize_cursor_declaration(ast_node)
-        elif ast_node["node_type"] == "cursor_method":
-            return self.deserialize_cursor_method(ast_node)
-        elif ast_node["node_type"] == "call_expr":
-            return self.deserialize_call_expr(ast_node)
-        elif ast_node["node_type"] == "expression_statement":
-            return self.deserialize_expression_statement(ast_node)
-        elif ast_node["node_type"] == "identifier":
-            # If the identifier is in the global symbol table, use its mapped value; otherwise, return as is
-            if ast_node["value"] in GLOBAL_SYMBOLS_VARIABLES:
-                return GLOBAL_SYMBOLS_VARIABLES[ast_node["value"]]
-            return ast_node["value"]
-        elif ast_node["node_type"] == "if_statement":
-            return self.deserialize_if_statement(ast_node)
-        elif ast_node["node_type"] == "number":
-            return str(ast_node["value"])
-        elif ast_node["node_type"] == "for_statement":
-            return self.deserialize_for_statement(ast_node)
-        elif ast_node["node_type"] == "var_declaration":
-            return self.deserialize_var_declaration(ast_node) + "\n"
-        elif ast_node["node_type"] == "while_statement":
-            return self.deserialize_while_statement(ast_node)
-        elif ast_node["node_type"] == "do_while_statement":
-            return self.deserialize_do_while_statement(ast_node)
-
-        else:
-            # If the node type isn't handled, print it for debugging purposes
-            print(ast_node["node_type"])
+        return self.visitors[ast_node.kind](ast_node)
 
+    def deserialize_unhandled(self, ast_node):
+        """
+        Visitor of the nodes that have no C code.
+        """
+        # If the node type isn't handled, report it for debugging purposes
+        logger.debug("Unhandled node type: %s", ast_node.node_type)
         return ""
+
+    def deserialize_bool_literal(self, ast_node):
+        """
+        Returns the boolean as is ("true" or "false").
+        """
+        return ast_node.value
+
+    def deserialize_identifier(self, ast_node):
+        """
+        Returns the C name of the symbol the identifier was bound to by SemanticAnalyzer
+        (the mapped value for the global variables).
+        """
+        binding = ast_node.binding
+        if binding is not None:
+            return binding.c_name
+        # Not analyzed (an AST built without SemanticAnalyzer), the name is looked up in the global symbol table
+        return GLOBAL_SYMBOLS_VARIABLES.get(ast_node.value, ast_node.value)
+
+    @staticmethod
+    def c_name(ast_node, name):
+        """
+        Returns the C name of the symbol a declaration or a cursor method was bound to, 'name' if it was not analyzed.
+        """
+        binding = ast_node.binding
+        return name if binding is None else binding.c_name
+
+    def deserialize_number(self, ast_node):
+        """
+        Returns the number as it is written in C.
+        """
+        return str(ast_node.value)
+
+    def deserialize_var_declaration_statement(self, ast_node):
+        """
+        Generates C code for a variable declaration used as a statement, on its own line.
+        """
+        return self.deserialize_var_declaration(ast_node) + "\n"
     
     def deserialize_cursor_declaration(self, ast_node):
         """
         Generates C code to declare and construct a Cursor object using the provided constructor arguments.
         Example: Cursor* c = Cursor_Constructor(x, y);
         """
-        constructor_args = ast_node["constructor_args"]
-        return (f'Cursor* {ast_node["name"]} = '
-                f'Cursor_Constructor({constructor_args[0]["value"]}, {constructor_args[1]["value"]});\n')
+        constructor_args = ast_node.constructor_args
+        return (f'Cursor* {self.c_name(ast_node, ast_node.name)} = '
+                f'Cursor_Constructor({constructor_args[0].value}, {constructor_args[1].value});\n')
 
     def deserialize_function_declaration(self, ast_node):
         """
@@ -136,46 +213,58 @@ class DrawScriptDeserializerC:
         Generates a C function declaration with given parameters and body.
         """
         params = ""
-        for i in range(len(ast_node["params"])):
-            params += f'{ast_node["params"][i]}'
-            if i != len(ast_node["params"]) - 1:
+        for i in range(len(ast_node.params)):
+            params += f'{ast_node.params[i]}'
+            if i != len(ast_node.params) - 1:
                 params += ","
-        body = self.deserialize_block(ast_node["body"])
-        return f'void {ast_node["name"]}({params}){body}'
+        body = self.deserialize_block(ast_node.body)
+        return f'void {ast_node.name}({params}){body}'
 
     def deserialize_for_statement(self, ast_node):
         """
         Generates C code for a for loop:
-        - The initializer is treated as a variable declaration
+        - The initializer is treated as a variable declaration, an int unless SemanticAnalyzer found it is a float,
+          or is the assignment of a variable declared before the loop, or is empty
         - The condition and increment are treated as binary expressions
         - The body is parsed as a block
         """
-        init = self.deserialize_var_declaration(ast_node["init"])
-        condition = self.deserialize_binary_op(ast_node["condition"])
-        increment = self.deserialize_binary_op(ast_node["increment"])
-        body = self.deserialize_block(ast_node["body"])
-        return f'for (int {init} {condition}; {increment})\n{body}'
+        init_node = ast_node.init
+        if init_node is None:
+            init = ";"
+        elif init_node.kind == VAR_DECLARATION_NO_SEMI:
+            init = self.deserialize_var_declaration(init_node, default_type="int")
+        else:
+            init = f"{self.deserialize_node_type(init_node)};"
+        # The condition can be a literal once folded by DrawScriptOptimizer
+        condition = self.deserialize_node_type(ast_node.condition)
+        increment = self.deserialize_node_type(ast_node.increment)
+        body = self.deserialize_block(ast_node.body)
+        return f'for ({init} {condition}; {increment})\n{body}'
 
-    def deserialize_var_declaration(self, ast_node):
+    def deserialize_var_declaration(self, ast_node, default_type=""):
         """
         Generates C code for a variable declaration, e.g., 'int x = 5;'.
-        If the variable type is not specified, detect the type from the expression (defaults to float).
-        """
-        var_type = ""
-        if ast_node["type"] is not None:
-            var_type = f'{ast_node["type"]}'
-        expression = self.deserialize_node_type(ast_node["expression"])
-        if var_type == "":
-            var_type = self.detect_expression_type(ast_node["expression"])
-        return f'{var_type} {ast_node["name"]} = {expression};'
+        The type is the one SemanticAnalyzer inferred for the variable.
+        Without it, the type given by the parser, or the one detected from the expression (defaults to float),
+        or 'default_type' when none is found.
+        """
+        binding = ast_node.binding
+        if binding is not None and binding.value_type is not None:
+            var_type = C_TYPES[binding.value_type]
+        elif ast_node.type is not None:
+            var_type = f'{ast_node.type}'
+        else:
+            var_type = self.detect_expression_type(ast_node.expression) or default_type
+        expression = self.deserialize_node_type(ast_node.expression)
+        return f'{var_type} {self.c_name(ast_node, ast_node.name)} = {expression};'
     
     def deserialize_binary_op(self, ast_node):
         """
         Generates C code for a binary operation, e.g., '(x + y)'.
         """
-        left = self.deserialize_node_type(ast_node["left"])
-        right = self.deserialize_node_type(ast_node["right"])
-        op = ast_node["op"]
+        left = self.deserialize_node_type(ast_node.left)
+        right = self.deserialize_node_type(ast_node.right)
+        op = ast_node.op
         return f"({left} {op} {right})"
     
     def deserialize_if_statement(self, ast_node):
@@ -188,9 +277,11 @@ class DrawScriptDeserializerC:
                 ...
             }
         """
-        condition = f'({self.deserialize_node_type(ast_node["condition"])})'
-        then_block = self.deserialize_block(ast_node["then_block"])
-        else_block = self.deserialize_block(ast_node["else_block"])
+        condition = f'({self.deserialize_node_type(ast_node.condition)})'
+        then_block = self.deserialize_block(ast_node.then_block)
+        if ast_node.else_block is None:
+            return f'if {condition} {then_block}'
+        else_block = self.deserialize_block(ast_node.else_block)
         return f'if {condition} {then_block} else\n{else_block}'
     
     def deserialize_while_statement(self, ast_node):
@@ -201,8 +292,8 @@ class DrawScriptDeserializerC:
                 ...
             }
         """
-        condition = self.deserialize_node_type(ast_node["condition"])
-        body = self.deserialize_block(ast_node["body"])
+        condition = self.deserialize_node_type(ast_node.condition)
+        body = self.deserialize_block(ast_node.body)
         return f'while({condition})\n{body}'
 
     def deserialize_do_while_statement(self, ast_node):
@@ -214,8 +305,8 @@ class DrawScriptDeserializerC:
             } while(condition);
         A semicolon is appended at the end of the block.
         """
-        condition = self.deserialize_node_type(ast_node["condition"])
-        body = self.deserialize_block(ast_node["body"])
+        condition = self.deserialize_node_type(ast_node.condition)
+        body = self.deserialize_block(ast_node.body)
         return f'do\n{body} while({condition});\n'
                 
     def deserialize_block(self, ast_node):
@@ -230,7 +321,7 @@ class DrawScriptDeserializerC:
         Iterates through a list of statement nodes, deserializing each in turn.
         """
         deserialize = ""
-        for statement in ast_node["statements"]:
+        for statement in ast_node.statements:
             deserialize += self.deserialize_node_type(statement)
         return deserialize
     
@@ -238,7 +329,7 @@ class DrawScriptDeserializerC:
         """
         Deserializes an expression statement, ensuring it ends with a semicolon in C.
         """
-        expression = self.deserialize_node_type(ast_node["expression"])
+        expression = self.deserialize_node_type(ast_node.expression)
         return f'{expression};\n'
     
     def deserialize_call_expr(self, ast_node):
@@ -247,148 +338,75 @@ class DrawScriptDeserializerC:
         special code is emitted to handle drawing operations (including file output).
         Otherwise, returns the default function call.
         """
-        deserialized = ""
+        callee = ast_node.callee
+        arguments = [self.deserialize_node_type(argument) for argument in ast_node.arguments]
 
-        callee = ast_node["callee"]
-        
-        arguments = []
-        arguments_deserialized = ""
-        for i in range(len(ast_node["arguments"])):
-            argument_deserialized = self.deserialize_node_type(ast_node["arguments"][i])
-            arguments.append(argument_deserialized)
-            arguments_deserialized += argument_deserialized
-            if i != len(ast_node["arguments"]) - 1:
-                arguments_deserialized += ", "
+        # The builtins are written by the writer of their 'emit' (see drawScriptBuiltins)
+        builtin = BUILTIN_FUNCTIONS.get(callee)
+        if builtin is not None:
+            return self.builtin_writers[builtin.emit](builtin, ast_node, arguments[:builtin.arity])
 
         # Default function call: callee(arg1, arg2, ...)
-        deserialized = f'{callee}({arguments_deserialized})'
-
-        # Check if it's a known function from GLOBAL_SYMBOLS_FUNCTIONS,
-        # which typically corresponds to drawing operations
-        if callee in GLOBAL_SYMBOLS_FUNCTIONS:
-
-            def format_code(callee_name, *params):
-                """
-                Helper function that generates the code snippet for drawing operations,
-                including saving the output to a BMP file and printing coordinates.
-                """
-                base_code = (
-                    f'snprintf(filename, sizeof(filename), "Data/Outputs/drawing_%d.bmp", drawing_index);\n'
-                    f'{callee_name}(renderer, {", ".join(map(str, params))}, filename);\n'
-                    f'fprintf(file, "%d,%d\\n", (int){params[0]}, (int){params[1]});\n'
-                    f'drawing_index++;\n'
-                )
-                return base_code
-
-            deserialized = ""
-            r, g, b, a = self.current_color
-
-            # Depending on the function name, generate appropriate calls
-            if callee == "drawCircle":
-                x, y, radius = arguments[:3]
-                deserialized += format_code("drawCircle", x, y, radius, r, g, b, a)
-            elif callee == "drawFilledCircle":
-                x, y, radius = arguments[:3]
-                deserialized += format_code("drawFilledCircle", x, y, radius, r, g, b, a)
-            elif callee == "drawEllipse":
-                x, y, rx, ry = arguments[:4]
-                deserialized += format_code("drawEllipse", x, y, rx, ry, 0, r, g, b, a)
-            elif callee == "drawFilledEllipse":
-                x, y, rx, ry = arguments[:4]
-                deserialized += format_code("drawFilledEllipse", x, y, rx, ry, 0, r, g, b, a)
-            elif callee == "drawRoundedRectangle":
-                x, y, width, height, radius = arguments[:5]
-                deserialized += format_code("drawRoundedRectangle", x, y, width, height, radius, 0, r, g, b, a)
-            elif callee == "drawBox":
-                x, y, width, height = arguments[:4]
-                deserialized += format_code("drawBox", x, y, width, height, 0, r, g, b, a)
-            elif callee == "drawRoundedBox":
-                x, y, width, height, radius = arguments[:5]
-                deserialized += format_code("drawRoundedBox", x, y, width, height, radius, 0, r, g, b, a)
-            elif callee == "drawSegment":
-                x0, y0, x1, y1 = arguments[:4]
-                deserialized += format_code("drawSegment", x0, y0, x1, y1, 1, r, g, b, a)
-            elif callee == "drawTriangle":
-                x0, y0, x1, y1, x2, y2 = arguments[:6]
-                deserialized += format_code("drawTriangle", x0, y0, x1, y1, x2, y2, 0, r, g, b, a)
-            elif callee == "drawRectangle":
-                x, y, width, height = arguments[:4]
-                deserialized += format_code("drawRectangle", x, y, width, height, 0, r, g, b, a)
-            elif callee == "setRGBA":
-                r, g, b, a = arguments[:4]
-                # Ensure the RGBA components do not exceed 255, and invert if over that limit
-                r, g, b, a = [255 - int(value) if int(value) > 255 else int(value) for value in (r, g, b, a)]
-                self.current_color = [r, g, b, a]
-            else:
-                # If the function is recognized but not specifically handled above, just print its name
-                print(callee)
-
-        return deserialized
-    
+        return f'{callee}({", ".join(arguments)})'
+
+    def write_draw(self, builtin, ast_node, arguments):
+        """
+        Generates the C code of a drawing function: the shape is saved as a layer of the layered file (see output.h),
+        with its position (the first two arguments, as int).
+        The C function takes the renderer, the arguments, the constants of the builtin then the current color.
+        """
+        if builtin.c_symbol is None:
+            logger.debug("Unhandled function: %s", builtin.name)
+            return ""
+        nodes = ast_node.arguments
+        x, y = self.as_int(nodes[0], arguments[0]), self.as_int(nodes[1], arguments[1])
+        params = ", ".join(map(str, (*arguments, *builtin.c_args, *self.current_color)))
+        return (
+            f'{builtin.c_symbol}(renderer, {params});\n'
+            f'Output_Position({x}, {y});\n'
+        )
+
+    def write_color(self, builtin, ast_node, arguments):
+        """
+        setRGBA writes no C code, the color is given to the next drawing functions
+        """
+        # Ensure the RGBA components do not exceed 255, and invert if over that limit
+        self.current_color = [255 - int(value) if int(value) > 255 else int(value) for value in arguments]
+        return ""
+
+    def write_call(self, builtin, ast_node, arguments):
+        """
+        Generates a plain call of the C function of a builtin
+        """
+        return f'{builtin.c_symbol}({", ".join(arguments)})'
+
     def deserialize_cursor_method(self, ast_node):
         """
         Generates C code for cursor methods (e.g., moving or drawing with a cursor).
         If the method is a known drawing method, it includes code to save the output and print coordinates.
         """
-        cursor_name = ast_node["cursor_name"]
-        method = ast_node["method"]
-        
-        arguments = []
-        for i in range(len(ast_node["arguments"])):
-            argument_deserialized = self.deserialize_node_type(ast_node["arguments"][i])
-            arguments.append(argument_deserialized)
-
-        def format_code(callee_name, *params):
-            """
-            Helper function for cursor drawing operations, similar to the one in deserialize_call_expr.
-            """
-            base_code = (
-                f'snprintf(filename, sizeof(filename), "Data/Outputs/drawing_%d.bmp", drawing_index);\n'
-                f'{callee_name}({cursor_name}, renderer, {", ".join(map(str, params))}, filename);\n'
-                f'fprintf(file, "%d,%d\\n", (int){cursor_name}->x, (int){cursor_name}->y);\n'
-                f'drawing_index++;\n'
-            )
-            return base_code
-
-        deserialized = ""
-        if method == "move":
-            # Moves the cursor by dx, dy
-            deserialized += f'Cursor_Move({cursor_name}, {arguments[0]}, {arguments[1]});\n'
-        elif method == "rotate":
-            deserialized += f'Cursor_Rotate({cursor_name}, {arguments[0]});\n'
-        elif method == "drawCircle":
-            radius = arguments[0]
-            deserialized += format_code("Cursor_DrawCircle", radius)
-        elif method == "drawFilledCircle":
-            radius = arguments[0]
-            deserialized += format_code("Cursor_DrawFilledCircle", radius)
-        elif method == "drawEllipse":
-            rx, ry = arguments[:2]
-            deserialized += format_code("Cursor_DrawEllipse", rx, ry)
-        elif method == "drawFilledEllipse":
-            rx, ry = arguments[:2]
-            deserialized += format_code("Cursor_DrawFilledEllipse", rx, ry)
-        elif method == "drawRoundedRectangle":
-            width, height, radius = arguments[:3]
-            deserialized += format_code("Cursor_DrawRoundedRectangle", width, height, radius)
-        elif method == "drawBox":
-            width, height = arguments[:2]
-            deserialized += format_code("Cursor_DrawBox", width, height)
-        elif method == "drawRoundedBox":
-            width, height, radius = arguments[:3]
-            deserialized += format_code("Cursor_DrawRoundedBox", width, height, radius)
-        elif method == "drawRectangle":
-            width, height = arguments[:2]
-            deserialized += format_code("Cursor_DrawRectangle", width, height)
-        elif method == "drawSegment":
-            length = arguments[0]
-            deserialized += format_code("Cursor_DrawSegment", length)
-        elif method == "drawTriangle":
-            x0, y0, x1, y1 = arguments[:4]
-            deserialized += format_code("Cursor_DrawTriangle", x0, y0, x1, y1)
-        elif method == "setRGBA":
-            r, g, b, a = arguments[:4]
-            r, g, b, a = [255 - int(value) if int(value) > 255 else int(value) for value in (r, g, b, a)]
-            deserialized += format_code("Cursor_SetRGBA", r, g, b, a)
-
-        return deserialized
+        method = CURSOR_METHODS.get(ast_node.method)
+        if method is None:
+            return ""
+        cursor_name = self.c_name(ast_node, ast_node.cursor_name)
+        arguments = [self.deserialize_node_type(argument) for argument in ast_node.arguments[:method.arity]]
+        return self.cursor_writers[method.emit](method, cursor_name, arguments)
+
+    def write_cursor_draw(self, method, cursor_name, arguments):
+        """
+        Generates the C code of a drawing method of a cursor, like write_draw,
+        the position written is the one of the cursor.
+        """
+        if method.c_symbol is None:
+            return ""
+        params = ", ".join(map(str, (*arguments, *method.c_args)))
+        return (
+            f'{method.c_symbol}({cursor_name}, renderer, {params});\n'
+            f'Output_Position((int){cursor_name}->x, (int){cursor_name}->y);\n'
+        )
+
+    def write_cursor_call(self, method, cursor_name, arguments):
+        """
+        Generates the call of the C function of a method of a cursor that doesn't draw (move, rotate, setRGBA...)
+        """
+        return f'{method.c_symbol}({", ".join((cursor_name, *arguments))});\n'
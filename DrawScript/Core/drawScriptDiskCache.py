@@ -0,0 +1,123 @@
+import os
+
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("cache")
+
+# The caches stop growing at this size, the entries used the longest time ago are removed first
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class DrawScriptDiskCache:
+    """
+    The directory of a cache on disk, shared by DrawScriptAstCache and DrawScriptBuildCache:
+    each entry is a file "<key><EXTENSION>" in 'directory'. The modification time of an entry is its last use,
+    when the cache is bigger than 'max_size' the least recently used entries are removed.
+    Each cache writes and reads its entries itself, and calls touch on a hit and evict after a store.
+
+    Attributes
+    -----------
+    directory : str
+        The directory where the entries are written
+    max_size : int
+        The maximum size in bytes of all the entries together
+    hits : int
+        The number of entries found
+    misses : int
+        The number of entries that were not in the cache
+    """
+
+    # Extension of the entries in the directory, set by each cache: the other files there are left alone
+    EXTENSION = None
+    # Name of the cache in the logs
+    NAME = "Cache"
+
+    def __init__(self, directory: str = None, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """
+        Constructs a new DrawScriptDiskCache.
+
+        Parameters
+        -----------
+        directory : str
+            The directory where the entries are written, "Data/Cache" in the working directory if None
+        max_size : int
+            The maximum size in bytes of all the entries together
+        """
+        if directory is None:
+            directory = os.path.join(os.getcwd(), "Data", "Cache")
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> str:
+        """
+        Returns the path of the entry of 'key'
+        """
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """
+        Make the entry at 'path' the most recently used
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def entries(self) -> list:
+        """
+        Returns the (last use, size, path) of every entry, the least recently used first
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as files:
+                for file in files:
+                    if not file.name.endswith(self.EXTENSION):
+                        continue
+                    try:
+                        stat = file.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, file.path))
+        except FileNotFoundError:
+            return []
+        entries.sort()
+        return entries
+
+    def size(self) -> int:
+        """
+        Returns the size in bytes of all the entries
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is not bigger than max_size
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self.remove(path)
+            total -= size
+            logger.debug("%s evicted %s", self.NAME, path)
+
+    def clear(self) -> None:
+        """
+        Remove every entry
+        """
+        for _, _, path in self.entries():
+            self.remove(path)
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """
+        Remove a file of the cache, if it is still there
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
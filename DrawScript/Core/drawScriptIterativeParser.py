@@ -0,0 +1,575 @@
+from DrawScript.Exceptions.parserError import ParserError
+from DrawScript.Core.drawScriptParser import DrawScriptParser, BINARY_PRECEDENCE, ASSIGNMENT_PRECEDENCE, logger
+from DrawScript.Core.drawScriptAst import (
+    VarDeclaration, VarDeclarationNoSemi, CursorDeclaration, IfStatement, ForStatement, WhileStatement,
+    DoWhileStatement, FunctionDeclaration, ReturnStatement, CopyStatement, AnimateStatement, CursorMethod,
+    ExpressionStatement, Block, BinaryOp, UnaryOp, CallExpr, Identifier, Number, String, BoolLiteral,
+)
+from DrawScript.Core.drawScriptAst import NUMBER, BOOL_LITERAL
+
+# Operators that can be placed before an operand
+UNARY_OPERATORS = ('!', '+', '-')
+
+
+class DrawScriptIterativeParser(DrawScriptParser):
+    """
+    A DrawScriptParser that does not recurse, so the nesting depth of the blocks and of the
+    parentheses is only limited by the memory and not by the recursion limit of python.
+
+    Every rule that contains other rules (a block, an if, a parenthesized expression...) is written
+    as a generator: instead of calling the sub rule, it yields the generator of the sub rule
+    and receives its node back. run() keeps these generators on an explicit stack.
+    The errors raised by a rule are thrown into the rule below it on the stack, so parse_statement
+    catches them and calls recover exactly like the recursive parser does,
+    and the context_stack is pushed and popped at the same moments.
+
+    The expressions are parsed with the precedence table of the Pratt parser, using a stack
+    of operands and a stack of operators. The AST nodes and the errors are the same as DrawScriptParser.
+
+    Only the parsing is free of the recursion limit: the stages after it (SemanticAnalyzer, DrawScriptOptimizer,
+    to_dict, the pickle of DrawScriptAstCache) still walk the AST recursively, and raise a RecursionError
+    on the trees nested a few thousand levels deep that this parser builds.
+    """
+
+    def run(self, rule):
+        """
+        Runs the generator 'rule' and the generators it yields until it returns, then returns its node
+
+        Parameters
+        -----------
+        rule : generator
+            The generator of a rule, like iter_statement()
+        """
+        stack = [rule]
+        value = None
+        error = None
+        while stack:
+            generator = stack[-1]
+            try:
+                if error is not None:
+                    # The sub rule failed, the error goes on in the rule that called it
+                    error, thrown = None, error
+                    sub_rule = generator.throw(thrown)
+                else:
+                    sub_rule = generator.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                error = e
+                continue
+            stack.append(sub_rule)
+            value = None
+        return value
+
+    # ----------------- Parsing statements -------------------
+    def parse_statement(self):
+        return self.run(self.iter_statement())
+
+    def parse_expression(self):
+        return self.run(self.iter_expression())
+
+    def iter_statement(self): # same as DrawScriptParser.parse_statement
+        start_line = self.current_line()
+        start_index = self.current_token_index
+
+        try:
+            if self.match('DELIMITER', ';'):
+                return self.parse_empty_statement()
+            return (yield self.statement_rule())
+        except ParserError as e:
+            self.recover(e, start_line, start_index)
+            return None
+
+    def statement_rule(self): # same choice as DrawScriptParser._parse_statement_internal, but returns the generator of the rule (the empty statement is handled by iter_statement)
+        if self.match('KEYWORD', 'var'):
+            return self.iter_var_declaration()
+
+        if self.match('KEYWORD', 'Cursor'):
+            return self.iter_cursor_declaration()
+
+        if self.match('KEYWORD', 'if'):
+            return self.iter_if_statement()
+
+        if self.match('KEYWORD', 'for'):
+            return self.iter_for_statement()
+
+        if self.match('KEYWORD', 'while'):
+            return self.iter_while_statement()
+
+        if self.match('KEYWORD', 'do'):
+            return self.iter_do_while_statement()
+
+        if self.match('KEYWORD', 'function'):
+            return self.iter_function_declaration()
+
+        if self.match('KEYWORD', 'return'):
+            return self.iter_return_statement()
+
+        if self.match('KEYWORD', 'copy'):
+            return self.iter_copy_statement()
+
+        if self.match('KEYWORD', 'animate'):
+            return self.iter_animate_statement()
+
+        if self.looks_like_cursor_method():
+            return self.iter_cursor_method_statement()
+
+        # Otherwise => expression statement
+        return self.iter_expression_statement()
+
+    def iter_var_declaration(self): # same as DrawScriptParser.parse_var_declaration
+        line_num = self.current_line()
+        start = self.current_start()
+        if not self.match('KEYWORD', 'var'):
+            raise ParserError("Déclaration de variable invalide : mot-clé 'var' attendu avant ton identificateur.")
+        self.consume('KEYWORD', 'var')
+        if not self.match('IDENTIFIER'):
+            raise ParserError("Déclaration de variable invalide : identifiant attendu après 'var'.")
+        id_token = self.consume('IDENTIFIER')
+        var_name = id_token['value']
+        var_type = None
+
+        if self.match('DELIMITER', ':'):
+            self.consume('DELIMITER', ':')
+            type_token = self.consume('IDENTIFIER')
+            var_type = type_token['value']
+
+        if not self.match('ASSIGN', '='):
+            raise ParserError(f"Déclaration invalide pour '{var_name}' : signe '=' attendu.")
+        self.consume('ASSIGN', '=')
+
+        expr = yield self.iter_expression()
+        if expr.kind == NUMBER:
+            var_type = "int" if isinstance(expr.value, int) else "float"
+        elif expr.kind == BOOL_LITERAL:
+            var_type = "bool"
+
+        if not self.match('DELIMITER', ';'):
+            raise ParserError(f"Point-virgule manquant après la déclaration de '{var_name}'.")
+        self.consume('DELIMITER', ';')
+
+        return self.spanned(VarDeclaration(
+            name=var_name,
+            type=var_type,
+            expression=expr,
+            line=line_num
+        ), start)
+
+    def iter_if_statement(self): # same as DrawScriptParser.parse_if_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("if", line_num)
+
+        self.consume('KEYWORD', 'if')
+        self.consume('DELIMITER', '(')
+        condition = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+        then_block = yield self.iter_block()
+
+        else_block = None
+        if self.match('KEYWORD', 'else'):
+            self.consume('KEYWORD', 'else')
+            else_block = yield self.iter_block()
+
+        self.popContext()
+
+        return self.spanned(IfStatement(
+            condition=condition,
+            then_block=then_block,
+            else_block=else_block,
+            line=line_num
+        ), start)
+
+    def iter_for_statement(self): # same as DrawScriptParser.parse_for_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("for", line_num)
+
+        self.consume('KEYWORD', 'for')
+        self.consume('DELIMITER', '(')
+        init_node = yield self.iter_for_init()
+        self.consume('DELIMITER', ';')
+        condition_node = yield self.iter_expression()
+        self.consume('DELIMITER', ';')
+        increment_node = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+
+        body_node = yield self.iter_block()
+
+        self.popContext()
+
+        return self.spanned(ForStatement(
+            init=init_node,
+            condition=condition_node,
+            increment=increment_node,
+            body=body_node,
+            line=line_num
+        ), start)
+
+    def iter_while_statement(self): # same as DrawScriptParser.parse_while_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("while", line_num)
+
+        self.consume('KEYWORD', 'while')
+        self.consume('DELIMITER', '(')
+        condition_node = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+        body_node = yield self.iter_block()
+
+        self.popContext()
+
+        return self.spanned(WhileStatement(
+            condition=condition_node,
+            body=body_node,
+            line=line_num
+        ), start)
+
+    def iter_do_while_statement(self): # same as DrawScriptParser.parse_do_while_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("do-while", line_num)
+
+        self.consume('KEYWORD', 'do')
+        body_node = yield self.iter_block()
+        self.consume('KEYWORD', 'while')
+        self.consume('DELIMITER', '(')
+        condition_node = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+        self.consume('DELIMITER', ';')
+
+        self.popContext()
+
+        return self.spanned(DoWhileStatement(
+            condition=condition_node,
+            body=body_node,
+            line=line_num
+        ), start)
+
+    def iter_function_declaration(self): # same as DrawScriptParser.parse_function_declaration
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("function", line_num)
+
+        self.consume('KEYWORD', 'function')
+        func_name = self.consume('IDENTIFIER')
+        self.consume('DELIMITER', '(')
+        self.consume('DELIMITER', ')')
+        func_body = yield self.iter_block()
+
+        self.popContext()
+
+        return self.spanned(FunctionDeclaration(
+            name=func_name["value"],
+            params=...,
+            body=func_body,
+            line=line_num
+        ), start)
+
+    def iter_block(self): # same as DrawScriptParser.parse_block
+        line_num = self.current_line()
+        start = self.current_start()
+        self.pushContext("block", line_num)
+        self.consume('DELIMITER', '{')
+        statements = []
+        while not self.is_at_end() and not self.match('DELIMITER', '}'):
+            stmt = yield self.iter_statement()
+            if self.log_statements:
+                logger.debug("Parsed statement: %s", stmt)
+            if stmt:
+                statements.append(stmt)
+        self.consume('DELIMITER', '}')
+        self.popContext()
+        return self.spanned(Block(
+            statements=statements,
+            line=line_num
+        ), start)
+
+    def iter_expression_statement(self): # same as DrawScriptParser.parse_expression_statement
+        line_num = self.current_line()
+        start = self.current_start()
+
+        expr = yield self.iter_expression()
+        self.consume('DELIMITER', ';')
+        return self.spanned(ExpressionStatement(
+            expression=expr,
+            line=line_num
+        ), start)
+
+    def iter_for_init(self): # same as DrawScriptParser.parse_for_init
+        if self.match('KEYWORD', 'var'):
+            return (yield self.iter_var_declaration_no_semi())
+
+        if self.match('IDENTIFIER'):
+            return (yield self.iter_expression())
+
+        return None
+
+    def iter_var_declaration_no_semi(self): # same as DrawScriptParser.parse_var_declaration_no_semi
+        line_num = self.current_line()
+        start = self.current_start()
+        self.consume('KEYWORD', 'var')
+
+        id_token = self.consume('IDENTIFIER')
+        var_name = id_token['value']
+        var_type = None
+
+        self.consume('ASSIGN', '=')
+        expr = yield self.iter_expression()
+
+        return self.spanned(VarDeclarationNoSemi(
+            name=var_name,
+            type=var_type,
+            expression=expr,
+            line=line_num
+        ), start)
+
+    def iter_argument_list(self): # same as DrawScriptParser.parse_argument_list
+        args = [(yield self.iter_expression())]
+
+        while self.match('DELIMITER', ','):
+            self.consume('DELIMITER', ',')
+            args.append((yield self.iter_expression()))
+
+        return args
+
+    def iter_return_statement(self): # same as DrawScriptParser.parse_return_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.consume('KEYWORD', 'return')
+
+        expr = None
+        if self.match('DELIMITER', ';'):
+            self.consume('DELIMITER', ';')
+        else:
+            expr = yield self.iter_expression()
+            self.consume('DELIMITER', ';')
+        return self.spanned(ReturnStatement(
+            expression=expr,
+            line=line_num
+        ), start)
+
+    def iter_copy_statement(self): # same as DrawScriptParser.parse_copy_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.consume('KEYWORD', 'copy')
+        self.consume('DELIMITER', '(')
+        expr1 = yield self.iter_expression()
+        self.consume('DELIMITER', ',')
+        expr2 = yield self.iter_expression()
+        self.consume('DELIMITER', ',')
+        expr3 = yield self.iter_expression()
+        self.consume('DELIMITER', ',')
+        expr4 = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+
+        self.consume('KEYWORD', 'to')
+
+        self.consume('DELIMITER', '(')
+        expr5 = yield self.iter_expression()
+        self.consume('DELIMITER', ',')
+        expr6 = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+        self.consume('DELIMITER', ';')
+
+        return self.spanned(CopyStatement(
+            source=[expr1, expr2, expr3, expr4],
+            destination=[expr5, expr6],
+            line=line_num
+        ), start)
+
+    def iter_animate_statement(self): # same as DrawScriptParser.parse_animate_statement
+        line_num = self.current_line()
+        start = self.current_start()
+        self.consume('KEYWORD', 'animate')
+        self.consume('DELIMITER', '(')
+        expr1 = yield self.iter_expression()
+        self.consume('DELIMITER', ',')
+        expr2 = yield self.iter_expression()
+        self.consume('DELIMITER', ')')
+        body_node = yield self.iter_block()
+        return self.spanned(AnimateStatement(
+            obj_or_expr1=expr1,
+            expr2=expr2,
+            body=body_node,
+            line=line_num
+        ), start)
+
+    def iter_cursor_declaration(self): # same as DrawScriptParser.parse_cursor_declaration
+        line_num = self.current_line()
+        start = self.current_start()
+
+        self.consume('KEYWORD', 'Cursor')
+        id_token = self.consume('IDENTIFIER')
+        var_name = id_token['value']
+        self.consume('ASSIGN', '=')
+
+        if not self.match('KEYWORD', 'Cursor'):
+            raise ParserError("Initialisation de curseur invalide : 'cursor(...)' attendu.")
+        self.consume('KEYWORD', 'Cursor')
+        self.consume('DELIMITER', '(')
+
+        args = []
+        if not self.match('DELIMITER', ')'):
+            args = yield self.iter_argument_list()
+
+        self.consume('DELIMITER', ')')
+        self.consume('DELIMITER', ';')
+
+        return self.spanned(CursorDeclaration(
+            name=var_name,
+            constructor_args=args,
+            line=line_num
+        ), start)
+
+    def iter_cursor_method_statement(self): # same as DrawScriptParser.parse_cursor_method_statement
+        line_num = self.current_line()
+        start = self.current_start()
+
+        obj_token = self.consume('IDENTIFIER')
+        cursor_name = obj_token['value']
+        self.consume('ACCESS_OPERATOR', '.')
+        method_token = self.consume('IDENTIFIER')
+        method_name = method_token['value']
+        self.consume('DELIMITER', '(')
+
+        args = []
+        if not self.match('DELIMITER', ')'):
+            args = yield self.iter_argument_list()
+
+        self.consume('DELIMITER', ')')
+        self.consume('DELIMITER', ';')
+
+        return self.spanned(CursorMethod(
+            cursor_name=cursor_name,
+            method=method_name,
+            arguments=args,
+            line=line_num
+        ), start)
+
+    # ----------------- Parsing expressions -------------------
+    def iter_expression(self): # parses a whole expression with a stack of operands and a stack of operators.
+        """
+        Same result as DrawScriptParser.parse_pratt_expr(ASSIGNMENT_PRECEDENCE).
+        An operator is only applied when the next operator binds less tightly (or as tightly,
+        the operators are left associative, except '=' which is right associative),
+        so a long expression like 1 + 2 + ... + 1000 does not nest any call.
+        Only the parentheses and the arguments of a call yield a sub expression
+        """
+        types = self.token_types
+        values = self.token_values
+        count = len(types)
+        operands = []
+        # (operator, precedence, start of its left operand)
+        operators = []
+
+        while True:
+            # 1) The unary operators in front of the operand, applied once the operand is parsed
+            unary = []
+            while self.current_token_index < count and types[self.current_token_index] == 'OPERATOR' \
+                    and values[self.current_token_index] in UNARY_OPERATORS:
+                unary.append((values[self.current_token_index], self.current_start()))
+                self.current_token_index += 1
+
+            # 2) The operand, a number or a variable is read directly from the token lists
+            index = self.current_token_index
+            token_type = types[index] if index < count else None
+            if token_type == 'NUMBER' or (token_type == 'IDENTIFIER' and not (
+                    index + 1 < count and types[index + 1] == 'DELIMITER' and values[index + 1] == '(')):
+                operand = (Number if token_type == 'NUMBER' else Identifier)(
+                    values[index], self.token_starts[index], self.token_ends[index]
+                )
+                self.current_token_index = index + 1
+            else:
+                operand = yield from self.iter_primary_expr()
+            for op, start in reversed(unary):
+                operand = self.spanned(UnaryOp(
+                    op=op,
+                    expr=operand
+                ), start)
+            operands.append(operand)
+
+            # 3) The operator that follows, if any
+            index = self.current_token_index
+            precedence = None
+            if index < count:
+                if types[index] == 'OPERATOR':
+                    precedence = BINARY_PRECEDENCE.get(values[index])
+                elif types[index] == 'ASSIGN' and values[index] == '=':
+                    precedence = ASSIGNMENT_PRECEDENCE
+
+            # The operators that bind at least as tightly are applied before going on
+            # ('=' being right associative, a '=' on the stack is kept when another '=' comes)
+            while operators and operators[-1][1] >= (precedence if precedence is not None else -1) \
+                    and not (precedence == ASSIGNMENT_PRECEDENCE and operators[-1][1] == ASSIGNMENT_PRECEDENCE):
+                self.reduce_operator(operands, operators)
+
+            if precedence is None:
+                # No operator left, every operator was applied
+                return operands[0]
+
+            operators.append((values[index], precedence, operands[-1].start))
+            self.current_token_index += 1
+
+    def reduce_operator(self, operands, operators): # replaces the last two operands by the binary_op node of the last operator
+        op, _, start = operators.pop()
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(self.spanned(BinaryOp(
+            op=op,
+            left=left,
+            right=right
+        ), start))
+
+    def iter_primary_expr(self): # same as DrawScriptParser.parse_primary_expr, used with 'yield from'
+        start = self.current_start()
+        if self.match('DELIMITER', '('):
+            self.consume('DELIMITER', '(')
+            expr = yield self.iter_expression()
+            self.consume('DELIMITER', ')')
+            return expr
+
+        if self.match('NUMBER'):
+            token = self.consume('NUMBER')
+            return self.spanned(Number(
+                value=token["value"]
+            ), start)
+
+        if self.match('BOOLEAN', 'true'):
+            self.consume('BOOLEAN', 'true')
+            return self.spanned(BoolLiteral(value="true"), start)
+        if self.match('BOOLEAN', 'false'):
+            self.consume('BOOLEAN', 'false')
+            return self.spanned(BoolLiteral(value="false"), start)
+
+        if self.match('STRING'):
+            token = self.consume('STRING')
+            return self.spanned(String(
+                value=token["value"]
+            ), start)
+
+        if self.match('IDENTIFIER'):
+            id_token = self.consume('IDENTIFIER')
+            node = self.spanned(Identifier(
+                value=id_token["value"]
+            ), start)
+
+            if self.match('DELIMITER', '('):
+                self.consume('DELIMITER', '(')
+                args = []
+                if not self.match('DELIMITER', ')'):
+                    args = yield self.iter_argument_list()
+                self.consume('DELIMITER', ')')
+                node = self.spanned(CallExpr(
+                    callee=id_token["value"],
+                    arguments=args
+                ), start)
+
+            return node
+
+        raise ParserError("Expression primaire invalide.")
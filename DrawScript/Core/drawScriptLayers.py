@@ -0,0 +1,221 @@
+import mmap
+import os
+import struct
+
+# The file written by the C program (see DrawLibrary/C/Utils/output.h), in Data/Outputs
+LAYERS_FILE = "drawings.layers"
+LAYERS_MAGIC = b"DSLY"
+LAYERS_VERSION = 2
+
+# "DSLY", version, number of layers
+HEADER = struct.Struct("<4s2i")
+# x, y, width, height, angle, offset of the pixels in the file
+LAYER = struct.Struct("<5iq")
+
+# The stream sent by the C program on its standard output instead of the file, when it's run with --stream
+STREAM_MAGIC = b"DSST"
+STREAM_VERSION = 1
+# "DSST", version
+STREAM_HEADER = struct.Struct("<4si")
+# kind, x, y, width, height, angle, a FRAME_LAYER is followed by its pixels
+FRAME = struct.Struct("<6i")
+FRAME_END = 0
+FRAME_LAYER = 1
+
+
+class DrawScriptLayer:
+    """
+    A drawing of the C program in the layered file: where it goes on the canvas and where its pixels are.
+
+    Attributes
+    -----------
+    x, y : int
+        The position given by the program
+    width, height : int
+        The size of the part of the canvas captured, 0 when the shape is out of the canvas
+    angle : int
+        The rotation to apply to the drawing, in degrees
+    offset : int
+        Where its pixels are in the file, RGBA, row by row
+    """
+
+    __slots__ = ('x', 'y', 'width', 'height', 'angle', 'offset')
+
+    def __init__(self, x, y, width, height, angle, offset):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.angle = angle
+        self.offset = offset
+
+    @property
+    def empty(self) -> bool:
+        """
+        True when the drawing has no pixel on the canvas
+        """
+        return self.width <= 0 or self.height <= 0
+
+    @property
+    def size(self) -> tuple:
+        """
+        The (width, height) of its pixels, like PIL.Image takes them
+        """
+        return self.width, self.height
+
+    def __repr__(self) -> str:
+        return f"DrawScriptLayer(({self.x}, {self.y}), size={self.size}, angle={self.angle})"
+
+
+class DrawScriptLayers:
+    """
+    The content of the layered file: the drawings in the order they were drawn, and their pixels.
+    When it's read from a file, the file is mapped in memory: close it (or use it with 'with')
+    once the pixels are no longer used.
+
+    Attributes
+    -----------
+    layers : list
+        The DrawScriptLayer of each drawing
+    """
+
+    __slots__ = ('layers', '_view', '_mapping')
+
+    def __init__(self, layers, view, mapping=None):
+        self.layers = layers
+        self._view = view
+        self._mapping = mapping
+
+    def pixels(self, layer: DrawScriptLayer) -> memoryview:
+        """
+        The pixels of 'layer', RGBA, row by row, without copying them
+
+        Parameters
+        -----------
+        layer : DrawScriptLayer
+            A layer of this file
+        """
+        return self._view[layer.offset:layer.offset + layer.width * layer.height * 4]
+
+    def close(self) -> None:
+        """
+        Release the file, the views given by 'pixels' must no longer be used
+        """
+        self._view.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> 'DrawScriptLayers':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def parse_layers(data, mapping=None) -> DrawScriptLayers:
+    """
+    Read the index of a layered file, the pixels are not copied
+
+    Parameters
+    -----------
+    data : bytes
+        The content of the file, or any object with the buffer protocol
+    mapping : mmap.mmap
+        The mapping 'data' comes from, closed with the DrawScriptLayers
+
+    Raises
+    -----------
+    ValueError
+        If it's not a layered file, or it is truncated
+    """
+    view = memoryview(data)
+    try:
+        layers = read_index(view)
+    except ValueError:
+        # The mapping can only be closed once the view is released
+        view.release()
+        raise
+    return DrawScriptLayers(layers, view, mapping)
+
+
+def read_index(view: memoryview) -> list:
+    """
+    Read the header and the index of a layered file, returns the DrawScriptLayer of each drawing (see parse_layers)
+    """
+    size = len(view)
+    if size < HEADER.size:
+        raise ValueError("Layered file truncated.")
+    magic, version, layer_count = HEADER.unpack_from(view, 0)
+    if magic != LAYERS_MAGIC or version != LAYERS_VERSION:
+        raise ValueError(f"Not a layered file of version {LAYERS_VERSION}.")
+    end = HEADER.size + LAYER.size * layer_count
+    if size < end:
+        raise ValueError("Layered file truncated.")
+
+    with view[HEADER.size:end] as index:
+        layers = [DrawScriptLayer(*values) for values in LAYER.iter_unpack(index)]
+    for layer in layers:
+        if not layer.empty and layer.offset + layer.width * layer.height * 4 > size:
+            raise ValueError("Layered file truncated.")
+    return layers
+
+
+def read_layers(path: str) -> DrawScriptLayers:
+    """
+    Map the layered file at 'path' in memory and read its index (see parse_layers),
+    the pixels are only read from the file when they are used
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < HEADER.size:
+            raise ValueError("Layered file truncated.")
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return parse_layers(mapping, mapping)
+    except ValueError:
+        mapping.close()
+        raise
+
+
+def read_exactly(stream, size: int) -> bytes:
+    """
+    Read 'size' bytes of 'stream', waiting for them as long as the stream is open
+
+    Raises
+    -----------
+    ValueError
+        If the stream ends before
+    """
+    data = stream.read(size)
+    if data is None or len(data) < size:
+        raise ValueError("Stream interrupted.")
+    return data
+
+
+def read_stream(stream):
+    """
+    Read the frames of the stream as they arrive, yields each drawing: (DrawScriptLayer, pixels),
+    the pixels are RGBA, row by row, with the white background already transparent
+
+    Parameters
+    -----------
+    stream : BinaryIO
+        The standard output of the C program, opened in binary
+
+    Raises
+    -----------
+    ValueError
+        If it's not a stream of drawings, or it ends before its FRAME_END (the program stopped)
+    """
+    magic, version = STREAM_HEADER.unpack(read_exactly(stream, STREAM_HEADER.size))
+    if magic != STREAM_MAGIC or version != STREAM_VERSION:
+        raise ValueError(f"Not a stream of drawings of version {STREAM_VERSION}.")
+
+    while True:
+        kind, x, y, width, height, angle = FRAME.unpack(read_exactly(stream, FRAME.size))
+        if kind == FRAME_END:
+            return
+        if kind != FRAME_LAYER:
+            raise ValueError(f"Unknown frame {kind} in the stream.")
+        layer = DrawScriptLayer(x, y, width, height, angle, 0)
+        yield layer, read_exactly(stream, width * height * 4) if not layer.empty else b""
@@ -0,0 +1,69 @@
+import logging
+import sys
+
+from config import DEBUG
+
+# Every part of the compiler logs in a child of this logger (DrawScript.tokenizer, DrawScript.parser...),
+# so the whole compiler can be filtered or silenced at once
+LOGGER_NAME = "DrawScript"
+
+# Format of the records when they are written to a stream
+LOG_FORMAT = "%(name)s %(levelname)s: %(message)s"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns the logger of one part of the compiler
+
+    Parameters
+    -----------
+    name : str
+        The name of the part, for example "tokenizer"
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def enable_logging(level: int = logging.DEBUG, stream=None) -> logging.Handler:
+    """
+    Write the records of the compiler that are at least at 'level' to 'stream'.
+    Returns the handler that was added, so it can be removed with disable_logging
+
+    Parameters
+    -----------
+    level : int
+        The minimum level of the records to write, for example logging.INFO
+    stream : file
+        Where to write the records, stdout by default
+    """
+    handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
+
+
+def disable_logging(handler: logging.Handler = None) -> None:
+    """
+    Stop writing the records of the compiler.
+    Below WARNING, the log calls return right away and the debug loops are skipped
+
+    Parameters
+    -----------
+    handler : logging.Handler
+        The handler returned by enable_logging to remove, all the stream handlers if None
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for added in ([handler] if handler is not None else list(logger.handlers)):
+        if not isinstance(added, logging.NullHandler):
+            logger.removeHandler(added)
+    logger.setLevel(logging.WARNING)
+
+
+# Without a handler, nothing is written (not even the warnings that python writes to stderr by default).
+# The records are only written when DEBUG is set or when enable_logging is called
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+if DEBUG:
+    enable_logging(logging.DEBUG)
+else:
+    logging.getLogger(LOGGER_NAME).setLevel(logging.WARNING)
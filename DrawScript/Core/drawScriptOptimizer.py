@@ -0,0 +1,775 @@
+from DrawScript.Core.drawScriptBuiltins import (
+    BUILTIN_FUNCTIONS, DRAWING_FUNCTIONS, DRAWING_METHODS, COLOR, CIRCLE, ELLIPSE, RECTANGLE, POINTS,
+)
+from DrawScript.Core.drawScriptTypes import FLOAT
+from DrawScript.Core.drawScriptAst import (
+    VAR_DECLARATION, VAR_DECLARATION_NO_SEMI, CURSOR_DECLARATION, IF_STATEMENT, FOR_STATEMENT,
+    WHILE_STATEMENT, DO_WHILE_STATEMENT, FUNCTION_DECLARATION, RETURN_STATEMENT, COPY_STATEMENT,
+    ANIMATE_STATEMENT, CURSOR_METHOD, EXPRESSION_STATEMENT, BLOCK, BINARY_OP, UNARY_OP, CALL_EXPR,
+    IDENTIFIER, NUMBER, BOOL_LITERAL, NODE_TYPES, DrawScriptNode, Number, BoolLiteral, Block,
+)
+
+# The passes of DrawScriptOptimizer, in the order of its report
+OPTIMIZER_PASSES = ("constant folding", "dead branches", "off-canvas shapes")
+FOLDING, DEAD_BRANCHES, OFF_CANVAS = OPTIMIZER_PASSES
+
+# Default number of statements the for loops can be unrolled into, for the whole script
+UNROLL_BUDGET = 4096
+
+# The statements that declare a name, a block that has one can't be merged with the statements around it
+DECLARATIONS = (VAR_DECLARATION, CURSOR_DECLARATION, FUNCTION_DECLARATION)
+
+# Limits of an int in the C code, a result out of them is left to the C compiler
+C_INT_MIN = -2 ** 31
+C_INT_MAX = 2 ** 31 - 1
+
+COMPARISONS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def c_divide(a, b):
+    """
+    Returns a / b like C computes it: the quotient of two ints is truncated toward 0
+    """
+    if isinstance(a, int) and isinstance(b, int):
+        quotient = abs(a) // abs(b)
+        return quotient if (a < 0) == (b < 0) else -quotient
+    return a / b
+
+
+def c_modulo(a, b):
+    """
+    Returns a % b like C computes it for two ints: the result has the sign of a
+    """
+    return a - b * c_divide(a, b)
+
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': c_divide,
+    '%': c_modulo,
+}
+
+
+def in_c_range(value):
+    """
+    Returns True if 'value' can be written as a literal in the C code (an int within the limits or a finite float)
+    """
+    if isinstance(value, float):
+        return abs(value) < float('inf')
+    return C_INT_MIN <= value <= C_INT_MAX
+
+
+def compute_unary(op, value):
+    """
+    Returns (result, is_bool) of the unary operation 'op' on a constant, like C computes it,
+    or None if it is left to the C code
+    """
+    if op == '!':
+        return int(not value), True
+    if op == '-':
+        return -value, False
+    if op == '+':
+        return value, False
+    return None
+
+
+def compute_binary(op, left, right):
+    """
+    Returns (result, is_bool) of the binary operation 'op' on two constants, like C computes it,
+    or None if it is left to the C code (division by zero, % on a float, assignment)
+    """
+    if op == '&&':
+        return int(bool(left) and bool(right)), True
+    if op == '||':
+        return int(bool(left) or bool(right)), True
+    if op in COMPARISONS:
+        return int(COMPARISONS[op](left, right)), True
+    if op in ARITHMETIC:
+        if (op == '/' or op == '%') and right == 0:
+            return None
+        if op == '%' and not (isinstance(left, int) and isinstance(right, int)):
+            return None
+        return ARITHMETIC[op](left, right), False
+    return None
+
+
+def circle_bounds(args):
+    x, y, radius = args[:3]
+    radius = abs(radius)
+    return x - radius, y - radius, x + radius, y + radius
+
+
+def ellipse_bounds(args):
+    x, y, rx, ry = args[:4]
+    rx, ry = abs(rx), abs(ry)
+    return x - rx, y - ry, x + rx, y + ry
+
+
+def rectangle_bounds(args):
+    x, y, width, height = args[:4]
+    return min(x, x + width), min(y, y + height), max(x, x + width), max(y, y + height)
+
+
+def points_bounds(args):
+    xs, ys = args[0::2], args[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# The box covered by each shape of drawScriptBuiltins, from the arguments of the function
+SHAPE_BOUNDS = {CIRCLE: circle_bounds, ELLIPSE: ellipse_bounds, RECTANGLE: rectangle_bounds, POINTS: points_bounds}
+
+
+def shape_bounds(callee, args):
+    """
+    Returns the box (x0, y0, x1, y1) a drawing function covers with the arguments 'args',
+    or None if the function or its shape is unknown. The arguments are truncated to int, like the C functions do
+    """
+    builtin = BUILTIN_FUNCTIONS.get(callee)
+    bounds = SHAPE_BOUNDS.get(builtin.shape) if builtin is not None else None
+    if bounds is None:
+        return None
+    return bounds([int(arg) for arg in args])
+
+
+def count_nodes(node):
+    """
+    Returns (number of nodes, number of shapes drawn) in the tree under 'node', 'node' included
+    """
+    nodes = shapes = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        if (node.kind == CALL_EXPR and node.callee in DRAWING_FUNCTIONS) or \
+                (node.kind == CURSOR_METHOD and node.method in DRAWING_METHODS):
+            shapes += 1
+        # Like DrawScriptNode.children, without a generator per node
+        for field in node.FIELDS:
+            value = getattr(node, field)
+            if isinstance(value, DrawScriptNode):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, DrawScriptNode))
+    return nodes, shapes
+
+
+def color_statements(node):
+    """
+    Returns the setRGBA statements under 'node', in the order DrawScriptDeserializerC writes them.
+    The color is given to the drawing functions when the C code is written, not when it runs:
+    a setRGBA still colors the next shapes when it is in a branch that is never taken,
+    so it must be kept when that branch is removed
+    """
+    statements = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        kind = node.kind
+        if kind == BLOCK:
+            stack.extend(reversed(node.statements))
+        elif kind == IF_STATEMENT:
+            if node.else_block is not None:
+                stack.append(node.else_block)
+            stack.append(node.then_block)
+        elif kind == FOR_STATEMENT or kind == WHILE_STATEMENT or kind == DO_WHILE_STATEMENT:
+            stack.append(node.body)
+        elif kind == EXPRESSION_STATEMENT:
+            expression = node.expression
+            if expression.kind == CALL_EXPR:
+                builtin = BUILTIN_FUNCTIONS.get(expression.callee)
+                if builtin is not None and builtin.emit == COLOR:
+                    statements.append(node)
+        # The functions are not written in the C code, their setRGBA never color anything
+    return statements
+
+
+class DrawScriptOptimizer:
+    """
+    Simplifies the AST between SemanticAnalyzer.analyze and DrawScriptDeserializerC, in one walk:
+    - constant folding: the arithmetic, comparisons and boolean operations on literals are computed,
+      with the rules of C (int division, int limits), CANVAS_WIDTH and CANVAS_HEIGHT are replaced by
+      the size of the canvas when it is known
+    - dead branches: an if with a constant condition is replaced by the branch taken,
+      a while(false) is removed and a do-while(false) is replaced by its body.
+      The setRGBA of what is removed are kept (see color_statements), so every shape keeps its color
+    - off-canvas shapes: a drawing call with constant arguments whose shape is fully out of the canvas is removed
+    - loop unrolling: a for loop whose number of iterations is known is replaced by a block with the body
+      of each iteration, the loop variable replaced by its value, so the passes above see every shape drawn.
+      A loop that sets the color is not unrolled
+      The loops are unrolled as long as the statements they give stay within 'unroll_budget'
+
+    The nodes given are never modified (they are reused by the incremental parser), a changed node is a copy.
+
+    Attributes
+    -----------
+    width : int
+        The width of the canvas, None if unknown
+    height : int
+        The height of the canvas, None if unknown
+    removed : dict
+        For each pass (see OPTIMIZER_PASSES), the [number of nodes, number of shapes] it removed
+    unroll_budget : int
+        The number of statements the loops can still be unrolled into
+    unrolled : list
+        The [number of loops, number of statements] unrolled
+    """
+
+    def __init__(self, width: int = None, height: int = None, unroll_budget: int = UNROLL_BUDGET) -> None:
+        """
+        Constructs a new DrawScriptOptimizer.
+
+        Parameters
+        -----------
+        width : int
+            The width of the canvas, the canvas constants are not folded and no shape is removed if None
+        height : int
+            The height of the canvas
+        unroll_budget : int
+            The number of statements the for loops of the script can be unrolled into, 0 to never unroll
+        """
+        self.width = width
+        self.height = height
+        self.removed = {name: [0, 0] for name in OPTIMIZER_PASSES}
+        self.unroll_budget = unroll_budget
+        self.unrolled = [0, 0]
+        # The value of the variable of each loop being unrolled, by symbol, replaced by fold_identifier
+        self.substitutions = {}
+        self.canvas_constants = {}
+        if width is not None and height is not None:
+            self.canvas_constants = {"CANVAS_WIDTH": width, "CANVAS_HEIGHT": height}
+
+        # Optimizer of each kind of statement, returns the new statement or None if it is removed
+        self.statement_visitors = [self.keep] * len(NODE_TYPES)
+        self.statement_visitors[VAR_DECLARATION] = self.optimize_var_declaration
+        self.statement_visitors[VAR_DECLARATION_NO_SEMI] = self.optimize_var_declaration
+        self.statement_visitors[CURSOR_DECLARATION] = self.optimize_cursor_declaration
+        self.statement_visitors[IF_STATEMENT] = self.optimize_if_statement
+        self.statement_visitors[FOR_STATEMENT] = self.optimize_for_statement
+        self.statement_visitors[WHILE_STATEMENT] = self.optimize_while_statement
+        self.statement_visitors[DO_WHILE_STATEMENT] = self.optimize_do_while_statement
+        self.statement_visitors[FUNCTION_DECLARATION] = self.optimize_function_declaration
+        self.statement_visitors[RETURN_STATEMENT] = self.optimize_return_statement
+        self.statement_visitors[COPY_STATEMENT] = self.optimize_copy_statement
+        self.statement_visitors[ANIMATE_STATEMENT] = self.optimize_animate_statement
+        self.statement_visitors[CURSOR_METHOD] = self.optimize_cursor_method
+        self.statement_visitors[EXPRESSION_STATEMENT] = self.optimize_expression_statement
+        self.statement_visitors[BLOCK] = self.optimize_block
+
+        # Folder of each kind of expression, returns the new expression
+        self.expression_visitors = [self.keep] * len(NODE_TYPES)
+        self.expression_visitors[BINARY_OP] = self.fold_binary_op
+        self.expression_visitors[UNARY_OP] = self.fold_unary_op
+        self.expression_visitors[IDENTIFIER] = self.fold_identifier
+        self.expression_visitors[CALL_EXPR] = self.fold_call_expr
+
+    def optimize(self, ast_nodes):
+        """
+        Returns the optimized list of statements, the counts of what was removed are added to 'removed'
+        """
+        return self.optimize_statements(ast_nodes)
+
+    def report(self):
+        """
+        Returns a line per pass with what it removed, and a line with the loops unrolled
+        """
+        lines = [f"{name}: {nodes} node(s), {shapes} shape(s) removed" for name, (nodes, shapes) in self.removed.items()]
+        loops, statements = self.unrolled
+        lines.append(f"loop unrolling: {loops} loop(s) unrolled into {statements} statement(s)")
+        return lines
+
+    def count_removed(self, pass_name, node, kept=None):
+        """
+        Adds to the counts of 'pass_name' the nodes of 'node' that are not in 'kept'
+        """
+        nodes, shapes = count_nodes(node)
+        if kept is not None:
+            kept_nodes, kept_shapes = count_nodes(kept)
+            nodes -= kept_nodes
+            shapes -= kept_shapes
+        removed = self.removed[pass_name]
+        removed[0] += nodes
+        removed[1] += shapes
+
+    def keep(self, node):
+        """
+        Visitor of the nodes that are left as they are.
+        """
+        return node
+
+    # ----------------- Statements -------------------
+    def optimize_statements(self, statements):
+        """
+        Optimizes a list of statements, returns the same list if nothing changed.
+        """
+        visitors = self.statement_visitors
+        optimized = []
+        changed = False
+        for stmt in statements:
+            new_stmt = visitors[stmt.kind](stmt)
+            if new_stmt is not stmt:
+                changed = True
+            if new_stmt is not None:
+                optimized.append(new_stmt)
+        return optimized if changed else statements
+
+    def optimize_block(self, node):
+        """
+        Optimizes the statements of a block.
+        """
+        statements = self.optimize_statements(node.statements)
+        if statements is node.statements:
+            return node
+        return node.replace(statements=statements)
+
+    def optimize_var_declaration(self, node):
+        """
+        Folds the initial value of a variable.
+        """
+        if node.expression is None:
+            return node
+        expression = self.fold(node.expression)
+        if expression is node.expression:
+            return node
+        if node.binding is None and node.type is None and node.kind == VAR_DECLARATION \
+                and node.expression.kind == BINARY_OP and expression.kind != BINARY_OP:
+            # Without the type inferred by SemanticAnalyzer, DrawScriptDeserializerC declares an untyped variable
+            # set to an operation as a float, the literal it was folded to must keep that type
+            return node.replace(expression=expression, type="float")
+        return node.replace(expression=expression)
+
+    def optimize_cursor_declaration(self, node):
+        """
+        Folds the arguments of the constructor of a cursor.
+        """
+        args = self.fold_list(node.constructor_args)
+        if args is node.constructor_args:
+            return node
+        return node.replace(constructor_args=args)
+
+    def optimize_cursor_method(self, node):
+        """
+        Folds the arguments of a method of a cursor.
+        """
+        args = self.fold_list(node.arguments)
+        if args is node.arguments:
+            return node
+        return node.replace(arguments=args)
+
+    def optimize_if_statement(self, node):
+        """
+        Replaces an if with a constant condition by the block of the branch taken (removed if there is none),
+        otherwise optimizes both branches.
+        """
+        condition = self.fold(node.condition)
+        value = self.constant(condition)
+        if value is not None:
+            if value:
+                taken = self.optimize_block(node.then_block)
+                dead = node.replace(condition=condition, then_block=taken)
+                # The else block is written after the branch taken
+                before, after = [], [] if node.else_block is None else self.kept_colors(node.else_block)
+            else:
+                taken = None if node.else_block is None else self.optimize_block(node.else_block)
+                dead = node.replace(condition=condition, else_block=taken)
+                before, after = self.kept_colors(node.then_block), []
+            if before or after:
+                if taken is None:
+                    taken = Block(before, node.line, node.start, node.end)
+                else:
+                    taken = taken.replace(statements=before + taken.statements + after)
+            self.count_removed(DEAD_BRANCHES, dead, taken)
+            return taken
+
+        then_block = self.optimize_block(node.then_block)
+        else_block = None if node.else_block is None else self.optimize_block(node.else_block)
+        if condition is node.condition and then_block is node.then_block and else_block is node.else_block:
+            return node
+        return node.replace(condition=condition, then_block=then_block, else_block=else_block)
+
+    def optimize_for_statement(self, node):
+        """
+        Unrolls a for loop when it can be, otherwise folds its parts and optimizes its body.
+        """
+        unrolled = self.unroll_for_statement(node)
+        if unrolled is not None:
+            return unrolled
+
+        init = node.init
+        if init is not None:
+            # A declaration, or the assignment of a variable declared before the loop
+            init = self.statement_visitors[init.kind](init) if init.kind == VAR_DECLARATION_NO_SEMI else self.fold(init)
+        condition = None if node.condition is None else self.fold(node.condition)
+        increment = None if node.increment is None else self.fold(node.increment)
+        body = self.optimize_block(node.body)
+        if init is node.init and condition is node.condition and increment is node.increment and body is node.body:
+            return node
+        return node.replace(init=init, condition=condition, increment=increment, body=body)
+
+    def unroll_for_statement(self, node):
+        """
+        Returns a block with the body of each iteration of the loop, optimized with the loop variable
+        replaced by its value (see fold_identifier),
+        or None if the loop can't be unrolled:
+        the loop must be 'for (var i = <constant>; <condition on i>; i = <expression of i>)',
+        with i an int (see SemanticAnalyzer), a body that doesn't assign i nor set the color,
+        and the statements given must fit in unroll_budget.
+        The color is given to the shapes when the C code is written (see color_statements): in the loop every
+        iteration draws with the colors of the body written once, the copies would take the color of the previous one.
+
+        The iterations are run here, with i as an int like in the C code (for (int i = ...)).
+        """
+        init, condition, increment, body = node.init, node.condition, node.increment, node.body
+        if self.unroll_budget <= 0 or init is None or condition is None or increment is None:
+            return None
+        # Only a loop that declares its variable, for (i = 0; ...) keeps the value of i after the loop
+        if init.kind != VAR_DECLARATION_NO_SEMI:
+            return None
+        symbol = init.binding
+        if symbol is None or init.expression is None:
+            return None
+        # A float loop variable is a C float, its values are not computed here
+        if symbol.value_type == FLOAT:
+            return None
+        if increment.kind != BINARY_OP or increment.op != '=' or increment.left.kind != IDENTIFIER \
+                or increment.left.binding is not symbol:
+            return None
+        if not body.statements or self.writes(body, symbol) or color_statements(body):
+            return None
+
+        # The number of statements is only known after the optimization of the iterations,
+        # the budget is checked with the size of the body
+        max_iterations = self.unroll_budget // len(body.statements)
+        values = []
+        env = dict(self.substitutions)
+        value = self.evaluate(init.expression, env)
+        while True:
+            if value is None:
+                return None
+            # Stored in an int, the decimals are dropped
+            value = int(value)
+            if not in_c_range(value):
+                return None
+            env[symbol] = value
+            keep_going = self.evaluate(condition, env)
+            if keep_going is None:
+                return None
+            if not keep_going:
+                break
+            if len(values) == max_iterations:
+                return None
+            values.append(value)
+            value = self.evaluate(increment.right, env)
+
+        self.unroll_budget -= len(values) * len(body.statements)
+        statements = []
+        for value in values:
+            self.substitutions[symbol] = value
+            iteration = self.optimize_block(body)
+            if self.declares(iteration):
+                statements.append(iteration)
+                continue
+            for stmt in iteration.statements:
+                # The block of an inner loop that was unrolled too
+                if stmt.kind == BLOCK and not self.declares(stmt):
+                    statements.extend(stmt.statements)
+                else:
+                    statements.append(stmt)
+        self.substitutions.pop(symbol, None)
+        self.unrolled[0] += 1
+        # The statements of the inner loops are counted by the outermost one
+        if not self.substitutions:
+            self.unrolled[1] += len(statements)
+        return Block(statements, node.line, node.start, node.end)
+
+    def kept_colors(self, node):
+        """
+        Returns the setRGBA statements of 'node', a branch or a loop that is removed, with their arguments folded
+        """
+        visitor = self.statement_visitors[EXPRESSION_STATEMENT]
+        return [visitor(stmt) for stmt in color_statements(node)]
+
+    @staticmethod
+    def declares(block):
+        """
+        Returns True if a statement of 'block' declares a name, its statements can't be moved out of it then
+        """
+        return any(stmt.kind in DECLARATIONS for stmt in block.statements)
+
+    def writes(self, node, symbol):
+        """
+        Returns True if 'symbol' is assigned under 'node', or if there is a function declared there
+        (a function can't be copied in each iteration)
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            kind = node.kind
+            if kind == FUNCTION_DECLARATION:
+                return True
+            if kind == BINARY_OP and node.op == '=' and node.left.kind == IDENTIFIER and node.left.binding is symbol:
+                return True
+            stack.extend(node.children())
+        return False
+
+    def evaluate(self, expr, env):
+        """
+        Returns the value of 'expr' when the symbols in 'env' have the values they are mapped to,
+        or None if it can't be known before running the C code
+        """
+        kind = expr.kind
+        if kind == NUMBER or kind == BOOL_LITERAL:
+            return self.constant(expr)
+        if kind == IDENTIFIER:
+            binding = expr.binding
+            if binding in env:
+                return env[binding]
+            if binding is not None and binding.type == "builtin":
+                return self.canvas_constants.get(binding.name)
+            return None
+        if kind == UNARY_OP:
+            value = self.evaluate(expr.expr, env)
+            result = None if value is None else compute_unary(expr.op, value)
+        elif kind == BINARY_OP:
+            op = expr.op
+            left = self.evaluate(expr.left, env)
+            # Like in C, the right side of 'false && x' and 'true || x' is not computed
+            if left is not None and ((op == '&&' and not left) or (op == '||' and left)):
+                return int(op == '||')
+            right = self.evaluate(expr.right, env)
+            result = None if left is None or right is None else compute_binary(op, left, right)
+        else:
+            return None
+        if result is None or not in_c_range(result[0]):
+            return None
+        return result[0]
+
+    def optimize_while_statement(self, node):
+        """
+        Removes a while loop whose condition is always false, otherwise optimizes its body.
+        """
+        condition = self.fold(node.condition)
+        if self.constant(condition) == 0:
+            colors = self.kept_colors(node.body)
+            kept = Block(colors, node.line, node.start, node.end) if colors else None
+            self.count_removed(DEAD_BRANCHES, node.replace(condition=condition), kept)
+            return kept
+        body = self.optimize_block(node.body)
+        if condition is node.condition and body is node.body:
+            return node
+        return node.replace(condition=condition, body=body)
+
+    def optimize_do_while_statement(self, node):
+        """
+        Replaces a do-while loop whose condition is always false by its body, run once,
+        otherwise optimizes its body.
+        """
+        condition = self.fold(node.condition)
+        body = self.optimize_block(node.body)
+        if self.constant(condition) == 0:
+            self.count_removed(DEAD_BRANCHES, node.replace(condition=condition, body=body), body)
+            return body
+        if condition is node.condition and body is node.body:
+            return node
+        return node.replace(condition=condition, body=body)
+
+    def optimize_function_declaration(self, node):
+        """
+        Optimizes the body of a function.
+        """
+        body = self.optimize_block(node.body)
+        if body is node.body:
+            return node
+        return node.replace(body=body)
+
+    def optimize_return_statement(self, node):
+        """
+        Folds the returned value.
+        """
+        if node.expression is None:
+            return node
+        expression = self.fold(node.expression)
+        if expression is node.expression:
+            return node
+        return node.replace(expression=expression)
+
+    def optimize_copy_statement(self, node):
+        """
+        Folds the source and destination expressions of a copy.
+        """
+        source = self.fold_list(node.source)
+        destination = self.fold_list(node.destination)
+        if source is node.source and destination is node.destination:
+            return node
+        return node.replace(source=source, destination=destination)
+
+    def optimize_animate_statement(self, node):
+        """
+        Folds the expressions of an animate statement and optimizes its body.
+        """
+        obj_or_expr1 = self.fold(node.obj_or_expr1)
+        expr2 = self.fold(node.expr2)
+        body = self.optimize_block(node.body)
+        if obj_or_expr1 is node.obj_or_expr1 and expr2 is node.expr2 and body is node.body:
+            return node
+        return node.replace(obj_or_expr1=obj_or_expr1, expr2=expr2, body=body)
+
+    def optimize_expression_statement(self, node):
+        """
+        Folds the expression, and removes a drawing call whose shape is fully out of the canvas.
+        """
+        expression = self.fold(node.expression)
+        if expression is not node.expression:
+            node = node.replace(expression=expression)
+        if expression.kind == CALL_EXPR and self.is_off_canvas(expression):
+            self.count_removed(OFF_CANVAS, node)
+            return None
+        return node
+
+    def is_off_canvas(self, call):
+        """
+        Returns True if 'call' draws a shape, with constant arguments, that doesn't touch the canvas
+        """
+        if self.width is None or self.height is None or call.callee not in DRAWING_FUNCTIONS:
+            return False
+        if len(call.arguments) != BUILTIN_FUNCTIONS[call.callee].arity:
+            return False
+        args = [self.constant(arg) for arg in call.arguments]
+        if None in args:
+            return False
+        bounds = shape_bounds(call.callee, args)
+        if bounds is None:
+            return False
+        x0, y0, x1, y1 = bounds
+        return x1 < 0 or y1 < 0 or x0 >= self.width or y0 >= self.height
+
+    # ----------------- Expressions -------------------
+    def fold(self, expr):
+        """
+        Returns 'expr' with its constant parts computed, through expression_visitors.
+        """
+        return self.expression_visitors[expr.kind](expr)
+
+    def fold_list(self, exprs):
+        """
+        Folds a list of expressions, returns the same list if nothing changed.
+        """
+        visitors = self.expression_visitors
+        folded = [visitors[expr.kind](expr) for expr in exprs]
+        if all(new is old for new, old in zip(folded, exprs)):
+            return exprs
+        return folded
+
+    @staticmethod
+    def constant(expr):
+        """
+        Returns the value of a literal (1 or 0 for a boolean), or None if 'expr' is not a number or a boolean
+        """
+        kind = expr.kind
+        if kind == NUMBER:
+            return expr.value
+        if kind == BOOL_LITERAL:
+            return 1 if expr.value == "true" else 0
+        return None
+
+    @staticmethod
+    def is_pure(expr):
+        """
+        Returns True if computing 'expr' has no effect (no call nor assignment in it), so it can be dropped
+        """
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if node.kind == CALL_EXPR or (node.kind == BINARY_OP and node.op == '='):
+                return False
+            stack.extend(node.children())
+        return True
+
+    def literal(self, value, is_bool, expr, removed_nodes):
+        """
+        Returns the literal node that replaces 'expr', or 'expr' if 'value' can't be written in the C code
+        """
+        if is_bool:
+            literal = BoolLiteral("true" if value else "false", expr.start, expr.end)
+        else:
+            if not in_c_range(value):
+                return expr
+            literal = Number(value, expr.start, expr.end)
+        self.removed[FOLDING][0] += removed_nodes
+        return literal
+
+    def fold_identifier(self, expr):
+        """
+        Replaces the variable of a loop being unrolled by its value,
+        and CANVAS_WIDTH and CANVAS_HEIGHT by the size of the canvas, when it is known.
+        """
+        binding = expr.binding
+        if binding is None:
+            return expr
+        if binding in self.substitutions:
+            return Number(self.substitutions[binding], expr.start, expr.end)
+        if binding.type == "builtin" and binding.name in self.canvas_constants:
+            return Number(self.canvas_constants[binding.name], expr.start, expr.end)
+        return expr
+
+    def fold_call_expr(self, expr):
+        """
+        Folds the arguments of a call.
+        """
+        args = self.fold_list(expr.arguments)
+        if args is expr.arguments:
+            return expr
+        return expr.replace(arguments=args)
+
+    def fold_unary_op(self, expr):
+        """
+        Computes a unary operation on a literal.
+        """
+        operand = self.fold(expr.expr)
+        value = self.constant(operand)
+        if value is not None:
+            result = compute_unary(expr.op, value)
+            if result is not None:
+                return self.literal(*result, expr, 1)
+        if operand is expr.expr:
+            return expr
+        return expr.replace(expr=operand)
+
+    def fold_binary_op(self, expr):
+        """
+        Computes a binary operation on literals, and the && and || whose result is known from one side.
+        """
+        # The folders of the operands are called directly, an expression is often a long chain of operations
+        visitors = self.expression_visitors
+        constant = self.constant
+        op = expr.op
+        left = expr.left
+        left = visitors[left.kind](left)
+        right = expr.right
+        right = visitors[right.kind](right)
+        left_value = constant(left)
+        right_value = constant(right)
+
+        if op == '&&' or op == '||':
+            absorbing = 0 if op == '&&' else 1
+            # 'false && x' and 'true || x': x is never computed in C
+            if left_value is not None and bool(left_value) == absorbing:
+                return self.literal(absorbing, True, expr, count_nodes(right)[0] + 1)
+            if right_value is not None and left_value is None and bool(right_value) == absorbing and self.is_pure(left):
+                return self.literal(absorbing, True, expr, count_nodes(left)[0] + 1)
+        if left_value is not None and right_value is not None:
+            result = compute_binary(op, left_value, right_value)
+            if result is not None:
+                return self.literal(*result, expr, 2)
+
+        if left is expr.left and right is expr.right:
+            return expr
+        return expr.replace(left=left, right=right)
@@ -0,0 +1,184 @@
+import gc
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from DrawScript.Core.drawScriptParser import DrawScriptParser, MAX_PARSE_ERRORS, logger
+
+# Below this number of tokens per chunk, sending the tokens to another process costs more than parsing them
+MIN_CHUNK_TOKENS = 20_000
+
+# Number of chunks given to each worker, a bit more than one so a slow chunk doesn't hold everything
+CHUNKS_PER_WORKER = 2
+
+
+def parse_chunk(columns, pratt):
+    """
+    Parse the tokens of one chunk, in a worker process.
+    The tokens keep their lines and offsets in the whole script, so the nodes need no change.
+    The parsing stops at the first error, the whole script is then parsed again in one piece
+
+    Parameters
+    -----------
+    columns : tuple
+        The types, values, lines, start offsets and end offsets of the tokens of the chunk
+        (see DrawScriptParser.token_columns), much cheaper to send than the dictionaries
+    pratt : bool
+        If the expressions are parsed with the Pratt parser
+
+    Returns
+    -----------
+    bytes
+        The pickled (ast_nodes, errors), loaded by DrawScriptParallelParser.load_chunk
+    """
+    tokens = [
+        {'type': token_type, 'value': value, 'line': line, 'start': start, 'end': end}
+        for token_type, value, line, start, end in zip(*columns)
+    ]
+    return pickle.dumps(DrawScriptParser(tokens, pratt=pratt, max_errors=1).parse(), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class DrawScriptParallelParser(DrawScriptParser):
+    """
+    A DrawScriptParser that parses big scripts in several processes.
+
+    A pre-scan cuts the tokens between two top-level statements, after a ';' or a '}' that is outside
+    of any brace and parenthesis (but not before an 'else' or the 'while' of a do-while).
+    Each chunk is parsed in a ProcessPoolExecutor and the nodes are put back in order,
+    so parse returns the same list as DrawScriptParser.parse.
+
+    The tokens are parsed in this process, like DrawScriptParser does, when:
+    the script is too small to be worth it, there is only one worker,
+    the pre-scan finds unbalanced braces or parentheses (the statements can't be found without parsing),
+    or a chunk has errors (the error recovery may not stop at the end of a chunk like it does in one parse).
+
+    Attributes
+    -----------
+    workers : int
+        The number of processes
+    executor : ProcessPoolExecutor
+        The pool of processes to use, a new one is started for each parse if None
+    """
+
+    def __init__(self, tokens, pratt=False, max_errors=MAX_PARSE_ERRORS, workers=None, executor=None):
+        """
+        Constructs a new DrawScriptParallelParser.
+
+        Parameters
+        -----------
+        tokens : list | DrawScriptTokenStream
+            The tokens to parse
+        pratt : bool
+            If the expressions are parsed with the Pratt parser
+        max_errors : int
+            The number of errors after which the parsing stops, see DrawScriptParser
+        workers : int
+            The number of processes, the number of CPUs if None
+        executor : ProcessPoolExecutor
+            A pool of processes to reuse between parses
+        """
+        super().__init__(tokens, pratt=pratt, max_errors=max_errors)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.executor = executor
+
+    def parse(self):
+        """
+        Parse the tokens in chunks in the worker processes, or in this process when it can't be done
+        (see the class). Returns the same nodes and errors as DrawScriptParser.parse
+        """
+        split_points = None
+        if self.workers > 1:
+            chunk_count = min(self.workers * CHUNKS_PER_WORKER, len(self.token_types) // MIN_CHUNK_TOKENS)
+            if chunk_count > 1:
+                split_points = self.find_split_points(chunk_count)
+
+        if not split_points:
+            return super().parse()
+
+        bounds = [0] + split_points + [len(self.token_types)]
+        columns = (self.token_types, self.token_values, self.token_lines, self.token_starts, self.token_ends)
+        chunks = [tuple(column[first:end] for column in columns) for first, end in zip(bounds, bounds[1:])]
+        logger.info("Parsing %d tokens in %d chunks", len(self.token_types), len(chunks))
+
+        if self.executor is not None:
+            results = list(self.executor.map(parse_chunk, chunks, [self.pratt] * len(chunks)))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(parse_chunk, chunks, [self.pratt] * len(chunks)))
+
+        ast_nodes = []
+        for result in results:
+            nodes, errors = self.load_chunk(result)
+            if errors:
+                logger.info("Errors in the chunks, parsing again in one piece")
+                return super().parse()
+            ast_nodes.extend(nodes)
+        self.current_token_index = len(self.token_types)
+        return ast_nodes, self.errors
+
+    @staticmethod
+    def load_chunk(result):
+        """
+        Returns the (ast_nodes, errors) pickled by parse_chunk
+        """
+        # Like in DrawScriptAstCache, nothing loaded can be garbage, the collector would only slow the load down
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(result)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def find_split_points(self, chunk_count):
+        """
+        Returns the indexes of the tokens where the script can be cut to get about 'chunk_count' chunks,
+        each one starting a top-level statement, or None when the braces or the parentheses are unbalanced
+
+        Parameters
+        -----------
+        chunk_count : int
+            The number of chunks wanted
+        """
+        types, values = self.token_types, self.token_values
+        token_count = len(types)
+        chunk_size = token_count // chunk_count
+        next_cut = chunk_size
+        split_points = []
+        braces = parentheses = 0
+
+        for index in [index for index, token_type in enumerate(types) if token_type == "DELIMITER"]:
+            value = values[index]
+            if value == "{":
+                braces += 1
+                continue
+            if value == "(":
+                parentheses += 1
+                continue
+            if value == ")":
+                parentheses -= 1
+                if parentheses < 0:
+                    return None
+                continue
+            if value == "}":
+                braces -= 1
+                if braces < 0:
+                    return None
+            elif value != ";":
+                continue
+
+            # A top-level statement ends here
+            cut = index + 1
+            if braces or parentheses or cut < next_cut or cut >= token_count:
+                continue
+            if value == "}" and types[cut] == "KEYWORD" and values[cut] in ("else", "while"):
+                # The statement goes on after the block
+                continue
+            split_points.append(cut)
+            next_cut = cut + chunk_size
+
+        if braces or parentheses:
+            return None
+        return split_points
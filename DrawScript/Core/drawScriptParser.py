@@ -1,12 +1,165 @@
-from config import DEBUG
+from bisect import bisect_left, bisect_right
+from itertools import compress, count, repeat
+from logging import DEBUG
+from operator import ne, sub
+
 from DrawScript.Exceptions.parserError import ParserError
+from DrawScript.Core.drawScriptTokenStream import DrawScriptTokenStream, TOKEN_TYPES
+from DrawScript.Core.drawScriptLogger import get_logger
+from DrawScript.Core.drawScriptAst import (
+    VarDeclaration, VarDeclarationNoSemi, CursorDeclaration, IfStatement, ForStatement, WhileStatement,
+    DoWhileStatement, FunctionDeclaration, ReturnStatement, CopyStatement, AnimateStatement, CursorMethod,
+    ExpressionStatement, EmptyStatement, Block, AssignmentExpr, BinaryOp, UnaryOp, CallExpr, Identifier,
+    Number, String, BoolLiteral,
+)
+from DrawScript.Core.drawScriptAst import NUMBER, BOOL_LITERAL
+
+logger = get_logger("parser")
+
+# Version of the grammar and of the nodes it builds. It is part of the key of DrawScriptAstCache,
+# so it has to be increased when the parser gives a different result for the same script
+# (ANALYZER_VERSION in drawScriptSemanticAnalyzer is the one of the semantic analysis)
+GRAMMAR_VERSION = 3
+
+# Precedence of the binary operators for the Pratt expression parser, the higher binds tighter.
+# It follows the chain parse_logical_or_expr -> ... -> parse_multiplicative_expr,
+# the assignment '=' (an ASSIGN token) is below all of them and is right associative
+BINARY_PRECEDENCE = {
+    '||': 1,
+    '&&': 2,
+    '==': 3, '!=': 3,
+    '<': 4, '<=': 4, '>': 4, '>=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6, '%': 6,
+}
+ASSIGNMENT_PRECEDENCE = 0
+
+# The parser gives up after this many errors, the rest of the script is not parsed.
+# On a broken file the recovery stays bounded, and nobody reads the 10 000th error anyway
+MAX_PARSE_ERRORS = 100
+
+# Number of tokens a top-level statement can look at after its last token
+# (looks_like_cursor_method reads 4 tokens from the start of a statement)
+PARSE_LOOKAHEAD = 4
+# Number of tokens a top-level statement can look at before its first token
+# (synchronize checks if the token before the current one is a ';')
+PARSE_LOOKBEHIND = 1
+
+
+class DrawScriptParseDocument:
+    """
+    The result of a parse that can be updated incrementally.
+    Alongside the nodes and errors returned by DrawScriptParser.parse,
+    it keeps the range of tokens of every top-level statement, so after an edit
+    only the statements touched by the edit are parsed again (see DrawScriptParser.update_document).
+
+    Attributes
+    -----------
+    types, values, lines, starts : list
+        The type, value, line and start offset of every token that was parsed
+    firsts : list
+        For each top-level statement, the index of its first token
+    ends : list
+        For each top-level statement, the index of the token after its last token
+    statements : list
+        For each top-level statement, its node, or None when it could not be parsed
+    statement_errors : list
+        For each top-level statement, the list of the errors found while parsing it
+    nodes : list
+        The nodes, exactly as returned by DrawScriptParser.parse
+    errors : list
+        The errors, exactly as returned by DrawScriptParser.parse
+    truncated : bool
+        True if the parser gave up in the last statement, after max_errors errors
+    """
+
+    def __init__(self, types, values, lines, starts):
+        self.types = types
+        self.values = values
+        self.lines = lines
+        self.starts = starts
+        self.firsts = []
+        self.ends = []
+        self.statements = []
+        self.statement_errors = []
+        self.nodes = []
+        self.errors = []
+        self.truncated = False
+
+    def append(self, first, end, statement, errors):
+        """
+        Add a top-level statement parsed from the tokens 'first' to 'end'
+        """
+        self.firsts.append(first)
+        self.ends.append(end)
+        self.statements.append(statement)
+        self.statement_errors.append(errors)
+        if statement is not None:
+            self.nodes.append(statement)
+        self.errors.extend(errors)
+
+    def extend(self, document, first, end):
+        """
+        Add the top-level statements 'first' to 'end' of another document, as they are
+        """
+        statements = document.statements[first:end]
+        self.firsts.extend(document.firsts[first:end])
+        self.ends.extend(document.ends[first:end])
+        self.statements.extend(statements)
+        self.statement_errors.extend(document.statement_errors[first:end])
+        self.nodes.extend(statement for statement in statements if statement is not None)
+        for errors in document.statement_errors[first:end]:
+            self.errors.extend(errors)
+
 
 class DrawScriptParser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, pratt=False, max_errors=MAX_PARSE_ERRORS):
+        # 'tokens' is either the list of dictionaries returned by DrawScriptTokenizer.tokenize
+        # or a DrawScriptTokenStream
         self.tokens = tokens
+        # When True, the expressions are parsed by parse_pratt_expr with the BINARY_PRECEDENCE table
+        # instead of going through one function per level of precedence. The nodes are the same
+        self.pratt = pratt
         self.current_token_index = 0
         self.errors = []
+        # Number of errors after which the parsing stops (None for no limit), and if it was reached
+        self.max_errors = max_errors
+        self.error_limit_reached = False
+        # Sorted indexes of the tokens where synchronize can stop, built on the first error
+        self.sync_points = None
         self.context_stack = []
+        # Checked once, so nothing is paid per statement when the debug records are filtered out
+        self.log_statements = logger.isEnabledFor(DEBUG)
+        # The types, values and lines are read on every match/consume, so they are kept in flat lists,
+        # like the offsets that give the span ("start", "end") of every node and error
+        self.token_types, self.token_values, self.token_lines, self.token_starts, self.token_ends = self.token_columns(tokens)
+
+    @staticmethod
+    def token_columns(tokens):
+        """
+        Returns the lists of the types, values, lines, start offsets and end offsets of the tokens.
+
+        For a DrawScriptTokenStream the lines and offsets are its own arrays, read as they are,
+        but the types and values are still copied in lists (8 bytes per token each): every match/consume
+        compares them to strings, and reading the type codes and value ids directly would add a lookup
+        to each of these comparisons. Parsing a stream takes about as long as parsing the dictionaries,
+        apart from the DrawScriptTokenViews returned by consume (see Docs/src/drawscript.core.drawscripttokenstream.md).
+        """
+        if isinstance(tokens, DrawScriptTokenStream):
+            return (
+                list(map(TOKEN_TYPES.__getitem__, tokens.types)),
+                list(map(tokens.value_table.__getitem__, tokens.value_ids)),
+                tokens.lines,
+                tokens.starts,
+                tokens.ends,
+            )
+        return (
+            [token["type"] for token in tokens],
+            [token["value"] for token in tokens],
+            [token["line"] for token in tokens],
+            [token["start"] for token in tokens],
+            [token["end"] for token in tokens],
+        )
 
 
     @property
@@ -22,40 +175,181 @@ class DrawScriptParser:
         Returns a flat list of nodes (or None on fatal error).
         """
         ast_nodes = []
-        max_iterations = len(self.tokens) + 1000  # Ajouter une limite
-        iterations = 0
         while not self.is_at_end():
-            # On a un "garde fou" sur le nombre d'itérations
-            if iterations > max_iterations:
-                if self.context_stack:
-                    last_ctx = self.context_stack[-1]
-                    msg = (
-                        f"La structure '{last_ctx['type']}' commencée à la ligne {last_ctx['line']} "
-                        f"n'est pas correctement fermée (accolade manquante ?)."
-                    )
-                    # On enregistre l’erreur dans self.errors
-                    self.errors.append({
-                        "message": msg,
-                        "line": last_ctx['line']
-                    })
-                    # Puis on quitte la boucle parse
-                    break
-                else:
-                    # Même chose, on ajoute un message plus générique
-                    self.errors.append({
-                        "message": "Boucle infinie détectée ou code invalide",
-                        "line": -1
-                    })
-                    break            
-            iterations += 1
-
+            start_index = self.current_token_index
             stmt = self.parse_statement()
-            if DEBUG:
-                print(stmt)
+            if self.log_statements:
+                logger.debug("Parsed statement: %s", stmt)
             if stmt is not None:
                 ast_nodes.append(stmt)
+            if self.current_token_index == start_index:
+                # Every statement consumes at least one token, this only guards against an infinite loop
+                self.advance()
         return ast_nodes, self.errors
 
+    def parse_document(self):
+        """
+        Parse the tokens like parse does, but keep the range of tokens of every top-level statement
+        so the result can later be updated with update_document.
+
+        Returns
+        -----------
+        DrawScriptParseDocument
+            The nodes, errors and token ranges of the top-level statements
+        """
+        document = DrawScriptParseDocument(self.token_types, self.token_values, self.token_lines, self.token_starts)
+        self.current_token_index = 0
+        while not self.is_at_end():
+            self.parse_top_level_statement(document)
+        return document
+
+    def update_document(self, document):
+        """
+        Parse the tokens given to this parser, reusing the top-level statements of 'document'
+        (the parse of the tokens before an edit) that the edit didn't touch.
+        The statements before the edit are kept, the tokens are parsed from there until a statement
+        starts where a statement started before the edit, and the remaining statements are reused,
+        moved by the number of characters and lines the edit added.
+        When the edit changes the balance of the braces, the statements can't line up again
+        and everything after the edit is parsed.
+        The result is always the same as parse_document on the new tokens.
+
+        Parameters
+        -----------
+        document : DrawScriptParseDocument
+            The document before the edit, or None to parse the tokens from scratch.
+            The reused nodes are moved in place, so it shouldn't be used after this call
+
+        Returns
+        -----------
+        DrawScriptParseDocument
+            The document for the tokens of this parser
+        """
+        if document is None:
+            return self.parse_document()
+
+        types, values, lines, starts = self.token_types, self.token_values, self.token_lines, self.token_starts
+        old_count, token_count = len(document.types), len(types)
+
+        # Tokens that didn't change before the edit, same type, value and position
+        limit = min(old_count, token_count)
+        prefix = min(
+            self.leading_matches(map(ne, document.types, types), limit),
+            self.leading_matches(map(ne, document.values, values), limit),
+            self.leading_matches(map(ne, document.starts, starts), limit),
+            self.leading_matches(map(ne, document.lines, lines), limit),
+        )
+        if prefix == old_count == token_count:
+            return document
+
+        # Tokens that didn't change after the edit, same type and value, all moved by the same offset and lines
+        limit -= prefix
+        delta = line_delta = 0
+        suffix = 0
+        if limit:
+            delta = starts[-1] - document.starts[-1]
+            line_delta = lines[-1] - document.lines[-1]
+            suffix = min(
+                self.leading_matches(map(ne, reversed(document.types), reversed(types)), limit),
+                self.leading_matches(map(ne, reversed(document.values), reversed(values)), limit),
+                self.leading_matches(map(ne, map(sub, reversed(starts), reversed(document.starts)), repeat(delta)), limit),
+                self.leading_matches(map(ne, map(sub, reversed(lines), reversed(document.lines)), repeat(line_delta)), limit),
+            )
+        old_suffix_start = old_count - suffix
+        index_delta = token_count - old_count
+
+        # A statement is kept if it, and the tokens it looked at after its end, are before the edit.
+        # After the edit, a statement is reused if it, and the tokens it looked at before its start, are after the edit
+        kept = bisect_right(document.ends, prefix - PARSE_LOOKAHEAD)
+        new_document = DrawScriptParseDocument(types, values, lines, starts)
+        new_document.extend(document, 0, kept)
+
+        # If the edited tokens don't open and close as many braces as before, no statement after
+        # the edit starts at the same place as before
+        can_resync = (
+            self.brace_balance(document.types, document.values, prefix, old_suffix_start)
+            == self.brace_balance(types, values, prefix, token_count - suffix)
+        )
+
+        resync = -1
+        resume = self.current_token_index = document.ends[kept - 1] if kept else 0
+        # The errors of the kept statements count in max_errors
+        self.errors = new_document.errors[:]
+        while not self.is_at_end():
+            old_index = self.current_token_index - index_delta
+            if can_resync and old_index - PARSE_LOOKBEHIND >= old_suffix_start:
+                k = bisect_left(document.firsts, old_index, kept)
+                if k < len(document.firsts) and document.firsts[k] == old_index:
+                    resync = k
+                    break
+            self.parse_top_level_statement(new_document)
+
+        if resync != -1:
+            if self.log_statements:
+                logger.debug("Reparsed %d tokens, reusing %d statements", self.current_token_index - resume, len(document.firsts) - resync)
+            for k in range(resync, len(document.firsts)):
+                errors = document.statement_errors[k]
+                if (document.truncated and k == len(document.firsts) - 1) or (
+                    errors and self.max_errors is not None and len(new_document.errors) + len(errors) >= self.max_errors
+                ):
+                    # The parser gave up in this statement, or gives up in it now, everything from here is parsed again
+                    self.current_token_index = document.firsts[k] + index_delta
+                    self.errors = new_document.errors[:]
+                    while not self.is_at_end():
+                        self.parse_top_level_statement(new_document)
+                    break
+                if errors and line_delta:
+                    # The messages hold line numbers, the statement is parsed again at its new place
+                    self.current_token_index = document.firsts[k] + index_delta
+                    self.errors = new_document.errors[:]
+                    self.parse_top_level_statement(new_document)
+                    continue
+                statement = document.statements[k]
+                if statement is not None and (delta or line_delta):
+                    statement.shift(delta, line_delta)
+                if errors and delta:
+                    errors = [dict(error, start=error["start"] + delta, end=error["end"] + delta) for error in errors]
+                new_document.append(document.firsts[k] + index_delta, document.ends[k] + index_delta, statement, errors)
+        return new_document
+
+    def parse_top_level_statement(self, document):
+        """
+        Parse the statement at the current token and add it to 'document' with its range of tokens
+        """
+        first = self.current_token_index
+        first_error = len(self.errors)
+        stmt = self.parse_statement()
+        if self.log_statements:
+            logger.debug("Parsed statement: %s", stmt)
+        if self.current_token_index == first:
+            # Never stay on the same token, like the iteration guard of parse
+            self.advance()
+        document.append(first, self.current_token_index, stmt, self.errors[first_error:])
+        document.truncated = self.error_limit_reached
+
+    @staticmethod
+    def leading_matches(differences, limit):
+        """
+        Returns the number of False at the start of 'differences' (at most 'limit'),
+        'differences' being a map(ne, old, new) it's the number of leading tokens that are the same.
+        Everything runs in C and stops at the first difference
+        """
+        return min(next(compress(count(), differences), limit), limit)
+
+    @staticmethod
+    def brace_balance(types, values, first, end):
+        """
+        Returns the number of '{' minus the number of '}' in the tokens 'first' to 'end'
+        """
+        balance = 0
+        for index in range(first, end):
+            if types[index] == "DELIMITER":
+                if values[index] == "{":
+                    balance += 1
+                elif values[index] == "}":
+                    balance -= 1
+        return balance
+
 
     # ----------------- Utilitary Methods -------------------
     def advance(self): #simply increments the current_token_index to move to the next token
@@ -68,21 +362,47 @@ class DrawScriptParser:
             return None
         return self.tokens[self.current_token_index]
 
+    def current_line(self): #returns the line of the current token, or -1 if we are at the end
+        if self.is_at_end():
+            return -1
+        return self.token_lines[self.current_token_index]
+
+    def current_start(self): #returns the offset where the current token starts, or the end of the source if we are at the end
+        if self.is_at_end():
+            return self.previous_end()
+        return self.token_starts[self.current_token_index]
+
+    def current_end(self): #returns the offset where the current token ends, or the end of the source if we are at the end
+        if self.is_at_end():
+            return self.previous_end()
+        return self.token_ends[self.current_token_index]
+
+    def previous_end(self): #returns the offset where the last consumed token ends, or 0 if nothing was consumed
+        index = min(self.current_token_index, len(self.token_ends))
+        if index == 0:
+            return 0
+        return self.token_ends[index - 1]
+
+    def spanned(self, node, start): #sets the span of a node, from 'start' to the end of the last consumed token
+        node.start = start
+        node.end = self.previous_end()
+        return node
+
     def previous_token(self): #returns the token located just before the current index, or None if we are already at the very beginning
         if self.current_token_index == 0:
             return None
         return self.tokens[self.current_token_index - 1]
 
     def is_at_end(self): #indicates whether the current index has exceeded or reached the end of the token list
-        return self.current_token_index >= len(self.tokens)
+        return self.current_token_index >= len(self.token_types)
 
     def match(self, expected_type, expected_value=None): #checks that the current token matches a given type (and possibly a value), without consuming this token
-        if self.is_at_end():
+        index = self.current_token_index
+        if index >= len(self.token_types):
             return False
-        token = self.current_token()
-        if token["type"] != expected_type:
+        if self.token_types[index] != expected_type:
             return False
-        if expected_value is not None and token["value"] != expected_value:
+        if expected_value is not None and self.token_values[index] != expected_value:
             return False
         return True
 
@@ -96,32 +416,78 @@ class DrawScriptParser:
             raise ParserError(
                 f"Fin de fichier inattendue (attendu '{expected_type}' / '{expected_value}')."
             )
-        token = self.current_token()
-        if token["type"] != expected_type:
+        index = self.current_token_index
+        if self.token_types[index] != expected_type:
+            token = self.current_token()
             raise ParserError(
                 f"Type de token inattendu à la ligne {token['line']}. "
                 f"Attendu '{expected_type}', reçu '{token['type']}' (valeur='{token['value']}')."
             )
-        if expected_value is not None and token["value"] != expected_value:
+        if expected_value is not None and self.token_values[index] != expected_value:
+            token = self.current_token()
             raise ParserError(
                 f"Valeur de token inattendue à la ligne {token['line']}. "
                 f"Attendu '{expected_value}', reçu '{token['value']}'."
             )
-        self.advance()
-        return token
+        self.current_token_index += 1
+        return self.tokens[index]
+
+    def synchronize(self): #is used to "resynchronize" the parser in case of error, by jumping to the next reliable delimiter (just after a ; or on a }).
+        if self.sync_points is None:
+            self.sync_points = self.find_sync_points()
+        sync_points = self.sync_points
+        # The first sync point at or after the current token, the current one counts like before:
+        # if the previous token is a ';' or the current token is a '}', we don't move
+        index = bisect_left(sync_points, self.current_token_index)
+        self.current_token_index = sync_points[index] if index < len(sync_points) else len(self.token_types)
+
+    def find_sync_points(self):
+        """
+        Returns the sorted indexes of the tokens right after a ';' and of the '}' tokens, in one pass over the tokens
+        """
+        types = self.token_types
+        return [
+            index for index, value in enumerate(self.token_values)
+            if (value == "}" and types[index] == "DELIMITER") or (index > 0 and self.token_values[index - 1] == ";")
+        ]
 
-    def synchronize(self): #is used to "resynchronize" the parser in case of error, by advancing through the tokens until a reliable delimiter is encountered (often ; or }).
-        while not self.is_at_end():
-            prev = self.previous_token()
-            if prev and prev["value"] == ";":
-                return
-            curr = self.current_token()
-            if curr["type"] == "DELIMITER" and curr["value"] in ("}",):
-                return
+    def recover(self, error, start_line, start_index):
+        """
+        Record 'error', raised by the statement that started at 'start_index' on 'start_line',
+        then go to the next sync point. When max_errors errors are recorded the parser gives up
+        and goes to the end of the tokens, the errors raised on the way out are not recorded
+        """
+        if self.error_limit_reached:
+            return
+        # The error is recorded, with the span of the token where the parser stopped
+        self.errors.append({
+            "message": str(error),
+            "line": start_line,
+            "start": self.current_start(),
+            "end": self.current_end()
+        })
+
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.error_limit_reached = True
+            self.errors.append({
+                "message": f"Trop d'erreurs ({len(self.errors)}), l'analyse s'arrête ici.",
+                "line": self.current_line(),
+                "start": self.current_start(),
+                "end": self.current_end()
+            })
+            self.current_token_index = len(self.token_types)
+            return
+
+        # We call synchronization
+        self.synchronize()
+
+        # If we have not advanced at all, we advance one token
+        # to avoid repeating the same mistake over and over again
+        if self.current_token_index == start_index and not self.is_at_end():
             self.advance()
 
     def pushContext(self, ctx_type, line): #stacks a new context (eg for, if, block, etc) with the corresponding line
-        self.context_stack.append({"type": ctx_type, "line": line})
+        self.context_stack.append({"type": ctx_type, "line": line, "start": self.current_start()})
 
     def popContext(self): #Inverse of pushContext, it removes the last context added to the stack
         """
@@ -134,25 +500,13 @@ class DrawScriptParser:
 
     # ----------------- Parsing statements -------------------
     def parse_statement(self): #attempts to parse a statement from the current token (variable, if, for, etc.).
-        start_line = self.current_token()['line'] if not self.is_at_end() else -1
+        start_line = self.current_line()
         start_index = self.current_token_index  # <-- We memorize the starting index
 
         try:
             return self._parse_statement_internal()
         except ParserError as e:
-            # The error is recorded
-            self.errors.append({
-                "message": str(e),
-                "line": start_line
-            })
-            # We call synchronization
-            self.synchronize()
-
-            # If we have not advanced at all, we advance one token
-            # to avoid repeating the same mistake over and over again
-            if self.current_token_index == start_index and not self.is_at_end():
-                self.advance()
-
+            self.recover(e, start_line, start_index)
             return None
 
 
@@ -205,7 +559,8 @@ class DrawScriptParser:
         '''
         var IDENTIFIER [":" IDENTIFIER] "=" EXPRESSION ";" 
         '''
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         if not self.match('KEYWORD', 'var'):
             raise ParserError("Déclaration de variable invalide : mot-clé 'var' attendu avant ton identificateur.")
         self.consume('KEYWORD', 'var')
@@ -230,10 +585,10 @@ class DrawScriptParser:
         #Parse the expression following the '='
         expr = self.parse_expression()
         # Assign variable typing
-        if expr["node_type"] == "number":
+        if expr.kind == NUMBER:
             # See if it is a float or an int
-            var_type = "int" if isinstance(expr["value"], int) else "float" 
-        elif expr["node_type"] == "bool_literal":
+            var_type = "int" if isinstance(expr.value, int) else "float" 
+        elif expr.kind == BOOL_LITERAL:
             var_type = "bool"
 
         #A trailing semicolon is expected
@@ -241,17 +596,17 @@ class DrawScriptParser:
             raise ParserError(f"Point-virgule manquant après la déclaration de '{var_name}'.")
         self.consume('DELIMITER', ';')
 
-        return {
-            "node_type": "var_declaration",
-            "name": var_name,
-            "type": var_type,
-            "expression": expr,
-            "line": line_num  
-        }
+        return self.spanned(VarDeclaration(
+            name=var_name,
+            type=var_type,
+            expression=expr,
+            line=line_num
+        ), start)
 
 
     def parse_if_statement(self): #  parse a structure if(...) { ... } [else { ... }].
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         self.pushContext("if", line_num)
 
@@ -269,18 +624,18 @@ class DrawScriptParser:
         # end of if 
         self.popContext()
 
-        return {
-            "node_type": "if_statement",
-            "condition": condition,
-            "then_block": then_block,
-            "else_block": else_block,
-            "line": line_num
-        }
+        return self.spanned(IfStatement(
+            condition=condition,
+            then_block=then_block,
+            else_block=else_block,
+            line=line_num
+        ), start)
 
 
 
     def parse_for_statement(self): #analyzes the structure of a for(...) { ... } loop that includes an initialization, a condition, and an increment.
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         # Stack "for"
         self.pushContext("for", line_num)
@@ -299,18 +654,18 @@ class DrawScriptParser:
         # We arrive here => we have successfully parsed the 'for' + block => we unstack
         self.popContext()
 
-        return {
-            "node_type": "for_statement",
-            "init": init_node,
-            "condition": condition_node,
-            "increment": increment_node,
-            "body": body_node,
-            "line": line_num
-        }
+        return self.spanned(ForStatement(
+            init=init_node,
+            condition=condition_node,
+            increment=increment_node,
+            body=body_node,
+            line=line_num
+        ), start)
 
 
     def parse_while_statement(self): #parse a while(...) { ... } loop, checking for parentheses, a condition, and a block
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         self.pushContext("while", line_num)
 
@@ -322,16 +677,16 @@ class DrawScriptParser:
 
         self.popContext()
 
-        return {
-            "node_type": "while_statement",
-            "condition": condition_node,
-            "body": body_node,
-            "line": line_num
-        }
+        return self.spanned(WhileStatement(
+            condition=condition_node,
+            body=body_node,
+            line=line_num
+        ), start)
 
 
     def parse_do_while_statement(self): # handles the do { ... } while(...); loop whose syntax requires the block to precede the condition.
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         self.pushContext("do-while", line_num)
 
@@ -345,17 +700,17 @@ class DrawScriptParser:
 
         self.popContext()
 
-        return {
-            "node_type": "do_while_statement",
-            "condition": condition_node,
-            "body": body_node,
-            "line": line_num
-        }
+        return self.spanned(DoWhileStatement(
+            condition=condition_node,
+            body=body_node,
+            line=line_num
+        ), start)
 
 
     def parse_function_declaration(self): # parse a function declaration of type function name(...) { ... }.
 
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         self.pushContext("function", line_num)
 
         self.consume('KEYWORD', 'function')
@@ -367,13 +722,12 @@ class DrawScriptParser:
 
         self.popContext()
 
-        return {
-            "node_type": "function_declaration",
-            "name": func_name["value"],
-            "params": ...,
-            "body": func_body,
-            "line": line_num
-        }
+        return self.spanned(FunctionDeclaration(
+            name=func_name["value"],
+            params=...,
+            body=func_body,
+            line=line_num
+        ), start)
 
 
 
@@ -382,39 +736,37 @@ class DrawScriptParser:
         
 
     def parse_block(self): # expects an opening brace {, then parses multiple statements until the closing brace }.
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         self.pushContext("block", line_num)
         self.consume('DELIMITER', '{')
         statements = []
         while not self.is_at_end() and not self.match('DELIMITER', '}'):
             stmt = self.parse_statement()
-            if DEBUG:
-                print(stmt)
+            if self.log_statements:
+                logger.debug("Parsed statement: %s", stmt)
             if stmt:
                 statements.append(stmt)
         self.consume('DELIMITER', '}')
         # We found the '}', we can unstack the context
         self.popContext()
-        return {
-            "node_type": "block",
-            "statements": statements,
-            "line": line_num
-        }
+        return self.spanned(Block(
+            statements=statements,
+            line=line_num
+        ), start)
 
 
     def parse_expression_statement(self): # parses a simple expression followed by a semicolon, which forms a statement like x + 3;.
-        line_num = -1
-        if not self.is_at_end():
-            line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
 
         expr = self.parse_expression()
         self.consume('DELIMITER', ';')
-        return {
-            "node_type": "expression_statement",
-            "expression": expr,
-            "line": line_num
-        }
+        return self.spanned(ExpressionStatement(
+            expression=expr,
+            line=line_num
+        ), start)
 
 
 
@@ -422,12 +774,13 @@ class DrawScriptParser:
         """
         parse_empty_statement ::= ";"
         """
+        start = self.current_start()
         # Consume a semi-colon
         self.consume('DELIMITER', ';')
         # An empty node is returned (or a dict indicating an empty statement)
-        return {
-            "node_type": "empty_statement"
-        }
+        return self.spanned(EmptyStatement(
+
+        ), start)
 
 
 
@@ -441,6 +794,8 @@ class DrawScriptParser:
         """
         parse_expression ::= parse_assignment_expr()
         """
+        if self.pratt:
+            return self.parse_pratt_expr(ASSIGNMENT_PRECEDENCE)
         return self.parse_simple_assignment_expr() #
 
 # Assignment expression 
@@ -461,16 +816,64 @@ class DrawScriptParser:
         if self.match('ASSIGN', '='):
             self.consume('ASSIGN', '=')
             right = self.parse_simple_assignment_expr() #takes into account all the expressions x = y + 1, or even x = y = z + 2
-            return {
-                "node_type": "binary_op",
-                "op": "=",
-                "left": left,
-                "right": right
-            }
+            return self.spanned(BinaryOp(
+                op="=",
+                left=left,
+                right=right
+            ), left.start)
 
         return left
 
 
+# Pratt (operator precedence) expression
+    def parse_pratt_expr(self, min_precedence): # parses all the binary operators in one loop, with the precedence read from BINARY_PRECEDENCE.
+        """
+        Parses an expression whose binary operators all have a precedence of at least 'min_precedence'.
+        Builds the same nodes as parse_simple_assignment_expr, but a literal only goes through
+        this function and parse_unary_expr instead of the eight levels of the recursive chain
+        """
+        types = self.token_types
+        values = self.token_values
+        count = len(types)
+
+        # Fast path for the most frequent operands, a number or a variable, read directly from the token lists
+        index = self.current_token_index
+        token_type = types[index] if index < count else None
+        if token_type == 'NUMBER' or (token_type == 'IDENTIFIER' and not (
+                index + 1 < count and types[index + 1] == 'DELIMITER' and values[index + 1] == '(')):
+            left = (Number if token_type == 'NUMBER' else Identifier)(
+                values[index], self.token_starts[index], self.token_ends[index]
+            )
+            self.current_token_index = index + 1
+        else:
+            left = self.parse_unary_expr()
+
+        while self.current_token_index < count:
+            index = self.current_token_index
+            token_type = types[index]
+            if token_type == 'OPERATOR':
+                op = values[index]
+                precedence = BINARY_PRECEDENCE.get(op)
+                if precedence is None or precedence < min_precedence:
+                    break
+                self.current_token_index += 1
+                # Left associative, the right side only takes the operators that bind tighter
+                right = self.parse_pratt_expr(precedence + 1)
+            elif token_type == 'ASSIGN' and values[index] == '=' and min_precedence == ASSIGNMENT_PRECEDENCE:
+                op = '='
+                self.current_token_index += 1
+                # Right associative, x = y = z + 2 is x = (y = (z + 2))
+                right = self.parse_pratt_expr(ASSIGNMENT_PRECEDENCE)
+            else:
+                break
+            left = self.spanned(BinaryOp(
+                op=op,
+                left=left,
+                right=right
+            ), left.start)
+
+        return left
+
 # logical expression "OR" ||
     def parse_logical_or_expr(self): #analyzes the structure of an operation of type expr || expr.
         """
@@ -483,12 +886,11 @@ class DrawScriptParser:
         while self.match('OPERATOR', '||'):
             op_token = self.consume('OPERATOR', '||')
             right = self.parse_logical_and_expr()
-            left = {
-                "node_type": "binary_op",
-                "op": "||",
-                "left": left,
-                "right": right
-            }
+            left = self.spanned(BinaryOp(
+                op="||",
+                left=left,
+                right=right
+            ), left.start)
 
         return left
 
@@ -503,12 +905,11 @@ class DrawScriptParser:
         while self.match('OPERATOR', '&&'):
             op_token = self.consume('OPERATOR', '&&')
             right = self.parse_equality_expr()
-            left = {
-                "node_type": "binary_op",
-                "op": "&&",
-                "left": left,
-                "right": right
-            }
+            left = self.spanned(BinaryOp(
+                op="&&",
+                left=left,
+                right=right
+            ), left.start)
 
         return left
 
@@ -525,21 +926,19 @@ class DrawScriptParser:
             if self.match('OPERATOR', '=='):
                 self.consume('OPERATOR', '==')
                 right = self.parse_relational_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "==",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="==",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '!='):
                 self.consume('OPERATOR', '!=')
                 right = self.parse_relational_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "!=",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="!=",
+                    left=left,
+                    right=right
+                ), left.start)
             else:
                 break  # we get out of the loop
 
@@ -557,39 +956,35 @@ class DrawScriptParser:
             if self.match('OPERATOR', '<'):
                 self.consume('OPERATOR', '<')
                 right = self.parse_additive_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "<",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="<",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '<='):
                 self.consume('OPERATOR', '<=')
                 right = self.parse_additive_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "<=",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="<=",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '>'):
                 self.consume('OPERATOR', '>')
                 right = self.parse_additive_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": ">",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op=">",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '>='):
                 self.consume('OPERATOR', '>=')
                 right = self.parse_additive_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": ">=",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op=">=",
+                    left=left,
+                    right=right
+                ), left.start)
             else:
                 break
 
@@ -607,21 +1002,19 @@ class DrawScriptParser:
             if self.match('OPERATOR', '+'):
                 self.consume('OPERATOR', '+')
                 right = self.parse_multiplicative_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "+",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="+",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '-'):
                 self.consume('OPERATOR', '-')
                 right = self.parse_multiplicative_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "-",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="-",
+                    left=left,
+                    right=right
+                ), left.start)
             else:
                 break
 
@@ -639,30 +1032,27 @@ class DrawScriptParser:
             if self.match('OPERATOR', '*'):
                 self.consume('OPERATOR', '*')
                 right = self.parse_unary_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "*",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="*",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '/'):
                 self.consume('OPERATOR', '/')
                 right = self.parse_unary_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "/",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="/",
+                    left=left,
+                    right=right
+                ), left.start)
             elif self.match('OPERATOR', '%'):
                 self.consume('OPERATOR', '%')
                 right = self.parse_unary_expr()
-                left = {
-                    "node_type": "binary_op",
-                    "op": "%",
-                    "left": left,
-                    "right": right
-                }
+                left = self.spanned(BinaryOp(
+                    op="%",
+                    left=left,
+                    right=right
+                ), left.start)
             else:
                 break
 
@@ -676,32 +1066,30 @@ class DrawScriptParser:
         unary_expr ::= ("!" | "+" | "-") unary_expr
                     | primary_expr
         """
+        start = self.current_start()
         if not self.is_at_end():
             # Ex: !someVar
             if self.match('OPERATOR', '!'):
                 self.consume('OPERATOR', '!')
                 expr = self.parse_unary_expr()
-                return {
-                    "node_type": "unary_op",
-                    "op": "!",
-                    "expr": expr
-                }
+                return self.spanned(UnaryOp(
+                    op="!",
+                    expr=expr
+                ), start)
             elif self.match('OPERATOR', '+'):
                 self.consume('OPERATOR', '+')
                 expr = self.parse_unary_expr()
-                return {
-                    "node_type": "unary_op",
-                    "op": "+",
-                    "expr": expr
-                }
+                return self.spanned(UnaryOp(
+                    op="+",
+                    expr=expr
+                ), start)
             elif self.match('OPERATOR', '-'):
                 self.consume('OPERATOR', '-')
                 expr = self.parse_unary_expr()
-                return {
-                    "node_type": "unary_op",
-                    "op": "-",
-                    "expr": expr
-                }
+                return self.spanned(UnaryOp(
+                    op="-",
+                    expr=expr
+                ), start)
 
         # Otherwise, we come across the parse_primary_expr function
         return self.parse_primary_expr()
@@ -716,6 +1104,7 @@ class DrawScriptParser:
                     | IDENTIFIER [ ( DELIMITER("(") argument_list DELIMITER(")") )? ]
                     | "(" expression ")"
         """
+        start = self.current_start()
         # 1) Parentheses
         if self.match('DELIMITER', '('):
             self.consume('DELIMITER', '(')
@@ -726,35 +1115,32 @@ class DrawScriptParser:
         # 2) NUMBER
         if self.match('NUMBER'):
             token = self.consume('NUMBER')
-            return {
-                "node_type": "number",
-                "value": token["value"]
-            }
+            return self.spanned(Number(
+                value=token["value"]
+            ), start)
 
         # 3) BOOLEAN ("BOOLEAN" => true/false)
         #    or KEYWORD("true"/"false"), 
         if self.match('BOOLEAN', 'true'):
             self.consume('BOOLEAN', 'true')
-            return {"node_type": "bool_literal", "value": "true"}
+            return self.spanned(BoolLiteral(value="true"), start)
         if self.match('BOOLEAN', 'false'):
             self.consume('BOOLEAN', 'false')
-            return {"node_type": "bool_literal", "value": "false"}
+            return self.spanned(BoolLiteral(value="false"), start)
 
         # 4) STRING
         if self.match('STRING'):
             token = self.consume('STRING')
-            return {
-                "node_type": "string",
-                "value": token["value"]
-            }
+            return self.spanned(String(
+                value=token["value"]
+            ), start)
 
         # 5) IDENTIFIER (variable or potential function call)
         if self.match('IDENTIFIER'):
             id_token = self.consume('IDENTIFIER')
-            node = {
-                "node_type": "identifier",
-                "value": id_token["value"]
-            }
+            node = self.spanned(Identifier(
+                value=id_token["value"]
+            ), start)
 
             # Optional: if we see "(", then it is a function call
             # ex: drawCircle(...)
@@ -765,11 +1151,10 @@ class DrawScriptParser:
                     args = self.parse_argument_list()
                 self.consume('DELIMITER', ')')
                 # We build a call node
-                node = {
-                    "node_type": "call_expr",
-                    "callee": id_token["value"],
-                    "arguments": args
-                }
+                node = self.spanned(CallExpr(
+                    callee=id_token["value"],
+                    arguments=args
+                ), start)
 
             return node
 
@@ -793,7 +1178,7 @@ class DrawScriptParser:
         # Otherwise, if we have an IDENTIFIER -> potentially an assignment
         # as i = 0
         if self.match('IDENTIFIER'):
-            return self.parse_simple_assignment()
+            return self.parse_simple_assignment_expr()
 
         # Otherwise, it's empty (nothing)
         return None
@@ -805,7 +1190,8 @@ class DrawScriptParser:
         var IDENTIFIER [":" TYPE] "=" EXPRESSION
         (Not to be confused with the 'parse_var_declaration' version which consumes the ';')
         """
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         self.consume('KEYWORD', 'var')
 
         id_token = self.consume('IDENTIFIER')
@@ -821,13 +1207,12 @@ class DrawScriptParser:
         self.consume('ASSIGN', '=')
         expr = self.parse_expression()
 
-        return {
-            "node_type": "var_declaration_no_semi",
-            "name": var_name,
-            "type": var_type,
-            "expression": expr,
-            "line": line_num
-        }
+        return self.spanned(VarDeclarationNoSemi(
+            name=var_name,
+            type=var_type,
+            expression=expr,
+            line=line_num
+        ), start)
 
     # Increment
     def parse_assignment_expr(self): #handles the identifier = expression form without worrying about other assignment operators like += or -=.
@@ -836,6 +1221,7 @@ class DrawScriptParser:
         (in some languages, we also manage +=, -=, etc.
         but here we limit ourselves to '=')
         """
+        start = self.current_start()
         # An identifier is expected
         id_token = self.consume('IDENTIFIER')
         var_name = id_token['value']
@@ -844,12 +1230,11 @@ class DrawScriptParser:
         self.consume('ASSIGN', '=')
         # We parse the expression
         expr = self.parse_expression()
-        return {
-            "node_type": "assignment_expr",
-            "target": var_name,
-            "value": expr,
-            "line": line_num
-        }
+        return self.spanned(AssignmentExpr(
+            target=var_name,
+            value=expr,
+            line=line_num
+        ), start)
 
     # For function creation
     def parse_parameter_list(self): #reads a parameter list consisting of multiple identifiers separated by commas.
@@ -891,32 +1276,32 @@ class DrawScriptParser:
         """
         return_statement ::= 'return' [expression] ';'
         """
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         self.consume('KEYWORD', 'return')
 
     # Check if we have a direct semicolon or not
         if self.match('DELIMITER', ';'):
             self.consume('DELIMITER', ';')
-            return {
-                "node_type": "return_statement",
-                "expression": None,
-                "line": line_num
-            }
+            return self.spanned(ReturnStatement(
+                expression=None,
+                line=line_num
+            ), start)
         else:
             expr = self.parse_expression()
             self.consume('DELIMITER', ';')
-            return {
-                "node_type": "return_statement",
-                "expression": expr,
-                "line": line_num
-            }
+            return self.spanned(ReturnStatement(
+                expression=expr,
+                line=line_num
+            ), start)
 
 
 
 #-------------------------        "Real" drawing functions.   --------------------------------------------------------
 
     def parse_copy_statement(self): #parse the copy(expr, expr, expr, expr) to (expr, expr); instruction, used to copy something from one point to another.
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         self.consume('KEYWORD', 'copy')
         self.consume('DELIMITER', '(')
         #Read 4 expressions (separated by commas)
@@ -948,15 +1333,15 @@ class DrawScriptParser:
         self.consume('DELIMITER', ')')        
         self.consume('DELIMITER', ';')
 
-        return {
-            "node_type": "copy_statement",
-            "source": [expr1, expr2, expr3, expr4],
-            "destination": [expr5, expr6],
-            "line": line_num
-        }
+        return self.spanned(CopyStatement(
+            source=[expr1, expr2, expr3, expr4],
+            destination=[expr5, expr6],
+            line=line_num
+        ), start)
 
     def parse_animate_statement(self): # deals with the syntax animate(expr, expr) { ... }, which allows you to animate an object or property.
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         self.consume('KEYWORD', 'animate')
         self.consume('DELIMITER', '(')
         expr1 = self.parse_expression()
@@ -967,13 +1352,12 @@ class DrawScriptParser:
         # Consume ')'
         self.consume('DELIMITER', ')')        
         body_node = self.parse_block()
-        return {
-            "node_type": "animate_statement",
-            "obj_or_expr1": expr1,
-            "expr2": expr2,
-            "body": body_node,
-            "line": line_num
-        }
+        return self.spanned(AnimateStatement(
+            obj_or_expr1=expr1,
+            expr2=expr2,
+            body=body_node,
+            line=line_num
+        ), start)
 
 #████████████████████████████████████████████ CURSORS ████████████████████████████████████████████
 
@@ -982,7 +1366,8 @@ class DrawScriptParser:
         """
         cursor_declaration ::= 'cursor' IDENTIFIER '=' 'cursor' '(' [ argument_list ] ')' ';'
         """
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         # 1) We consume the keyword 'cursor'
         self.consume('KEYWORD', 'Cursor')
@@ -1014,12 +1399,11 @@ class DrawScriptParser:
         self.consume('DELIMITER', ';')
         
         # 9) We build the AST node
-        return {
-            "node_type": "cursor_declaration",
-            "name": var_name,
-            "constructor_args": args,
-            "line": line_num
-        }
+        return self.spanned(CursorDeclaration(
+            name=var_name,
+            constructor_args=args,
+            line=line_num
+        ), start)
 
     def looks_like_cursor_method(self): #  inspects the following tokens to determine if there is a pattern of type identifier . identifier (.
         # Check that there are enough tokens
@@ -1029,15 +1413,14 @@ class DrawScriptParser:
         if self.current_token_index + 3 >= len(self.tokens):
             return False
         
-        t1 = self.tokens[self.current_token_index]     # IDENTIFIER ?
-        t2 = self.tokens[self.current_token_index + 1] # '.' ?
-        t3 = self.tokens[self.current_token_index + 2] # IDENTIFIER ?
-        t4 = self.tokens[self.current_token_index + 3] # '(' ?
-
-        if t1["type"] == "IDENTIFIER" \
-        and t2["type"] == "ACCESS_OPERATOR" and t2["value"] == "." \
-        and t3["type"] == "IDENTIFIER" \
-        and t4["type"] == "DELIMITER" and t4["value"] == "(":
+        i = self.current_token_index
+        types = self.token_types
+        values = self.token_values
+
+        if types[i] == "IDENTIFIER" \
+        and types[i + 1] == "ACCESS_OPERATOR" and values[i + 1] == "." \
+        and types[i + 2] == "IDENTIFIER" \
+        and types[i + 3] == "DELIMITER" and values[i + 3] == "(":
             return True
         return False
 
@@ -1045,7 +1428,8 @@ class DrawScriptParser:
         """
         Pattern: IDENTIFIER '.' IDENTIFIER '(' [argument_list] ')' ';'
         """
-        line_num = self.current_token()["line"]
+        line_num = self.current_line()
+        start = self.current_start()
         
         # 1) Consume the object (eg: myCursor)
         obj_token = self.consume('IDENTIFIER')
@@ -1072,10 +1456,9 @@ class DrawScriptParser:
         # 7) Consume the ';'
         self.consume('DELIMITER', ';')
 
-        return {
-            "node_type": "cursor_method",
-            "cursor_name": cursor_name,
-            "method": method_name,
-            "arguments": args,
-            "line": line_num
-        }
\ No newline at end of file
+        return self.spanned(CursorMethod(
+            cursor_name=cursor_name,
+            method=method_name,
+            arguments=args,
+            line=line_num
+        ), start)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import glob
+import os
+import subprocess
+import tempfile
+import time
+
+from DrawScript.Core.drawScriptBuildCache import DrawScriptBuildCache
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("runtime")
+
+# The sources of the runtime, everything the C code of a script needs besides main.c and SDL
+LIBRARY_SOURCES = (
+    "DrawLibrary/C/Utils/shapes.c",
+    "DrawLibrary/C/Utils/cursor.c",
+    "DrawLibrary/C/Utils/utils.c",
+    "DrawLibrary/C/Utils/output.c",
+    "DrawLibrary/C/SDL2_gfx/SDL2_gfxPrimitives.c",
+    "DrawLibrary/C/SDL2_gfx/SDL2_rotozoom.c",
+)
+
+INCLUDE_DIRECTORIES = (
+    "DrawLibrary/C/SDL2/src/include",
+    "DrawLibrary/C/SDL2_gfx",
+    "DrawLibrary/C/Utils",
+)
+
+# The runtime is put with the SDL libraries
+LIBRARY_DIRECTORY = "DrawLibrary/C/SDL2/src/lib"
+LIBRARY_NAME = "libdrawpp.a"
+
+# The key of the sources the runtime was built from, next to it
+KEY_FILE = "libdrawpp.key"
+
+# Built once, so it can be optimized
+LIBRARY_FLAGS = ("-O2",)
+
+# Written by the deserializer for each script, only main.c reads it
+EXCLUDED_HEADERS = ("globals.h",)
+
+
+class DrawScriptRuntime:
+    """
+    The C runtime of the scripts (DrawLibrary/C/Utils and SDL2_gfx) built once into a static library,
+    libdrawpp.a in the directory of the SDL libraries. A run only compiles main.c and links it with the library.
+
+    The library is built again only when the hash of its sources and of the headers they include changed,
+    the hash is computed by a DrawScriptBuildCache so the files unchanged are not read again.
+    globals.h is not part of it: the size of the canvas is given to CreateWindow when the program starts.
+
+    Attributes
+    -----------
+    root : str
+        The directory of the project, where DrawLibrary is
+    cache : DrawScriptBuildCache
+        Computes the hash of the sources
+    build_time : float
+        How long the last build of the library took, in seconds, 0 when it was not built in this session
+    """
+
+    def __init__(self, root: str = None, cache: DrawScriptBuildCache = None) -> None:
+        """
+        Constructs a new DrawScriptRuntime.
+
+        Parameters
+        -----------
+        root : str
+            The directory of the project, the working directory if None
+        cache : DrawScriptBuildCache
+            The cache whose hashes are reused, a new one if None
+        """
+        self.root = root if root is not None else os.getcwd()
+        self.cache = cache if cache is not None else DrawScriptBuildCache()
+        self.build_time = 0.0
+
+    @property
+    def library(self) -> str:
+        """
+        Returns the path of the static library
+        """
+        return os.path.join(self.root, LIBRARY_DIRECTORY, LIBRARY_NAME)
+
+    def includes(self) -> list:
+        """
+        Returns the -I options of the runtime and of main.c
+        """
+        return [f"-I{self.root}/{directory}" for directory in INCLUDE_DIRECTORIES]
+
+    def sources(self) -> list:
+        """
+        Returns the paths of the sources of the library
+        """
+        return [f"{self.root}/{source}" for source in LIBRARY_SOURCES]
+
+    def key(self) -> str:
+        """
+        Returns the hash of the sources of the library, of the headers they can include and of the options of the build
+        """
+        return self.cache.key(["gcc", "-c", *LIBRARY_FLAGS, *self.includes(), *self.sources()], EXCLUDED_HEADERS)
+
+    def built_key(self) -> str:
+        """
+        Returns the key the library was built from, None when there is no library
+        """
+        if not os.path.exists(self.library):
+            return None
+        try:
+            with open(os.path.join(self.root, LIBRARY_DIRECTORY, KEY_FILE), "r") as file:
+                return file.read().strip()
+        except OSError:
+            return None
+
+    def ensure(self, capture_output: bool = False) -> bool:
+        """
+        Build the library if it is missing or if its sources changed
+
+        Parameters
+        -----------
+        capture_output : bool
+            Keep the output of gcc out of the console
+
+        Returns
+        -----------
+        bool
+            True when the library was built
+
+        Raises
+        -----------
+        subprocess.CalledProcessError
+            When the sources can't be compiled, the library already there is kept
+        """
+        key = self.key()
+        if self.built_key() == key:
+            return False
+
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as directory:
+            # gcc writes the object file of each source in its working directory
+            subprocess.run(["gcc", "-c", *LIBRARY_FLAGS, *self.includes(), *self.sources()],
+                           check=True, capture_output=capture_output, cwd=directory)
+            # Archived next to the library then renamed, a build that fails never leaves half of a library
+            temporary_library = f"{self.library}.{os.getpid()}.tmp"
+            try:
+                subprocess.run(["ar", "rcs", temporary_library, *sorted(glob.glob(os.path.join(directory, "*.o")))],
+                               check=True, capture_output=capture_output)
+                os.replace(temporary_library, self.library)
+            finally:
+                self.cache.remove(temporary_library)
+
+        with open(os.path.join(self.root, LIBRARY_DIRECTORY, KEY_FILE), "w") as file:
+            file.write(key + "\n")
+        self.build_time = time.perf_counter() - start
+        logger.info("Runtime library built in %.3fs", self.build_time)
+        return True
+
+    def command(self, main: str, executable: str) -> list:
+        """
+        Returns the gcc command that builds 'executable' from 'main', linked with the library
+
+        Parameters
+        -----------
+        main : str
+            The path of the main.c of the script
+        executable : str
+            The path of the executable to build
+        """
+        return [
+            "gcc",
+            *self.includes(),
+            main,
+            # The archive itself rather than -ldrawpp, so the build cache hashes it like a source
+            self.library,
+            f"-L{self.root}/{LIBRARY_DIRECTORY}",
+            "-lmingw32",
+            "-lSDL2main",
+            "-lSDL2",
+            f"-o{executable}",
+        ]
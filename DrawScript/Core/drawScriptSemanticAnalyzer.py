@@ -1,87 +1,233 @@
-from DrawScript.Core.globals import GLOBAL_SYMBOLS_FUNCTIONS, GLOBAL_SYMBOLS_CURSOR_FUNCTIONS, GLOBAL_SYMBOLS_VARIABLES
+from DrawScript.Core.drawScriptBuiltins import BUILTIN_FUNCTIONS, CURSOR_METHODS
+from DrawScript.Core.drawScriptSymbolTable import DrawScriptSymbolTable
+from DrawScript.Core.drawScriptAnalysisCache import DrawScriptFunctionAnalysis
+from DrawScript.Core.drawScriptTypes import (
+    # STRING is also the kind of the string literals
+    INT, FLOAT, BOOL, STRING as STRING_TYPE, CURSOR, NUMERIC_TYPES, ARITHMETIC_TYPES, DrawScriptTypeVariable,
+    DrawScriptTypeProxy, join, solve,
+)
+from DrawScript.Core.drawScriptAst import (
+    VAR_DECLARATION, VAR_DECLARATION_NO_SEMI, CURSOR_DECLARATION, IF_STATEMENT, FOR_STATEMENT,
+    WHILE_STATEMENT, DO_WHILE_STATEMENT, FUNCTION_DECLARATION, RETURN_STATEMENT, COPY_STATEMENT,
+    ANIMATE_STATEMENT, CURSOR_METHOD, EXPRESSION_STATEMENT, EMPTY_STATEMENT,
+    BINARY_OP, UNARY_OP, CALL_EXPR, IDENTIFIER, NUMBER, STRING, BOOL_LITERAL, NODE_TYPES,
+)
+
+# Version of the semantic analysis (its errors, the bindings and the types it records). It is part of the key
+# of DrawScriptAstCache, so it has to be increased when the analysis gives a different result for the same script
+ANALYZER_VERSION = 1
+
+# The operators whose result is a bool, whatever the type of their operands
+BOOLEAN_OPERATORS = frozenset(('==', '!=', '<', '>', '<=', '>=', '&&', '||'))
+
+# The types that don't change the type of a number in an arithmetic operation
+NARROW_TYPES = (None, BOOL, INT)
 
 class SemanticAnalyzer:
-    def __init__(self):
-        # Dictionary to store symbols (variables, functions, cursors) found during semantic analysis
-        self.symbols = {}
+    def __init__(self, cache=None, source=None):
+        # The analysis of the functions saved between two runs (see DrawScriptAnalysisCache), and the code
+        # the offsets of the nodes point into, the functions are only taken from the cache when both are given
+        self.cache = cache if source is not None else None
+        self.source = source
+        self.reset()
+
+        # Visitor of each kind of statement, indexed by the 'kind' of the node
+        self.statement_visitors = [self.analyze_unknown_statement] * len(NODE_TYPES)
+        self.statement_visitors[VAR_DECLARATION] = self.analyze_var_declaration
+        self.statement_visitors[CURSOR_DECLARATION] = self.analyze_cursor_declaration
+        self.statement_visitors[IF_STATEMENT] = self.analyze_if_statement
+        self.statement_visitors[FOR_STATEMENT] = self.analyze_for_statement
+        self.statement_visitors[WHILE_STATEMENT] = self.analyze_while_statement
+        self.statement_visitors[DO_WHILE_STATEMENT] = self.analyze_do_while_statement
+        self.statement_visitors[FUNCTION_DECLARATION] = self.analyze_function_declaration
+        self.statement_visitors[RETURN_STATEMENT] = self.analyze_return_statement
+        self.statement_visitors[COPY_STATEMENT] = self.analyze_copy_statement
+        self.statement_visitors[ANIMATE_STATEMENT] = self.analyze_animate_statement
+        self.statement_visitors[CURSOR_METHOD] = self.analyze_cursor_method
+        # No operation needed for empty statements
+        self.statement_visitors[EMPTY_STATEMENT] = self.analyze_nothing
+        self.statement_visitors[EXPRESSION_STATEMENT] = self.analyze_expression_statement
+        # Treat this as a variable declaration but missing a semicolon
+        self.statement_visitors[VAR_DECLARATION_NO_SEMI] = self.analyze_var_declaration
+
+        # Visitor of each kind of expression, the kinds that are not handled are not checked
+        self.expression_visitors = [self.analyze_nothing] * len(NODE_TYPES)
+        self.expression_visitors[BINARY_OP] = self.analyze_binary_op
+        self.expression_visitors[UNARY_OP] = self.analyze_unary_op
+        self.expression_visitors[IDENTIFIER] = self.analyze_identifier
+        self.expression_visitors[CALL_EXPR] = self.analyze_call_expr
+        # The literals are always valid as expressions, their visitors only return their type
+        self.expression_visitors[NUMBER] = self.analyze_number
+        self.expression_visitors[STRING] = self.analyze_string
+        self.expression_visitors[BOOL_LITERAL] = self.analyze_bool_literal
+
+    def reset(self):
+        """
+        Forgets everything found by the analysis, to analyze the script again from the start.
+        """
+        # Symbols (variables, functions, cursors) found during semantic analysis, one scope per block,
+        # the nodes that use a name get the DrawScriptSymbol it resolves to in their 'binding'
+        self.symbols = DrawScriptSymbolTable()
+        self.bindings = self.symbols.bindings
         # List to store any semantic errors found
         self.errors = []
+        # The type variables of the variables, functions and expressions whose type depends on the rest
+        # of the script, solved at the end of analyze (see drawScriptTypes)
+        self.type_variables = []
+        # The symbols and nodes whose value_type is one of these variables, given the type it resolves to
+        self.typed = []
+        # The type variable of the return of each function being analyzed, the innermost one last
+        self.return_types = []
+        # The symbols of the parameters of each function, by the symbol of the function
+        self.function_params = {}
+        # The function whose body is recorded for the cache (a DrawScriptFunctionAnalysis), None outside of it,
+        # the depth of its frame and the (proxy, variable) of the type variables declared outside of it, by name
+        self.record = None
+        self.record_frame = 0
+        self.proxies = {}
+        # The (key, entry, ports) of the functions recorded and of the functions taken from the cache,
+        # the ports are the type variables outside of the function its types depend on (see summarize)
+        self.recorded = []
+        self.replayed = []
+        # Every proxy of this analysis, and True when a function taken from the cache had a type conflict
+        self.proxy_variables = []
+        self.conflict = False
 
     def analyze(self, ast_nodes):
         """
         Analyzes a list of AST (Abstract Syntax Tree) nodes to perform semantic checks.
+        Then infers the type of the variables, the functions and the expressions,
+        recorded in the 'value_type' of their symbols and nodes.
         Returns a list of semantic errors found.
+        The body of a function is not analyzed again when it is in the cache, see analyze_function_declaration.
         """
+        visitors = self.statement_visitors
         for node in ast_nodes:
-            self.analyze_statement(node)
+            visitors[node.kind](node)
+
+        errors = len(self.errors)
+        solve(self.type_variables, self.errors)
+        if self.cache is not None:
+            if len(self.errors) > errors or self.conflict or any(proxy.conflict for proxy in self.proxy_variables):
+                # The proxies and the cached functions find the type errors at other places,
+                # a script with type errors is analyzed without the cache so they are reported as usual
+                self.cache = None
+                self.reset()
+                return self.analyze(ast_nodes)
+            if not self.update_cache():
+                # A function taken from the cache has to be analyzed again, the types in its body changed
+                self.reset()
+                return self.analyze(ast_nodes)
+        for item in self.typed:
+            item.value_type = item.value_type.type
         return self.errors
 
+    def update_cache(self):
+        """
+        Once the types are solved, checks that the types outside of the functions taken from the cache
+        are the ones their body was analyzed with, then saves the functions that were analyzed.
+        Returns False when a function taken from the cache has to be analyzed again.
+        """
+        cache = self.cache
+        stale = False
+        for key, entry, ports in self.replayed:
+            if {port: variable.type for port, variable in ports.items()} != entry.port_types:
+                cache.discard(key)
+                stale = True
+        if stale:
+            return False
+
+        for key, entry, ports in self.recorded:
+            entry.port_types = {port: variable.type for port, variable in ports.items()}
+            cache.store(key, entry)
+        cache.retain({key for key, _, _ in self.recorded} | {key for key, _, _ in self.replayed})
+        cache.hits += len(self.replayed)
+        cache.misses += len(self.recorded)
+        return True
+
+    def new_type_variable(self, description, value_type=None):
+        """
+        Returns a new DrawScriptTypeVariable, solved at the end of the analysis
+
+        Parameters
+        -----------
+        description : str
+            What it is the type of, for the error messages
+        value_type : str
+            The type it starts with
+        """
+        variable = DrawScriptTypeVariable(value_type, description)
+        self.type_variables.append(variable)
+        return variable
+
+    def set_value_type(self, item, value_type):
+        """
+        Records the type of a node or a symbol, and returns it
+        """
+        item.value_type = value_type
+        if isinstance(value_type, DrawScriptTypeVariable):
+            self.typed.append(item)
+        return value_type
+
     def analyze_statement(self, node):
         """
-        Dispatch method to analyze a statement based on its 'node_type'.
-        """
-        node_type = node["node_type"]
-
-        if node_type == "var_declaration":
-            self.analyze_var_declaration(node)
-        elif node_type == "cursor_declaration":
-            self.analyze_cursor_declaration(node)
-        elif node_type == "if_statement":
-            self.analyze_if_statement(node)
-        elif node_type == "for_statement":
-            self.analyze_for_statement(node)
-        elif node_type == "while_statement":
-            self.analyze_while_statement(node)
-        elif node_type == "do_while_statement":
-            self.analyze_do_while_statement(node)
-        elif node_type == "function_declaration":
-            self.analyze_function_declaration(node)
-        elif node_type == "return_statement":
-            self.analyze_return_statement(node)
-        elif node_type == "copy_statement":
-            self.analyze_copy_statement(node)
-        elif node_type == "animate_statement":
-            self.analyze_animate_statement(node)
-        elif node_type == "cursor_method":
-            self.analyze_cursor_method(node)
-        elif node_type == "empty_statement":
-            # No operation needed for empty statements
-            pass
-        elif node_type == "expression_statement":
-            self.analyze_expression_statement(node)
-        elif node_type == "var_declaration_no_semi":
-            # Treat this as a variable declaration but missing a semicolon
-            self.analyze_var_declaration(node)
-        else:
-            self.errors.append(f"Unknown statement: {node_type}")
+        Dispatch method to analyze a statement based on its 'kind', through statement_visitors.
+        """
+        self.statement_visitors[node.kind](node)
+
+    def analyze_unknown_statement(self, node):
+        """
+        Visitor of the nodes that can't be a statement.
+        """
+        self.errors.append(f"Unknown statement: {node.node_type}")
+
+    def analyze_nothing(self, node):
+        """
+        Visitor of the nodes that have nothing to check.
+        """
 
     def analyze_var_declaration(self, node):
         """
         Analyzes a variable declaration.
-        Checks if the variable was already declared, and if not, records its type.
+        Analyzes the initial value, then checks if the variable was already declared in this scope,
+        and if not, records it. Its type is the one of the initial value, widened by the values assigned later.
         """
-        var_name = node["name"]
-        if var_name in self.symbols:
+        # The value is analyzed first, in 'var x = x + 1;' the second x is the one of an outer scope
+        value_type = None
+        if node.expression is not None:
+            value_type = self.analyze_expression(node.expression)
+
+        var_name = node.name
+        # The type given by the parser (written after the name, or the one of a literal) is where it starts
+        variable = self.new_type_variable(
+            f"variable '{var_name}' (line {node.line})", node.type if node.type in NUMERIC_TYPES else None
+        )
+        variable.assign(value_type, self.errors)
+        node.binding = self.symbols.declare(var_name, "number", node.line, value_type=variable)
+        if node.binding is not None:
+            self.typed.append(node.binding)
+        else:
+            node.binding = self.symbols.lookup(var_name)
             self.errors.append(
-                f"Line {node['line']}: Variable '{var_name}' already declared."
+                f"Line {node.line}: Variable '{var_name}' already declared."
             )
-        else:
-            # Example: store 'number' by default
-            # In a more advanced analyzer, we'd use the type from the AST or symbol table
-            self.symbols[var_name] = "number"
 
     def analyze_cursor_declaration(self, node):
         """
         Analyzes a cursor declaration.
-        Checks if the cursor was already declared, and if not, records it.
+        Analyzes the arguments of the constructor, then checks if the cursor was already declared
+        in this scope, and if not, records it.
         """
-        cursor_name = node["name"]
-        if cursor_name in self.symbols:
+        for arg in node.constructor_args:
+            self.analyze_expression(arg)
+
+        cursor_name = node.name
+        node.binding = self.symbols.declare(cursor_name, "cursor", node.line, value_type=CURSOR)
+        if node.binding is None:
+            node.binding = self.symbols.lookup(cursor_name)
             self.errors.append(
-                f"Line {node['line']}: Cursor '{cursor_name}' already declared."
+                f"Line {node.line}: Cursor '{cursor_name}' already declared."
             )
-        else:
-            self.symbols[cursor_name] = "cursor"
 
     def analyze_cursor_method(self, node):
         """
@@ -89,30 +235,30 @@ class SemanticAnalyzer:
         Checks if the cursor is declared, if it's actually of type 'cursor',
         and if the method with the right number of arguments exists.
         """
-        cursor_name = node["cursor_name"]
-        if cursor_name not in self.symbols:
-            self.errors.append(f"Line {node['line']}: Variable '{cursor_name}' not declared.")
+        cursor_name = node.cursor_name
+        symbol = node.binding = self.symbols.lookup(cursor_name)
+        if self.record is not None and (symbol is None or symbol.frame < self.record_frame):
+            self.record.dependencies[cursor_name] = symbol.type if symbol is not None else None
+            if symbol is not None:
+                self.record.free_nodes.append((node, cursor_name))
+        if symbol is None:
+            self.errors.append(f"Line {node.line}: Variable '{cursor_name}' not declared.")
             return
-        if self.symbols[cursor_name] != "cursor":
-            self.errors.append(f"Line {node['line']}: '{cursor_name}' is not a cursor.")
+        if symbol.type != "cursor":
+            self.errors.append(f"Line {node.line}: '{cursor_name}' is not a cursor.")
             return
 
-        method = node["method"]
-        args = node["arguments"]
+        method = node.method
 
         # Check if the called method is in the valid cursor methods
-        if method not in GLOBAL_SYMBOLS_CURSOR_FUNCTIONS:
+        builtin = CURSOR_METHODS.get(method)
+        if builtin is None:
             self.errors.append(
-                f"Line {node['line']}: Unknown method '{method}' for a cursor."
+                f"Line {node.line}: Unknown method '{method}' for a cursor."
             )
             return
 
-        # Check that the number of arguments matches
-        expected_args = GLOBAL_SYMBOLS_CURSOR_FUNCTIONS[method]
-        if len(args) != expected_args:
-            self.errors.append(
-                f"Line {node['line']}: Method '{method}' expects {expected_args} argument(s), received {len(args)}."
-            )
+        self.analyze_builtin_arguments(builtin, node)
 
     def analyze_if_statement(self, node):
         """
@@ -121,78 +267,250 @@ class SemanticAnalyzer:
         2) Analyzes the 'then' block.
         3) If present, analyzes the 'else' block.
         """
-        self.analyze_expression(node["condition"])
-        self.analyze_block(node["then_block"])
-        if node["else_block"] is not None:
-            self.analyze_block(node["else_block"])
+        self.analyze_expression(node.condition)
+        self.analyze_block(node.then_block)
+        if node.else_block is not None:
+            self.analyze_block(node.else_block)
 
     def analyze_block(self, block_node):
         """
-        Analyzes a block, which is a list of statements.
+        Analyzes a block, which is a list of statements, in its own scope.
         """
-        for stmt in block_node["statements"]:
-            self.analyze_statement(stmt)
+        visitors = self.statement_visitors
+        self.symbols.enter_scope()
+        for stmt in block_node.statements:
+            visitors[stmt.kind](stmt)
+        self.symbols.exit_scope()
 
     def analyze_expression_statement(self, node):
         """
         Analyzes an expression statement (a standalone expression used as a statement).
         """
-        self.analyze_expression(node["expression"])
+        self.analyze_expression(node.expression)
 
     def analyze_expression(self, expr):
         """
         Analyzes an expression of various possible types, such as binary operations,
-        unary operations, function calls, or identifiers.
-        """
-        node_type = expr["node_type"]
-        if node_type == "binary_op":
-            self.analyze_expression(expr["left"])
-            self.analyze_expression(expr["right"])
-        elif node_type == "unary_op":
-            self.analyze_expression(expr["expr"])
-        elif node_type == "identifier":
-            # Check if the identifier is declared either in the local symbols
-            # or in the global list of variables
-            if expr["value"] not in self.symbols and expr["value"] not in GLOBAL_SYMBOLS_VARIABLES:
-                self.errors.append("Undeclared variable: " + expr["value"])
-        elif node_type in ("number", "string", "bool_literal"):
-            # These literals are always valid as expressions
-            pass
-        elif node_type == "call_expr":
-            # Check if the function (callee) is known, then verify argument count
-            if expr["callee"] in GLOBAL_SYMBOLS_FUNCTIONS:
-                expected_args = GLOBAL_SYMBOLS_FUNCTIONS[expr["callee"]]
-                if len(expr["arguments"]) != expected_args:
-                    self.errors.append(
-                        f"Function '{expr['callee']}' expects {expected_args} argument(s), received {len(expr['arguments'])}."
-                    )
-            # Analyze each argument in the function call
-            for arg in expr["arguments"]:
-                self.analyze_expression(arg)
+        unary operations, function calls, or identifiers, through expression_visitors.
+        Returns its type: a type of drawScriptTypes, a DrawScriptTypeVariable when it depends on variables,
+        or None when it has none (a call to a builtin).
+        """
         # In a more complete analyzer, more cases might be handled here
+        return self.expression_visitors[expr.kind](expr)
+
+    def analyze_number(self, expr):
+        """
+        Returns the type of a number literal.
+        """
+        return INT if isinstance(expr.value, int) else FLOAT
+
+    def analyze_string(self, expr):
+        """
+        Returns the type of a string literal.
+        """
+        return STRING_TYPE
+
+    def analyze_bool_literal(self, expr):
+        """
+        Returns the type of a boolean literal.
+        """
+        return BOOL
+
+    def analyze_binary_op(self, expr):
+        """
+        Analyzes both sides of a binary operation and returns the type of its result:
+        a bool for the comparisons and the logical operators, the type of the variable for an assignment
+        (whose type is widened by the value), and the widest type of the operands for the arithmetic, an int at least.
+        """
+        # The visitors of the operands are called directly, an expression is often a long chain of operations
+        visitors = self.expression_visitors
+        left = expr.left
+        right = expr.right
+        left_type = visitors[left.kind](left)
+        right_type = visitors[right.kind](right)
+
+        op = expr.op
+        if op in BOOLEAN_OPERATORS:
+            expr.value_type = BOOL
+            return BOOL
+        if op == '=':
+            if left.kind == IDENTIFIER and isinstance(left_type, DrawScriptTypeVariable):
+                left_type.assign(right_type, self.errors)
+            return self.set_value_type(expr, left_type)
+
+        # False when an operand is a DrawScriptTypeVariable, its type is only known at the end
+        result = ARITHMETIC_TYPES.get((left_type, right_type), False)
+        if result is False:
+            return self.set_value_type(expr, self.arithmetic_type_variable(op, left_type, right_type))
+        if result is None:
+            self.errors.append(f"Operator '{op}' can't be used on {left_type} and {right_type}.")
+        expr.value_type = result
+        return result
+
+    def arithmetic_type_variable(self, op, left_type, right_type):
+        """
+        Returns the type of the result of an arithmetic operation when an operand is a DrawScriptTypeVariable
+        """
+        # 'x + 1' has the type of x, when x is already a number that won't get narrower
+        if isinstance(left_type, DrawScriptTypeVariable) and left_type.type in (INT, FLOAT) \
+                and (right_type in NARROW_TYPES or right_type is left_type):
+            return left_type
+        if isinstance(right_type, DrawScriptTypeVariable) and right_type.type in (INT, FLOAT) \
+                and left_type in NARROW_TYPES:
+            return right_type
+        result = self.new_type_variable(f"the result of '{op}'", INT)
+        result.assign(left_type, self.errors)
+        result.assign(right_type, self.errors)
+        return result
+
+    def analyze_unary_op(self, expr):
+        """
+        Analyzes the operand of a unary operation and returns the type of its result,
+        a bool for '!', the type of the operand for '-' and '+', an int at least.
+        """
+        operand_type = self.analyze_expression(expr.expr)
+        op = expr.op
+        if op == '!':
+            expr.value_type = BOOL
+            return BOOL
+        result = ARITHMETIC_TYPES.get((operand_type, None), False)
+        if result is False:
+            return self.set_value_type(expr, self.arithmetic_type_variable(op, operand_type, None))
+        if result is None:
+            self.errors.append(f"Operator '{op}' can't be used on {operand_type}.")
+        expr.value_type = result
+        return result
+
+    def analyze_identifier(self, expr):
+        """
+        Checks if the identifier is declared in one of the visible scopes
+        (the global list of variables is the outermost one), and records its symbol on the node.
+        Returns the type of the symbol.
+        """
+        # Same as self.symbols.lookup, inlined since it runs for every identifier of the script
+        stack = self.bindings.get(expr.value)
+        if stack:
+            symbol = expr.binding = stack[-1]
+            return symbol.value_type
+        expr.binding = None
+        self.errors.append("Undeclared variable: " + expr.value)
+        return None
+
+    def analyze_free_identifier(self, expr):
+        """
+        Visitor of the identifiers in the body of a function recorded for the cache, like analyze_identifier,
+        but the names declared outside of the function are recorded (see free_type).
+        """
+        name = expr.value
+        stack = self.bindings.get(name)
+        if stack:
+            symbol = expr.binding = stack[-1]
+            if symbol.frame >= self.record_frame:
+                return symbol.value_type
+            self.record.free_nodes.append((expr, name))
+            return self.free_type(name, symbol)
+        expr.binding = None
+        self.record.dependencies[name] = None
+        self.errors.append("Undeclared variable: " + name)
+        return None
+
+    def analyze_call_expr(self, expr):
+        """
+        Checks if the function (callee) is known, then verifies the argument count
+        and analyzes each argument.
+        For a function of the script, the arguments widen the types of its parameters,
+        and the type of the call is the one of its return. A builtin returns nothing (None).
+        """
+        callee = expr.callee
+        visitors = self.expression_visitors
+        builtin = BUILTIN_FUNCTIONS.get(callee)
+        if builtin is not None:
+            self.analyze_builtin_arguments(builtin, expr)
+            # The node may be reused from the last analysis, when the callee was another function
+            expr.value_type = None
+            return None
+
+        arg_types = [visitors[arg.kind](arg) for arg in expr.arguments]
+        function = self.symbols.lookup(callee)
+        # A call in a recorded function to a function declared outside of it
+        free = self.record is not None and (function is None or function.frame < self.record_frame)
+        if function is None or function.type != "function":
+            if free:
+                self.record.dependencies[callee] = function.type if function is not None else None
+            expr.value_type = None
+            return None
+        for param, arg_type in zip(self.function_params.get(function, ()), arg_types):
+            param.value_type.assign(arg_type, self.errors)
+        return self.set_value_type(expr, self.free_type(callee, function) if free else function.value_type)
+
+    def analyze_builtin_arguments(self, builtin, node):
+        """
+        Analyzes the arguments of a call to a builtin (see drawScriptBuiltins), checks their number,
+        and the types of the arguments whose type is already known (a string or a cursor given for a number).
+        The types of the variables are only known after solve, they are not checked.
+
+        Parameters
+        -----------
+        builtin : DrawScriptBuiltin
+            The function or the method of the cursors called
+        node : CallExpr or CursorMethod
+            The call, all of its arguments are analyzed, whatever their number
+        """
+        args = node.arguments
+        if len(args) != builtin.arity:
+            self.errors.append(
+                f"{self.builtin_call_name(builtin, node)} expects {builtin.arity} argument(s), received {len(args)}."
+            )
+        visitors = self.expression_visitors
+        for arg, expected in zip(args, builtin.arg_types):
+            arg_type = visitors[arg.kind](arg)
+            # The known types are strings, the others are None or a DrawScriptTypeVariable
+            if arg_type.__class__ is str and arg_type not in expected:
+                described = "a number" if expected == NUMERIC_TYPES else "a " + " or a ".join(expected)
+                self.errors.append(
+                    f"{self.builtin_call_name(builtin, node)} expects {described} as argument {args.index(arg) + 1}, "
+                    f"received a {arg_type}."
+                )
+        for arg in args[builtin.arity:]:
+            visitors[arg.kind](arg)
+
+    @staticmethod
+    def builtin_call_name(builtin, node) -> str:
+        """
+        Returns how the messages about a call to a builtin start
+        """
+        if node.kind == CURSOR_METHOD:
+            return f"Line {node.line}: Method '{builtin.name}'"
+        return f"Function '{builtin.name}'"
 
     def analyze_for_statement(self, node):
         """
-        Analyzes a for-loop statement.
+        Analyzes a for-loop statement, in a scope of its own so the loop variable doesn't leak.
         1) Analyzes the init statement if present.
         2) Analyzes the condition expression if present.
         3) Analyzes the increment expression if present.
         4) Analyzes the body of the loop.
         """
-        init_node = node["init"]
+        self.symbols.enter_scope()
+        init_node = node.init
         if init_node is not None:
-            self.analyze_statement(init_node)
+            if init_node.kind == VAR_DECLARATION_NO_SEMI:
+                self.analyze_statement(init_node)
+            else:
+                # for (i = 0; ...), an assignment of a variable declared before the loop
+                self.analyze_expression(init_node)
 
-        condition_node = node["condition"]
+        condition_node = node.condition
         if condition_node is not None:
             self.analyze_expression(condition_node)
 
-        increment_node = node["increment"]
+        increment_node = node.increment
         if increment_node is not None:
             self.analyze_expression(increment_node)
 
-        body_node = node["body"]
+        body_node = node.body
         self.analyze_block(body_node)
+        self.symbols.exit_scope()
 
     def analyze_while_statement(self, node):
         """
@@ -200,11 +518,11 @@ class SemanticAnalyzer:
         1) Analyzes the condition expression if present.
         2) Analyzes the body of the loop.
         """
-        condition_node = node["condition"]
+        condition_node = node.condition
         if condition_node is not None:
             self.analyze_expression(condition_node)
 
-        body_node = node["body"]
+        body_node = node.body
         self.analyze_block(body_node)
 
     def analyze_do_while_statement(self, node):
@@ -212,41 +530,210 @@ class SemanticAnalyzer:
         Analyzes a do-while-loop statement.
         Note that the body is analyzed before the condition.
         """
-        self.analyze_block(node["body"])
-        self.analyze_expression(node["condition"])
+        self.analyze_block(node.body)
+        self.analyze_expression(node.condition)
 
     def analyze_function_declaration(self, node):
         """
         Analyzes a function declaration.
-        Checks if the function name was already declared, and if not, records it.
-        Then analyzes the function body.
-        """
-        func_name = node["name"]
-        if func_name in self.symbols:
+        Checks if the function name was already declared in this scope, and if not, records it.
+        Then analyzes the parameters and the body in the frame of the function.
+        The type of the function is the one of its return, the types of the parameters come from the calls.
+
+        With a cache, a function whose code didn't change and whose names refer to the same kinds of symbols
+        is taken from it (see replay_function), the body of the others is recorded in it.
+        """
+        func_name = node.name
+        first = len(self.type_variables)
+        return_type = self.new_type_variable(f"the return of '{func_name}' (line {node.line})")
+        function = node.binding = self.symbols.declare(func_name, "function", node.line, value_type=return_type)
+        if function is not None:
+            self.typed.append(function)
+        else:
+            node.binding = self.symbols.lookup(func_name)
             self.errors.append(
-                f"Line {node['line']}: Function '{func_name}' already declared."
+                f"Line {node.line}: Function '{func_name}' already declared."
             )
-        else:
-            self.symbols[func_name] = "function"
 
-        # Analyze the body of the function
-        body_block = node["body"]
-        self.analyze_block(body_block)
+        # A function declared in a recorded function is recorded with it,
+        # the types of the parameters come from the calls so a function with parameters is always analyzed
+        cache = self.cache
+        key = None
+        if cache is not None and self.record is None and not (isinstance(node.params, list) and node.params):
+            key = cache.key(self.source[node.start:node.end])
+            entry = cache.get(key)
+            if entry is not None and self.replay_function(key, entry, node, return_type):
+                return
+            entry = self.record = DrawScriptFunctionAnalysis(node.body, node.line)
+            self.proxies = {}
+            self.expression_visitors[IDENTIFIER] = self.analyze_free_identifier
+            errors = len(self.errors)
+
+        # The parameters and the statements of the body share the first scope of the function, like in C
+        symbols = self.symbols
+        symbols.enter_function()
+        if key is not None:
+            # The names of the frames below are declared outside of the function
+            self.record_frame = len(symbols.frame_sizes) - 1
+        params = []
+        if isinstance(node.params, list):
+            for param in node.params:
+                variable = self.new_type_variable(f"parameter '{param}' (line {node.line})")
+                symbol = symbols.declare(param, "number", node.line, value_type=variable)
+                if symbol is None:
+                    self.errors.append(f"Line {node.line}: Parameter '{param}' already declared.")
+                else:
+                    params.append(symbol)
+                    self.typed.append(symbol)
+        if function is not None:
+            self.function_params[function] = params
+
+        self.return_types.append(return_type)
+        visitors = self.statement_visitors
+        for stmt in node.body.statements:
+            visitors[stmt.kind](stmt)
+        self.return_types.pop()
+        node.frame_size = symbols.exit_function()
+
+        if key is not None:
+            self.expression_visitors[IDENTIFIER] = self.analyze_identifier
+            self.record = None
+            entry.errors = self.errors[errors:]
+            entry.frame_size = node.frame_size
+            entry.summary = self.summarize(first, return_type)
+            ports = {name: variable for name, (_, variable) in self.proxies.items()}
+            ports[None] = return_type
+            self.recorded.append((key, entry, ports))
+
+    def replay_function(self, key, entry, node, return_type):
+        """
+        Uses the analysis of a function saved in the cache instead of analyzing its body again:
+        binds the nodes of the body that use the names declared outside of it to the symbols of this analysis,
+        and gives the types outside of the function what the body gave them (see summarize).
+        Returns False when the entry can't be used, the body is not the same node
+        or a name the function uses now refers to another kind of symbol.
+
+        Parameters
+        -----------
+        key : str
+            The key of the function in the cache
+        entry : DrawScriptFunctionAnalysis
+            The analysis saved in the cache
+        node : FunctionDeclaration
+            The function
+        return_type : DrawScriptTypeVariable
+            The type variable of the return of the function in this analysis
+        """
+        # The errors of the body have line numbers, they would be wrong if the function moved
+        if entry.body is not node.body or (entry.errors and entry.line != node.line):
+            return False
+        lookup = self.symbols.lookup
+        for name, kind in entry.dependencies.items():
+            symbol = lookup(name)
+            if (symbol.type if symbol is not None else None) != kind:
+                return False
+
+        for free_node, name in entry.free_nodes:
+            free_node.binding = lookup(name)
+        node.frame_size = entry.frame_size
+        self.errors.extend(entry.errors)
+
+        ports = {port: return_type if port is None else lookup(port).value_type for port, _, _ in entry.summary}
+        errors = []
+        for port, value_type, sources in entry.summary:
+            variable = ports[port]
+            variable.assign(value_type, errors)
+            for source in sources:
+                variable.assign(ports[source], errors)
+        self.conflict = self.conflict or bool(errors)
+        self.replayed.append((key, entry, ports))
+        return True
+
+    def summarize(self, first, return_type):
+        """
+        Returns how the body of the recorded function changes the types outside of it
+        (see DrawScriptFunctionAnalysis.summary), from the type variables created since the index 'first'.
+
+        The body only reaches the types outside through the proxies and the return of the function,
+        the ports. For each port, it is the join of the types of the body that flow into it,
+        and the ports that flow into it through the variables of the body.
+        """
+        ports = {proxy: name for name, (proxy, _) in self.proxies.items()}
+        ports[return_type] = None
+        # A proxy and its variable flow into each other, it is not a flow of the body
+        # (the variable is in the body for a function that calls itself, it is its return)
+        links = {proxy: variable for proxy, variable in self.proxies.values()}
+        variables = self.type_variables[first:]
+        local = set(variables)
+        flows = {port: [port.type, set()] for port in ports}
+        for variable in variables:
+            is_port = variable in ports
+            if not is_port and variable.type is None:
+                continue
+            seen = {variable}
+            pending = [variable]
+            while pending:
+                current = pending.pop()
+                for user in current.users:
+                    if user in seen or user not in local or links.get(current) is user or links.get(user) is current:
+                        continue
+                    seen.add(user)
+                    if user not in ports:
+                        pending.append(user)
+                    elif is_port:
+                        flows[user][1].add(ports[variable])
+                    else:
+                        flows[user][0] = join(flows[user][0], variable.type)
+        return [(ports[port], value_type, tuple(sources)) for port, (value_type, sources) in flows.items()]
+
+    def free_type(self, name, symbol):
+        """
+        Records that the recorded function uses 'name', declared outside of it, and returns the type of its symbol.
+        A type variable is replaced by a proxy, a variable of the body that has the same type,
+        so what the body does to the types outside of it can be summarized (see summarize)
+
+        Parameters
+        -----------
+        name : str
+            The name used in the body
+        symbol : DrawScriptSymbol
+            What it refers to, None if it is not declared
+        """
+        if symbol is None:
+            self.record.dependencies[name] = None
+            return None
+        self.record.dependencies[name] = symbol.type
+        value_type = symbol.value_type
+        if not isinstance(value_type, DrawScriptTypeVariable):
+            return value_type
+        proxy = self.proxies.get(name)
+        if proxy is None:
+            proxy = DrawScriptTypeProxy(value_type.description)
+            self.type_variables.append(proxy)
+            self.proxy_variables.append(proxy)
+            self.proxies[name] = (proxy, value_type)
+            value_type.users.append(proxy)
+            proxy.users.append(value_type)
+            return proxy
+        return proxy[0]
 
     def analyze_return_statement(self, node):
         """
-        Analyzes a return statement by analyzing the returned expression if present.
+        Analyzes a return statement by analyzing the returned expression if present,
+        its type widens the one of the function.
         """
-        if node["expression"] is not None:
-            self.analyze_expression(node["expression"])
+        if node.expression is not None:
+            value_type = self.analyze_expression(node.expression)
+            if self.return_types:
+                self.return_types[-1].assign(value_type, self.errors)
 
     def analyze_copy_statement(self, node):
         """
         Analyzes a copy statement, which has source and destination expressions.
         """
-        for expr in node["source"]:
+        for expr in node.source:
             self.analyze_expression(expr)
-        for expr in node["destination"]:
+        for expr in node.destination:
             self.analyze_expression(expr)
 
     def analyze_animate_statement(self, node):
@@ -254,6 +741,6 @@ class SemanticAnalyzer:
         Analyzes an animate statement, which includes expressions and a body block
         to be semantically checked.
         """
-        self.analyze_expression(node["obj_or_expr1"])
-        self.analyze_expression(node["expr2"])
-        self.analyze_block(node["body"])
+        self.analyze_expression(node.obj_or_expr1)
+        self.analyze_expression(node.expr2)
+        self.analyze_block(node.body)
@@ -0,0 +1,173 @@
+from DrawScript.Core.globals import GLOBAL_SYMBOLS_VARIABLES
+from DrawScript.Core.drawScriptTypes import INT
+
+
+class DrawScriptSymbol:
+    """
+    A name declared in a DrawScript, the binding SemanticAnalyzer records on the nodes that use it,
+    so the code generators don't have to look the name up again.
+
+    Attributes
+    -----------
+    name : str
+        The name in the DrawScript
+    type : str
+        "number", "cursor", "function" or "builtin" (the variables of GLOBAL_SYMBOLS_VARIABLES)
+    scope : int
+        The depth of the scope where the name is declared, 0 for the builtins, 1 for the script
+    frame : int
+        The depth of the frame (the builtins, the script, then one per function) that holds the symbol
+    slot : int
+        The index of the symbol in its frame, the locals of a frame are numbered in the order they are declared
+    line : int
+        The line of the declaration, None for the builtins
+    c_name : str
+        The name written in the C code
+    value_type : str | DrawScriptTypeVariable
+        The type of the values of a variable ("int", "float", "bool", "string" or "cursor", see drawScriptTypes)
+        or of the return of a function, inferred by SemanticAnalyzer: a DrawScriptTypeVariable during the analysis,
+        then the type it resolved to (None if unknown)
+    """
+
+    __slots__ = ('name', 'type', 'scope', 'frame', 'slot', 'line', 'c_name', 'value_type')
+
+    def __init__(self, name, type, scope, frame, slot, line=None, c_name=None, value_type=None):
+        self.name = name
+        self.type = type
+        self.scope = scope
+        self.frame = frame
+        self.slot = slot
+        self.line = line
+        self.c_name = name if c_name is None else c_name
+        self.value_type = value_type
+
+    def __repr__(self) -> str:
+        return f"DrawScriptSymbol({self.name!r}, {self.type!r}, scope={self.scope}, frame={self.frame}, slot={self.slot})"
+
+
+class DrawScriptSymbolTable:
+    """
+    The symbols of a DrawScript, with one scope per block, for loop and function.
+
+    Each name maps to the stack of its visible declarations, the innermost one on top,
+    so looking a name up costs one dictionary access however deep the scopes are.
+    Leaving a scope pops the names it declared, an inner declaration hides the outer one until then.
+
+    The builtin variables (GLOBAL_SYMBOLS_VARIABLES) are declared in the scope 0, the script starts in the scope 1.
+
+    Attributes
+    -----------
+    bindings : dict
+        The stack of the visible DrawScriptSymbol of each name
+    scopes : list
+        The names declared in each open scope, the innermost one last
+    frame_sizes : list
+        The number of slots used in each open frame, the innermost one last
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs a new DrawScriptSymbolTable, with the builtins declared and the scope of the script open.
+        """
+        self.bindings = {}
+        self.scopes = [[]]
+        self.frame_sizes = [0]
+        for name, c_name in GLOBAL_SYMBOLS_VARIABLES.items():
+            # The sizes of the canvas, ints in globals.h
+            self.declare(name, "builtin", c_name=c_name, value_type=INT)
+        self.enter_function()
+
+    @property
+    def depth(self) -> int:
+        """
+        The depth of the innermost open scope
+        """
+        return len(self.scopes) - 1
+
+    def enter_scope(self) -> None:
+        """
+        Open a scope inside the current one (a block, or the init part of a for loop)
+        """
+        self.scopes.append([])
+
+    def exit_scope(self) -> None:
+        """
+        Close the innermost scope, its names are not visible anymore
+        """
+        bindings = self.bindings
+        for name in self.scopes.pop():
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+
+    def enter_function(self) -> None:
+        """
+        Open the frame and the scope of a function, its locals are numbered from the slot 0
+        """
+        self.frame_sizes.append(0)
+        self.enter_scope()
+
+    def exit_function(self) -> int:
+        """
+        Close the frame and the scope of a function
+
+        Returns
+        -----------
+        int
+            The number of slots the frame needed
+        """
+        self.exit_scope()
+        return self.frame_sizes.pop()
+
+    def declare(self, name: str, type: str, line: int = None, c_name: str = None, value_type=None):
+        """
+        Declare 'name' in the innermost scope, in the next free slot of the innermost frame
+
+        Parameters
+        -----------
+        name : str
+            The name to declare
+        type : str
+            The type of the symbol (see DrawScriptSymbol)
+        line : int
+            The line of the declaration
+        c_name : str
+            The name written in the C code, 'name' if None
+        value_type : str | DrawScriptTypeVariable
+            The type of its values, see DrawScriptSymbol
+
+        Returns
+        -----------
+        DrawScriptSymbol
+            The new symbol, or None when 'name' is already declared in this scope
+        """
+        stack = self.bindings.get(name)
+        depth = len(self.scopes) - 1
+        if stack and stack[-1].scope == depth:
+            return None
+
+        frame = len(self.frame_sizes) - 1
+        symbol = DrawScriptSymbol(name, type, depth, frame, self.frame_sizes[frame], line, c_name, value_type)
+        self.frame_sizes[frame] += 1
+        if stack:
+            stack.append(symbol)
+        else:
+            self.bindings[name] = [symbol]
+        self.scopes[depth].append(name)
+        return symbol
+
+    def lookup(self, name: str):
+        """
+        Returns the DrawScriptSymbol 'name' refers to in the innermost scope, or None if it is not declared
+
+        Parameters
+        -----------
+        name : str
+            The name to look up
+        """
+        stack = self.bindings.get(name)
+        return stack[-1] if stack else None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.bindings
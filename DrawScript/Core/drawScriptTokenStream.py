@@ -0,0 +1,277 @@
+from array import array
+
+# Every type a token can have, the index in this tuple is the code stored in the stream
+TOKEN_TYPES = (
+    'NUMBER', 'STRING', 'BOOLEAN', 'IDENTIFIER', 'KEYWORD',
+    'ACCESS_OPERATOR', 'OPERATOR', 'DELIMITER', 'ASSIGN', 'UNKNOWN',
+)
+
+# Reverse lookup, from the name of a type to its code
+TOKEN_TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class DrawScriptTokenView:
+    """
+    A lightweight view on one token of a DrawScriptTokenStream.
+    It reads like the dictionaries returned by DrawScriptTokenizer.tokenize
+    (token["type"], token["value"], token["line"], token["start"]...), without storing anything itself.
+
+    Attributes
+    -----------
+    stream : DrawScriptTokenStream
+        The stream the token belongs to
+    index : int
+        The index of the token in the stream
+    """
+
+    __slots__ = ('stream', 'index')
+
+    KEYS = ('type', 'value', 'line', 'column', 'start', 'end')
+
+    def __init__(self, stream: 'DrawScriptTokenStream', index: int) -> None:
+        self.stream = stream
+        self.index = index
+
+    def __getitem__(self, key: str):
+        stream = self.stream
+        if key == 'type':
+            return TOKEN_TYPES[stream.types[self.index]]
+        if key == 'value':
+            return stream.value_table[stream.value_ids[self.index]]
+        if key == 'line':
+            return stream.lines[self.index]
+        if key == 'column':
+            return stream.columns[self.index]
+        if key == 'start':
+            return stream.starts[self.index]
+        if key == 'end':
+            return stream.ends[self.index]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        if key in self.KEYS:
+            return self[key]
+        return default
+
+    def keys(self):
+        return self.KEYS
+
+    def to_dict(self) -> dict:
+        """
+        Returns the token as a dictionary, like the ones made by DrawScriptTokenizer.tokenize
+        """
+        return {key: self[key] for key in self.KEYS}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DrawScriptTokenView):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+
+class DrawScriptTokenStream:
+    """
+    A compact, column oriented storage of the tokens of a script.
+    Instead of one dictionary per token, each field is stored in its own array:
+    the type as a small integer code, the value as an index in a table of unique values,
+    the line, the column and the offsets as unsigned integers, and the errors as a bitmap.
+
+    Indexing the stream returns a DrawScriptTokenView, so the code written for
+    the list of dictionaries (like DrawScriptParser) works with it as is.
+
+    Attributes
+    -----------
+    types : array
+        The type code of each token, see TOKEN_TYPES
+    value_ids : array
+        For each token, the index of its value in value_table
+    value_table : list
+        Each distinct value met in the script, stored once
+    lines : array
+        The line of each token
+    columns : array
+        The column of each token (starting at 0, like the tk.Text indexes)
+    starts : array
+        The offset in the source where each token starts
+    ends : array
+        The offset in the source where each token ends
+    error_bits : bytearray
+        One bit per token, set when the token is an error
+    """
+
+    __slots__ = ('types', 'value_ids', 'value_table', 'lines', 'columns', 'starts', 'ends', 'error_bits', '_value_index', '_length')
+
+    def __init__(self) -> None:
+        self.types = array('B')
+        self.value_ids = array('I')
+        self.value_table = []
+        self.lines = array('I')
+        self.columns = array('I')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.error_bits = bytearray()
+        # Index of each value in value_table, used to store every value only once.
+        # Numbers that are whole are always ints, so 1 and 1.0 can't be mixed up
+        self._value_index = {}
+        self._length = 0
+
+    @classmethod
+    def from_tokens(cls, tokens: list, errors: list) -> 'DrawScriptTokenStream':
+        """
+        Build a stream from the tokens and errors returned by DrawScriptTokenizer.tokenize
+
+        Parameters
+        -----------
+        tokens : list
+            The tokens as dictionaries
+        errors : list
+            The error flag of each token
+        """
+        stream = cls()
+        stream.extend(
+            (token['type'], token['value'], token['line'], token['column'], error, token['start'], token['end'])
+            for token, error in zip(tokens, errors)
+        )
+        return stream
+
+    def append(self, token_type: str, value, line: int, column: int = 0, error: int = 0, start: int = 0, end: int = 0) -> None:
+        """
+        Add a token at the end of the stream
+
+        Parameters
+        -----------
+        token_type : str
+            The type of the token, one of TOKEN_TYPES
+        value : str | int | float
+            The value of the token
+        line : int
+            The line of the token
+        column : int
+            The column of the token
+        error : int
+            1 if the token is an error, 0 otherwise
+        start : int
+            The offset in the source where the token starts
+        end : int
+            The offset in the source where the token ends
+        """
+        index = self._length
+
+        value_id = self._value_index.get(value)
+        if value_id is None:
+            value_id = len(self.value_table)
+            self._value_index[value] = value_id
+            self.value_table.append(value)
+
+        self.types.append(TOKEN_TYPE_CODES[token_type])
+        self.value_ids.append(value_id)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.starts.append(start)
+        self.ends.append(end)
+
+        # One byte of the bitmap holds the errors of 8 tokens
+        if index & 7 == 0:
+            self.error_bits.append(0)
+        if error:
+            self.error_bits[index >> 3] |= 1 << (index & 7)
+
+        self._length += 1
+
+    def extend(self, tokens) -> None:
+        """
+        Add many tokens at the end of the stream, faster than calling append for each one
+
+        Parameters
+        -----------
+        tokens : iterable
+            Tuples (token_type, value, line, column, error, start, end), as yielded by DrawScriptTokenizer.lex
+        """
+        value_index = self._value_index
+        value_table = self.value_table
+        append_type = self.types.append
+        append_value_id = self.value_ids.append
+        append_line = self.lines.append
+        append_column = self.columns.append
+        append_start = self.starts.append
+        append_end = self.ends.append
+        error_bits = self.error_bits
+        index = self._length
+
+        for token_type, value, line, column, error, start, end in tokens:
+            value_id = value_index.get(value)
+            if value_id is None:
+                value_id = value_index[value] = len(value_table)
+                value_table.append(value)
+
+            append_type(TOKEN_TYPE_CODES[token_type])
+            append_value_id(value_id)
+            append_line(line)
+            append_column(column)
+            append_start(start)
+            append_end(end)
+
+            if index & 7 == 0:
+                error_bits.append(0)
+            if error:
+                error_bits[index >> 3] |= 1 << (index & 7)
+            index += 1
+
+        self._length = index
+
+    def is_error(self, index: int) -> bool:
+        """
+        Returns if the token at 'index' is an error
+        """
+        return bool(self.error_bits[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def errors(self) -> list:
+        """
+        The errors as a list of flags (0 or 1), like the one returned by DrawScriptTokenizer.tokenize
+        """
+        return [1 if self.is_error(i) else 0 for i in range(self._length)]
+
+    def to_dicts(self) -> list:
+        """
+        Returns the tokens as a list of dictionaries, like the one returned by DrawScriptTokenizer.tokenize
+        """
+        value_table = self.value_table
+        return [
+            {
+                'type': TOKEN_TYPES[token_type], 'value': value_table[value_id], 'line': line,
+                'column': column, 'start': start, 'end': end,
+            }
+            for token_type, value_id, line, column, start, end
+            in zip(self.types, self.value_ids, self.lines, self.columns, self.starts, self.ends)
+        ]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [DrawScriptTokenView(self, i) for i in range(*index.indices(self._length))]
+        if 0 <= index < self._length:
+            return DrawScriptTokenView(self, index)
+        if -self._length <= index < 0:
+            return DrawScriptTokenView(self, index + self._length)
+        raise IndexError("token index out of range")
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield DrawScriptTokenView(self, i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, DrawScriptTokenStream):
+            other = other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._length} tokens, {len(self.value_table)} distinct values)"
@@ -1,28 +1,123 @@
 import re  # Library for regular expressions
-from config import DEBUG
+import sys
+from bisect import bisect_left, bisect_right
+from logging import DEBUG, INFO
 
-# Define regular expressions for each token type
+from DrawScript.Core.drawScriptTokenStream import DrawScriptTokenStream
+from DrawScript.Core.drawScriptLogger import get_logger
+
+logger = get_logger("tokenizer")
+
+# What the lexer does with each kind of match
+SKIP = 0           # Ignored (whitespace, comments)
+NEWLINE = 1        # Go to the next line
+BLOCK_COMMENT = 2  # Ignored, but may contain newlines
+TOKEN = 3          # Token whose value is the matched text
+WORD = 4           # Identifier or keyword
+NUMBER = 5         # Number, converted to an int or a float
+STRING = 6         # String, without its quotes
+MISMATCH = 7       # Unrecognized character, recorded as an error
+
+# Define regular expressions for each token type, with what the lexer does with it
 TOKEN_SPECIFICATION = [
-    ('NEWLINE',             r'\n'),                      # New line
-    ('WHITESPACE',          r'[ \t]+'),                  # Spaces and tabs
-    ('MULTILINE_COMMENT',   r'/\*[\s\S]*?\*/'),          # Multi-line comment
-    ('COMMENT',             r'//.*'),                    # Single-line comment
-    ('NUMBER',              r'-?\d+(\.\d+)?|\.\d+'),     # Integer or decimal numbers (positive or negative)
-    ('STRING',              r'"[^"\n]*"'),               # String literals in quotes (no newlines)
-    ('BOOLEAN',             r'\b(true|false)\b'),        # Boolean values
-    ('IDENTIFIER',          r'[A-Za-z_]\w*'),            # Identifiers
-    ('ACCESS_OPERATOR',     r'\.'),                      # Dot operator (separated from other operators)
-    ('OPERATOR',            r'\+|\-|\*|\/|\%|==|!=|<=|>=|<|>|&&|\|\||!'),  # Operators
-    ('DELIMITER',           r'\(|\)|\{|\}|;|,|\:'),      # Delimiters
-    ('ASSIGN',              r'='),                       # Assignment operator
-    ('MISMATCH',            r'.'),                       # Unrecognized character
+    ('NEWLINE',             r'\n',                                          NEWLINE),        # New line
+    ('WHITESPACE',          r'[ \t]+',                                      SKIP),           # Spaces and tabs
+    ('MULTILINE_COMMENT',   r'/\*[\s\S]*?\*/',                              BLOCK_COMMENT),  # Multi-line comment
+    ('COMMENT',             r'//.*',                                        SKIP),           # Single-line comment
+    ('NUMBER',              r'-?\d+(?:\.\d+)?|\.\d+',                        NUMBER),         # Integer or decimal numbers (positive or negative)
+    ('STRING',              r'"[^"\n]*"',                                   STRING),         # String literals in quotes (no newlines)
+    ('BOOLEAN',             r'\b(?:true|false)\b',                          TOKEN),          # Boolean values
+    ('IDENTIFIER',          r'[A-Za-z_]\w*',                                WORD),           # Identifiers
+    ('ACCESS_OPERATOR',     r'\.',                                          TOKEN),          # Dot operator (separated from other operators)
+    ('OPERATOR',            r'\+|\-|\*|\/|\%|==|!=|<=|>=|<|>|&&|\|\||!',    TOKEN),          # Operators
+    ('DELIMITER',           r'\(|\)|\{|\}|;|,|\:',                          TOKEN),          # Delimiters
+    ('ASSIGN',              r'=',                                           TOKEN),          # Assignment operator
+    ('MISMATCH',            r'.',                                           MISMATCH),       # Unrecognized character
 ]
 
+# All the regular expressions compiled once into one pattern.
+# The spaces before a token are matched with it, which halves the number of matches to go through
+# (WHITESPACE is still needed for the spaces at the very end of the code).
+# Every character is matched by something (MISMATCH catches anything but a newline),
+# so iterating over the matches goes through the whole code without gaps
+TOKEN_REGEX = re.compile(
+    '[ \t]*(?:' + '|'.join('(?P<%s>%s)' % (kind, regex) for kind, regex, action in TOKEN_SPECIFICATION) + ')'
+)
+
+# For each group index of TOKEN_REGEX (the 'lastindex' of a match), what to do and the type of the token
+TOKEN_ACTIONS = [None] * (TOKEN_REGEX.groups + 1)
+for kind, regex, action in TOKEN_SPECIFICATION:
+    TOKEN_ACTIONS[TOKEN_REGEX.groupindex[kind]] = (action, kind)
+
 # Language keywords
-KEYWORDS = [
+KEYWORDS = frozenset({
     'var', 'function', 'if', 'else', 'while', 'for',
     'copy', 'animate', 'to', 'Cursor', 'return', 'do',
-]
+})
+
+# How far past the end of a token the regular expressions may look before deciding on a match.
+# ("1" followed by ".5" becomes "1.5", an identifier followed by a letter keeps growing, etc.)
+TOKEN_LOOKAHEAD = 2
+
+# What iter_tokens skips without lexing it, once it knows it's in a comment
+SKIP_LINE_COMMENT = 1   # Until the newline
+SKIP_BLOCK_COMMENT = 2  # Until "*/"
+
+# Horizon used for tokens whose match depends on the rest of the file,
+# for example a "/" that opens a "/*" comment which is never closed
+UNBOUNDED_HORIZON = sys.maxsize
+
+
+def token_horizon(code, token_type, value, end):
+    """
+    Returns the offset up to which the regular expressions looked in 'code' to match a token ending at 'end'.
+    The token stays the same as long as the code before this offset doesn't change.
+    """
+    if value == '/' and code.startswith('*', end):
+        # The start of an unclosed "/*", which depends on the whole file
+        return UNBOUNDED_HORIZON
+    if value == '"' and token_type == 'UNKNOWN':
+        # An unclosed string, which depends on the rest of the line
+        line_end = code.find('\n', end)
+        return UNBOUNDED_HORIZON if line_end == -1 else line_end + 1
+    # Otherwise the regular expressions look a few characters past the token
+    return end + TOKEN_LOOKAHEAD
+
+
+class DrawScriptTokenDocument:
+    """
+    The result of a tokenization that can be updated incrementally.
+    Alongside the tokens and errors returned by DrawScriptTokenizer.tokenize,
+    it keeps the position of every token in the source, so an edit can be re-lexed locally.
+
+    Attributes
+    -----------
+    source : str
+        The source code that was tokenized
+    tokens : list
+        The tokens, exactly as returned by DrawScriptTokenizer.tokenize
+    errors : list
+        The error flags, exactly as returned by DrawScriptTokenizer.tokenize
+    starts : list
+        The offset in the source where each token starts
+    ends : list
+        The offset in the source where each token ends
+    horizons : list
+        For each token, the furthest offset the regular expressions looked at to match it
+    reach : list
+        For each token, the furthest offset that the tokens up to this one depend on.
+        A token can be kept after an edit only if its reach is before the edit.
+    """
+
+    def __init__(self, source, tokens, errors, starts, ends, horizons, reach):
+        self.source = source
+        self.tokens = tokens
+        self.errors = errors
+        self.starts = starts
+        self.ends = ends
+        self.horizons = horizons
+        self.reach = reach
+
 
 class DrawScriptTokenizer:
     def __init__(self):
@@ -38,85 +133,500 @@ class DrawScriptTokenizer:
         This method takes a string 'code' containing the source code of the draw++ language.
         It returns a list of tokens and a corresponding list of errors.
         
-        Each token is represented as a dictionary with keys like 'type', 'value', and 'line'.
+        Each token is represented as a dictionary with the keys 'type', 'value', 'line', 'column',
+        'start' and 'end'. 'column' starts at 0 (like the tk.Text indexes), 'start' and 'end' are
+        the offsets of the token in 'code', so the token is code[start:end].
         Each error is represented by an integer (0 if no error, 1 if there was an error with the token).
         """
-
-        # Compile all regular expressions into one pattern
-        tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPECIFICATION)
-        # Use MULTILINE so that '^' and '$' anchors match lines appropriately if needed
-        get_token = re.compile(tok_regex, re.MULTILINE).match
-
-        # Variables for tokenization
-        pos = 0          # Current position in the code string
         tokens = []      # List of produced tokens
         errors = []      # List of error flags (0 or 1)
-        line_number = 1  # Start line numbering at 1
 
-        # Start matching tokens from the beginning of the code
-        mo = get_token(code, pos)  # 'mo' is a Match object
-        while mo is not None:
-            kind = mo.lastgroup    # The type of the token (group name)
-            value = mo.group(kind) # The actual text matched by this token
+        for token_type, value, line, column, error, start, end in self.lex(code):
+            tokens.append({'type': token_type, 'value': value, 'line': line, 'column': column, 'start': start, 'end': end})
+            errors.append(error)
+
+        if logger.isEnabledFor(INFO):
+            logger.info("Tokenization complete: %d tokens, %d errors", len(tokens), sum(errors))
+        return tokens, errors
+
+    def tokenize_stream(self, code):
+        """
+        Tokenize 'code' like tokenize does, but store the tokens in a compact DrawScriptTokenStream
+        instead of a list of dictionaries. The errors are stored in the stream.
+        The stream can be given to DrawScriptParser in place of the list of tokens.
+
+        Parameters
+        -----------
+        code : str
+            The source code to tokenize
+
+        Returns
+        -----------
+        DrawScriptTokenStream
+            The tokens of 'code', with their line and column
+        """
+        stream = DrawScriptTokenStream()
+        stream.extend(self.lex(code))
+        return stream
+
+    def iter_tokens(self, stream, chunk_size=65536):
+        """
+        Tokenize the content of a file object, reading it in chunks of 'chunk_size' characters.
+        The tokens are yielded one by one as the file is read: the buffer only keeps the current chunk
+        and the token that isn't finished at its end. Tokens spanning two chunks are handled, a token is only
+        yielded once everything its match depends on has been read, the rest is lexed again with the next chunk.
+
+        The comments are skipped as they are read, without being kept, whatever their length.
+        A "/*" that is never closed isn't a comment (its characters are tokens): at the end of the file
+        the stream is read again from the "/*" if it's seekable, otherwise the rest of the file was kept.
+
+        Only the tokenizer streams: DrawScriptParser needs all the tokens, in a list or a DrawScriptTokenStream,
+        so the tokens of a whole script are still collected before parsing.
+
+        Parameters
+        -----------
+        stream : file object
+            The file to read, opened in text mode
+        chunk_size : int
+            The number of characters read at once
+
+        Yields
+        -----------
+        dict
+            The tokens, exactly like the ones returned by tokenize
+            (a token is an error when its type is 'UNKNOWN')
+        """
+        buffer = ""  # Always the end of what was read, with the character before 'pos' (\b in BOOLEAN looks behind)
+        read_offset = 0  # Number of characters read, the buffer starts at read_offset - len(buffer) in the file
+        pos = 0  # Where the lexing starts in the buffer
+        line_number = 1
+        column = 0  # Column of 'pos'
+
+        # The comment being skipped without being lexed (SKIP_LINE_COMMENT or SKIP_BLOCK_COMMENT), None if none
+        skipping = None
+        previous = ""  # The last character skipped, "*/" can be split between two chunks
+        # To lex again from a "/*" that is never closed: its offset, line and column, the character before it,
+        # and what was read from it with the position of the stream after it (or all the rest of the file)
+        unclosed = None
+        # The "/*" from this offset are known to be never closed, they are tokens
+        unclosed_from = sys.maxsize
+
+        while True:
+            chunk = stream.read(chunk_size)
+            at_end = not chunk
+            chunk_offset = read_offset
+            read_offset += len(chunk)
+
+            if skipping == SKIP_LINE_COMMENT:
+                index = chunk.find('\n')
+                if index == -1:
+                    column += len(chunk)
+                    if not at_end:
+                        previous = chunk[-1]
+                        continue
+                    return
+                # The newline is lexed as usual
+                column += index
+                skipping = None
+                buffer = (previous + chunk[:index])[-1:] + chunk[index:]
+                pos = len(buffer) - len(chunk) + index
+            elif skipping == SKIP_BLOCK_COMMENT:
+                text = previous + chunk
+                index = text.find('*/')
+                if index == -1 and not at_end:
+                    line_number, column = self.skip_lines(chunk, line_number, column)
+                    if unclosed[4] is None:
+                        unclosed[3].append(chunk)
+                    previous = chunk[-1]
+                    continue
+                if index != -1:
+                    # The comment ends right after "*/"
+                    comment_end = index + 2 - len(previous)
+                    line_number, column = self.skip_lines(chunk[:comment_end], line_number, column)
+                    skipping = None
+                    unclosed = None
+                    buffer = "/" + chunk[comment_end:]
+                    pos = 1
+                else:
+                    # Never closed: lexed again from the "/*"
+                    skipping = None
+                    comment_offset, line_number, column, parts, cookie, before = unclosed
+                    unclosed = None
+                    unclosed_from = comment_offset
+                    if cookie is not None:
+                        stream.seek(cookie)
+                        at_end = False
+                    buffer = before + "".join(parts)
+                    pos = len(before)
+                    read_offset = comment_offset + len(buffer) - pos
+            else:
+                buffer += chunk
+            buffer_offset = read_offset - len(buffer)
+
+            # Position, line and column right after the last token that is sure not to change
+            safe_end = pos
+            safe_line = line_number
+            safe_column = column
+
+            for token_type, value, line, token_column, error, start, end in self.lex(
+                    buffer, pos, line_number, pos - column, progress=True):
+                if token_type is None:
+                    # A newline, spaces or a comment, nothing to yield but everything before 'end' is done
+                    if value == 'COMMENT' and end == len(buffer) and not at_end:
+                        # The comment goes on in the next chunk, the rest of its line is skipped
+                        skipping = SKIP_LINE_COMMENT
+                    safe_end = end
+                    safe_line = line
+                    safe_column = token_column
+                    continue
+                if not at_end and token_horizon(buffer, token_type, value, end) > len(buffer):
+                    if value != '/' or not buffer.startswith('*', end):
+                        # The token may change with the next chunk
+                        break
+                    if buffer_offset + start < unclosed_from:
+                        # A "/*" not closed yet, skipped until "*/" is read
+                        skipping = SKIP_BLOCK_COMMENT
+                        comment_line, comment_column = self.skip_lines(buffer[start:], line, token_column)
+                        seekable = stream.seekable()
+                        unclosed = [
+                            buffer_offset + start, line, token_column, [buffer[start:]],
+                            stream.tell() if seekable else None, buffer[start - 1:start],
+                        ]
+                        # The "*" of "/*" can't be the start of "*/"
+                        previous = buffer[-1] if len(buffer) - start > 2 else ""
+                        safe_end = len(buffer)
+                        safe_line = comment_line
+                        safe_column = comment_column
+                        break
+                    # After a "/*" that is never closed, a "/*" is never closed either, it's a token
+                yield {
+                    'type': token_type, 'value': value, 'line': line, 'column': token_column,
+                    'start': buffer_offset + start, 'end': buffer_offset + end,
+                }
+                safe_end = end
+                safe_line = line
+                safe_column = token_column + end - start  # Tokens never span multiple lines
+
+            if at_end:
+                return
+
+            if skipping == SKIP_LINE_COMMENT:
+                previous = buffer[-1:]
+            # Keep what hasn't been yielded for the next chunk, with the character before it
+            # since some regular expressions look behind the token (\b in BOOLEAN)
+            if safe_end > pos:
+                buffer = buffer[safe_end - 1:]
+                pos = 1
+            line_number = safe_line
+            column = safe_column
+
+    @staticmethod
+    def skip_lines(text, line_number, column):
+        """
+        Returns the line and the column after 'text', which starts at 'line_number' and 'column'
+        """
+        newlines = text.count('\n')
+        if not newlines:
+            return line_number, column + len(text)
+        return line_number + newlines, len(text) - text.rfind('\n') - 1
+
+    def scan(self, code, pos=0, line_number=1):
+        """
+        Same as lex, but yields the tokens as dictionaries, like the ones returned by tokenize.
+
+        Yields, for each token, a tuple (token, error, start, end)
+        where 'start' and 'end' are the offsets of the token in 'code'.
+        """
+        for token_type, value, line, column, error, start, end in self.lex(code, pos, line_number):
+            yield {'type': token_type, 'value': value, 'line': line, 'column': column, 'start': start, 'end': end}, error, start, end
+
+    def lex(self, code, pos=0, line_number=1, line_start=None, progress=False):
+        """
+        Generator doing the actual lexing of 'code', starting at the offset 'pos'
+        which must be at the line 'line_number'.
+        'pos' must be the start of a token (or of a whitespace, comment, etc.) of a previous lexing.
+        'line_start' is the offset where the line of 'pos' starts, it's found in 'code' when not given
+        (it's negative when 'code' starts in the middle of a line).
+
+        Yields, for each token, a tuple (token_type, value, line, column, error, start, end)
+        where 'column' starts at 0, 'error' is 1 for an unrecognized character (0 otherwise)
+        and 'start' and 'end' are the offsets of the token in 'code'.
+        With 'progress', the newlines, spaces and comments are yielded too, as (None, kind, line, column, 0, start, end)
+        with the line and the column right after them, so iter_tokens knows how far the lexing went.
+        """
+        # Offset where the current line starts, to get the columns
+        if line_start is None:
+            line_start = code.rfind('\n', 0, pos) + 1
+        # Checked once, so nothing is paid per token when the debug records are filtered out
+        debug = logger.isEnabledFor(DEBUG)
+        actions = TOKEN_ACTIONS
 
-            if DEBUG:
-                # Debug: Print the current token information
+        for mo in TOKEN_REGEX.finditer(code, pos):
+            # The group that matched tells what to do with the match
+            group = mo.lastindex
+            action, kind = actions[group]
+
+            if debug:
                 # 'repr(value)' adds quotes; [1:-1] removes them for tidier output
-                print(f"Matched {kind}: '{repr(value)[1:-1]}' at line {line_number}")
+                logger.debug("Matched %s: '%s' at line %d", kind, repr(mo.group(group))[1:-1], line_number)
+
+            # The most frequent actions are tested first
+            if action == SKIP:
+                # Whitespace and single-line comments are ignored (not stored as tokens)
+                if progress:
+                    yield None, kind, line_number, mo.end() - line_start, 0, mo.start(), mo.end()
+                continue
 
-            if kind == 'NEWLINE':
+            # The token itself starts after the spaces matched in front of it
+            start, end = mo.span(group)
+
+            if action == TOKEN:
+                # Booleans, operators, delimiters, assignment signs, or dot operators
+                yield kind, mo.group(group), line_number, start - line_start, 0, start, end
+            elif action == WORD:
+                # If the identifier is a language keyword, change its type to KEYWORD
+                value = mo.group(group)
+                yield ('KEYWORD' if value in KEYWORDS else kind), value, line_number, start - line_start, 0, start, end
+            elif action == NEWLINE:
                 # If we encounter a newline, increment the line counter
                 line_number += 1
-            elif kind == 'WHITESPACE':
-                # Whitespace is ignored (not stored as a token)
-                pass
-            elif kind == 'MULTILINE_COMMENT':
-                # For a multi-line comment, count the number of newlines it contains
-                line_number += value.count('\n')
-            elif kind == 'COMMENT':
-                # Single-line comment is ignored
-                pass
-            elif kind == 'NUMBER':
+                line_start = end
+                if progress:
+                    yield None, kind, line_number, 0, 0, start, end
+            elif action == NUMBER:
                 # Convert the string to a float; if it's an integer value, round it
-                number = float(value)
-                if float.is_integer(number):
+                number = float(mo.group(group))
+                if number.is_integer():
                     number = round(number)
-                tokens.append({'type': kind, 'value': number, 'line': line_number})
-                errors.append(0)
-            elif kind == 'STRING':
+                yield kind, number, line_number, start - line_start, 0, start, end
+            elif action == STRING:
                 # Remove the surrounding quotes
-                tokens.append({'type': kind, 'value': value[1:-1], 'line': line_number})
-                errors.append(0)
-            elif kind == 'BOOLEAN':
-                tokens.append({'type': kind, 'value': value, 'line': line_number})
-                errors.append(0)
-            elif kind == 'IDENTIFIER':
-                # If the identifier is a language keyword, change its type to KEYWORD
-                if value in KEYWORDS:
-                    kind = 'KEYWORD'
-                tokens.append({'type': kind, 'value': value, 'line': line_number})
-                errors.append(0)
-            elif kind in {'OPERATOR', 'DELIMITER', 'ASSIGN', 'ACCESS_OPERATOR'}:
-                # Operators, delimiters, assignment signs, or dot operators
-                tokens.append({'type': kind, 'value': value, 'line': line_number})
-                errors.append(0)
-            elif kind == 'MISMATCH':
+                yield kind, code[start + 1:end - 1], line_number, start - line_start, 0, start, end
+            elif action == BLOCK_COMMENT:
+                # For a multi-line comment, count the number of newlines it contains
+                newlines = code.count('\n', start, end)
+                if newlines:
+                    line_number += newlines
+                    line_start = code.rfind('\n', start, end) + 1
+                if progress:
+                    yield None, kind, line_number, end - line_start, 0, start, end
+            else:
                 # Unrecognized token: record an error
-                tokens.append({'type': 'UNKNOWN', 'value': value, 'line': line_number})
-                errors.append(1)
-
-            # Move to the end of the current match and look for the next token
-            pos = mo.end()
-            mo = get_token(code, pos)
-
-        # If we haven't reached the end of the string, treat the remaining text as errors
-        if pos != len(code):
-            remaining = code[pos:]
-            for char in remaining:
-                if char == '\n':
-                    line_number += 1
-                tokens.append({'type': 'UNKNOWN', 'value': char, 'line': line_number})
-                errors.append(1)
-
-        print("\nTokenization complete.\n")
-        return tokens, errors
+                yield 'UNKNOWN', mo.group(group), line_number, start - line_start, 1, start, end
+
+    #region Incremental tokenization
+
+    def tokenize_document(self, code):
+        """
+        Tokenize 'code' like tokenize does, but keep the positions of the tokens
+        so the result can later be updated with apply_edit.
+
+        Parameters
+        -----------
+        code : str
+            The source code to tokenize
+
+        Returns
+        -----------
+        DrawScriptTokenDocument
+            The tokens, errors and positions of the tokens in 'code'
+        """
+        document = DrawScriptTokenDocument(code, [], [], [], [], [], [])
+        self._append_scanned(document, self.scan(code))
+        return document
+
+    def apply_edit(self, document, start, removed_length, inserted_text):
+        """
+        Update a tokenized document after an edit of its source, re-lexing only the span affected by the edit.
+        The tokens before the edit are kept, the text is re-lexed from there until a token
+        matches a token of the previous stream again, and the remaining tokens are reused
+        with their line numbers and offsets shifted.
+        The result is always the same as tokenizing the new source from scratch.
+
+        Parameters
+        -----------
+        document : DrawScriptTokenDocument
+            The document before the edit, it's left untouched
+        start : int
+            The offset in the old source where the edit starts
+        removed_length : int
+            The number of characters removed from 'start'
+        inserted_text : str
+            The text inserted at 'start'
+
+        Returns
+        -----------
+        DrawScriptTokenDocument
+            The document for the edited source
+        """
+        old_source = document.source
+        if start < 0 or removed_length < 0 or start + removed_length > len(old_source):
+            raise ValueError(f"The edit ({start}, {removed_length}) is outside of the source.")
+
+        source = old_source[:start] + inserted_text + old_source[start + removed_length:]
+        delta = len(inserted_text) - removed_length
+        edit_end = start + len(inserted_text)  # End of the edit in the new source
+
+        # Keep every token which, with everything it depends on, is before the edit
+        kept = bisect_right(document.reach, start)
+        if kept > 0:
+            # Restart right after the last kept token, on the line it ends
+            # (tokens never span multiple lines, only comments do)
+            pos = document.ends[kept - 1]
+            line_number = document.tokens[kept - 1]['line']
+        else:
+            pos = 0
+            line_number = 1
+
+        new_document = DrawScriptTokenDocument(
+            source,
+            document.tokens[:kept],
+            document.errors[:kept],
+            document.starts[:kept],
+            document.ends[:kept],
+            document.horizons[:kept],
+            document.reach[:kept],
+        )
+
+        old_starts = document.starts
+        old_index = kept  # First token of the old stream that can still be resynchronized with
+        resync_index = -1
+        resync_token = None
+
+        scanned = self.scan(source, pos, line_number)
+        for token, error, token_start, token_end in scanned:
+            if token_start > edit_end:
+                # Past the edit, the lexer behaves exactly like it did on the old source
+                # as soon as it starts a token where an old token started
+                old_start = token_start - delta
+                old_index = bisect_left(old_starts, old_start, old_index)
+                if old_index < len(old_starts) and old_starts[old_index] == old_start:
+                    resync_index = old_index
+                    resync_token = token
+                    break
+            self._append_scanned(new_document, ((token, error, token_start, token_end),))
+        scanned.close()
+
+        if resync_index != -1:
+            self._append_shifted(new_document, document, resync_index, delta, resync_token)
+
+        return new_document
+
+    def update_document(self, document, code):
+        """
+        Bring a tokenized document up to date with 'code', when the edit itself isn't known.
+        The edit is found with compute_edit, then applied with apply_edit.
+
+        Parameters
+        -----------
+        document : DrawScriptTokenDocument
+            The previous document, or None to tokenize 'code' from scratch
+        code : str
+            The new source code
+
+        Returns
+        -----------
+        DrawScriptTokenDocument
+            The document for 'code'
+        """
+        if document is None:
+            return self.tokenize_document(code)
+        if document.source == code:
+            return document
+        start, removed_length, inserted_text = self.compute_edit(document.source, code)
+        return self.apply_edit(document, start, removed_length, inserted_text)
+
+    @staticmethod
+    def compute_edit(old_source, new_source):
+        """
+        Find the single edit turning 'old_source' into 'new_source',
+        by removing their common prefix and suffix.
+        Useful when the editor only gives the new text.
+
+        Returns
+        -----------
+        tuple
+            (start, removed_length, inserted_text), usable with apply_edit
+        """
+        max_common = min(len(old_source), len(new_source))
+
+        # Binary search of the common prefix, slices comparisons are done in C
+        low, high = 0, max_common
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_source[:middle] == new_source[:middle]:
+                low = middle
+            else:
+                high = middle - 1
+        prefix = low
+
+        # Same for the common suffix, without overlapping the prefix
+        low, high = 0, max_common - prefix
+        while low < high:
+            middle = (low + high + 1) // 2
+            if old_source[len(old_source) - middle:] == new_source[len(new_source) - middle:]:
+                low = middle
+            else:
+                high = middle - 1
+        suffix = low
+
+        return prefix, len(old_source) - prefix - suffix, new_source[prefix:len(new_source) - suffix]
+
+    @staticmethod
+    def _append_scanned(document, scanned):
+        """
+        Append the tokens yielded by scan to a document, computing how far each one depends on the source.
+        """
+        source = document.source
+        reach = document.reach[-1] if document.reach else 0
+
+        for token, error, start, end in scanned:
+            horizon = token_horizon(source, token['type'], token['value'], end)
+            if horizon > reach:
+                reach = horizon
+
+            document.tokens.append(token)
+            document.errors.append(error)
+            document.starts.append(start)
+            document.ends.append(end)
+            document.horizons.append(horizon)
+            document.reach.append(reach)
+
+    @staticmethod
+    def _append_shifted(new_document, document, index, delta, resync_token):
+        """
+        Append the tokens of 'document' from 'index' to 'new_document', moving them by 'delta' characters.
+        'resync_token' is the token at 'index' lexed again in the new source, it gives how much
+        the lines move, and how much the columns move on the line of the edit.
+        """
+        old_token = document.tokens[index]
+        line_delta = resync_token['line'] - old_token['line']
+        column_delta = resync_token['column'] - old_token['column']
+        edit_line = old_token['line']  # Only the tokens on this line have their column changed
+
+        if delta == 0 and line_delta == 0 and column_delta == 0:
+            new_document.tokens.extend(document.tokens[index:])
+        else:
+            new_document.tokens.extend(
+                {
+                    'type': token['type'], 'value': token['value'], 'line': token['line'] + line_delta,
+                    'column': token['column'] + column_delta if token['line'] == edit_line else token['column'],
+                    'start': token['start'] + delta, 'end': token['end'] + delta,
+                }
+                for token in document.tokens[index:]
+            )
+        new_document.errors.extend(document.errors[index:])
+        new_document.starts.extend(start + delta for start in document.starts[index:])
+        new_document.ends.extend(end + delta for end in document.ends[index:])
+
+        # The reach is recomputed, the tokens before 'index' may not reach as far as they used to
+        reach = new_document.reach[-1] if new_document.reach else 0
+        for horizon in document.horizons[index:]:
+            if horizon != UNBOUNDED_HORIZON:
+                horizon += delta
+            if horizon > reach:
+                reach = horizon
+            new_document.horizons.append(horizon)
+            new_document.reach.append(reach)
+
+    #endregion Incremental tokenization
@@ -0,0 +1,157 @@
+# The types SemanticAnalyzer infers for the values of a script
+INT, FLOAT, BOOL, STRING, CURSOR = "int", "float", "bool", "string", "cursor"
+
+# The numeric types, each one converts to the ones after it, like the usual arithmetic conversions of C
+NUMERIC_TYPES = (BOOL, INT, FLOAT)
+
+# The type written in the C code for each type
+C_TYPES = {INT: "int", FLOAT: "float", BOOL: "bool", STRING: "const char*", CURSOR: "Cursor*"}
+
+
+def join(first, second):
+    """
+    Returns the type a value of type 'first' and a value of type 'second' both fit in
+    (the widest numeric type for two numbers), or None if there isn't one (a string and a number...)
+
+    Parameters
+    -----------
+    first : str
+        A type, None if it is not known yet
+    second : str
+        A type, None if it is not known yet
+    """
+    if first == second or second is None:
+        return first
+    if first is None:
+        return second
+    if first in NUMERIC_TYPES and second in NUMERIC_TYPES:
+        return max(first, second, key=NUMERIC_TYPES.index)
+    return None
+
+
+def arithmetic_type(left, right):
+    """
+    Returns the type of the result of an arithmetic operation (an int at least, like in C),
+    or None if it can't be done on these types
+    """
+    result = join(INT, left)
+    if result is not None:
+        result = join(result, right)
+    return result
+
+
+# The type of the result of an arithmetic operation, for each pair of operand types (None for an operand
+# without a type), so the analyzer looks it up instead of calling arithmetic_type for each operation
+ARITHMETIC_TYPES = {
+    (left, right): arithmetic_type(left, right) for left in (None, *C_TYPES) for right in (None, *C_TYPES)
+}
+
+
+class DrawScriptTypeVariable:
+    """
+    The type of a variable, a parameter, the return of a function or an expression that uses them,
+    known once the whole script is analyzed: 'var x = 0; ... x = x + 0.5;' makes x a float.
+
+    SemanticAnalyzer records that a type flows into the variable (an assignment, a call, a return)
+    with 'assign', the type is then the join of all the types that flow into it.
+    A variable that flows into others (x in 'var y = x * 2;') is solved by 'solve', after the analysis.
+
+    Attributes
+    -----------
+    type : str
+        The join of the types that flow into the variable so far, None if there is none yet
+    users : list
+        The type variables this one flows into
+    description : str
+        What the variable is the type of, for the error messages
+    """
+
+    __slots__ = ('type', 'users', 'description')
+
+    def __init__(self, type=None, description=None):
+        self.type = type
+        self.users = []
+        self.description = description
+
+    def assign(self, value_type, errors):
+        """
+        Records that a value of type 'value_type' flows into the variable
+
+        Parameters
+        -----------
+        value_type : str | DrawScriptTypeVariable
+            The type of the value, or the variable it is the type of, None if it has no type (a call to a builtin)
+        errors : list
+            Where to add the error if the types can't be joined
+        """
+        if value_type is None:
+            return
+        if isinstance(value_type, DrawScriptTypeVariable):
+            value_type.users.append(self)
+            return
+        self.widen(value_type, errors)
+
+    def widen(self, value_type, errors):
+        """
+        Joins 'value_type' with the type of the variable, returns True if the type changed
+        """
+        current = self.type
+        joined = join(current, value_type)
+        if joined is None:
+            errors.append(f"Type mismatch: {self.description} can't be both {current} and {value_type}.")
+            return False
+        if joined == current:
+            return False
+        self.type = joined
+        return True
+
+    def __repr__(self) -> str:
+        return f"DrawScriptTypeVariable({self.type!r}, {self.description!r})"
+
+
+class DrawScriptTypeProxy(DrawScriptTypeVariable):
+    """
+    A type variable that stands for another one in the body of a function (see SemanticAnalyzer.free_type),
+    the variable and the proxy flow into each other so they get the same type.
+    A conflict is not reported, only recorded in 'conflict', the script is then analyzed again without proxies
+    so the errors are the usual ones.
+    """
+
+    __slots__ = ('conflict',)
+
+    def __init__(self, description=None):
+        super().__init__(None, description)
+        self.conflict = False
+
+    def widen(self, value_type, errors):
+        current = self.type
+        joined = join(current, value_type)
+        if joined is None:
+            self.conflict = True
+            return False
+        if joined == current:
+            return False
+        self.type = joined
+        return True
+
+
+def solve(variables, errors):
+    """
+    Gives the type of each variable to the ones it flows into, until nothing changes.
+    A variable only gets wider, and there are 3 numeric types, so each one is pushed a few times at most
+
+    Parameters
+    -----------
+    variables : list
+        The DrawScriptTypeVariable created during the analysis
+    errors : list
+        Where to add the type errors
+    """
+    pending = [variable for variable in variables if variable.type is not None and variable.users]
+    while pending:
+        variable = pending.pop()
+        value_type = variable.type
+        for user in variable.users:
+            if user.widen(value_type, errors) and user.users:
+                pending.append(user)
+
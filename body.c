@@ -3,27 +3,35 @@
 #include <math.h>
 #include <stdbool.h>
 #include <stdio.h>
+#include <string.h>
 
 #include "cursor.h"
 #include "utils.h"
 #include "shapes.h"
+#include "output.h"
 #include "globals.h"
 
 int main(int argc, char *argv[]) {
-    FILE *file = fopen("Data/Outputs/drawing_positions.txt", "w");
-    if (file == NULL) {
-        printf("Error opening file!\n");
-        return 1;
-    }
-
     // Start SDL
     SDL_Start();
     SDL_Window *window = CreateWindow(SCREEN_WIDTH, SCREEN_HEIGHT);
     SDL_Renderer *renderer = CreateRenderer(window);
 
+    // "--batch": the drawings are read back from the GPU all at once at the end,
+    // "--stream": they are sent on the standard output instead of saved in a file (see output.h)
+    int mode = OUTPUT_READBACK, streamed = 0;
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--batch") == 0) {
+            mode = OUTPUT_BATCH;
+        } else if (strcmp(argv[i], "--stream") == 0) {
+            streamed = 1;
+        }
+    }
+    if (Output_Begin(renderer, mode, streamed) != 0) {
+        return 1;
+    }
+
 // INSERT VARIABLES
-    char filename[255];
-    int drawing_index = 1;
     SDL_Event event;
 
     SDL_SetRenderDrawColor(renderer, 255, 255, 255, 255); // Transparent
@@ -34,12 +42,12 @@ int main(int argc, char *argv[]) {
 
 // INSERT ANIMATIONS
 
+    int result = Output_End(renderer);
+
     // Clean
     SDL_DestroyRenderer(renderer);
     SDL_DestroyWindow(window);
     SDL_Quit();
 
-    fclose(file);
-
-    return 0;
+    return result;
 }
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Check DrawScript files without running them: tokenizer, parser and semantic analysis only,
+nothing is drawn and gcc is not called. The exit code is 1 when a file has errors, for the CI.
+
+    python check.py [-j JOBS] [-q] [--extension .txt] FILE_OR_DIRECTORY...
+
+The directories are searched recursively for the files with the extension.
+"""
+import argparse
+import os
+import sys
+import time
+
+from DrawScript.Core.drawScriptChecker import PHASES, check_files, total_times
+
+
+def find_scripts(paths, extension):
+    """
+    Returns the files of 'paths', with the files ending with 'extension' in the directories, sorted
+    """
+    scripts = []
+    for path in paths:
+        if not os.path.isdir(path):
+            scripts.append(path)
+            continue
+        for directory, _, files in os.walk(path):
+            scripts.extend(sorted(os.path.join(directory, name) for name in files if name.endswith(extension)))
+    return scripts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check DrawScript files without compiling them.")
+    parser.add_argument("paths", nargs="+", help="the scripts, or directories of scripts")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of processes (default: number of CPUs)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only write the summary")
+    parser.add_argument("--extension", default=".txt", help="extension of the scripts in the directories (default: .txt)")
+    args = parser.parse_args(argv)
+
+    scripts = find_scripts(args.paths, args.extension)
+    start = time.perf_counter()
+    results = check_files(scripts, workers=args.jobs)
+    wall_time = time.perf_counter() - start
+
+    failed = [result for result in results if not result.ok]
+    if not args.quiet:
+        for result in failed:
+            for message in result.messages():
+                print(message)
+
+    # The phases are timed in the workers, their sum can be more than the wall time
+    totals = total_times(results)
+    print(f"{len(results)} file(s) checked, {len(failed)} with errors, in {wall_time:.3f}s")
+    print("  ".join(f"{phase} {totals[phase]:.3f}s" for phase in PHASES))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
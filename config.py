@@ -1 +1,12 @@
 DEBUG = False
+
+# The C program reads all the drawings back from the GPU at once at the end, instead of one by one,
+# both are saved in Data/Outputs/drawings.layers, see DrawLibrary/C/Utils/output.h
+# Only for the runs that write the file: when the drawings are streamed they are read back one by one
+BATCHED_OUTPUT = True
+
+# In the editor, the drawings are sent by the C program through a pipe and put on the canvas as they arrive,
+# instead of saved in Data/Outputs. They are read back one by one, so the first ones arrive right away
+STREAMED_OUTPUT = True
+# How often the canvas is redrawn while the drawings arrive, in seconds
+STREAM_REFRESH = 0.05
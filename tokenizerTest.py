@@ -4,6 +4,7 @@ from DrawScript.Core.drawScriptTokenizer import DrawScriptTokenizer
 from DrawScript.Core.drawScriptParser import DrawScriptParser
 from DrawScript.Core.drawScriptSemanticAnalyzer import SemanticAnalyzer
 from DrawScript.Core.drawScriptDeserializerC import DrawScriptDeserializerC
+from DrawScript.Core.drawScriptLayers import LAYERS_FILE, read_layers
 
 from DrawLibrary.Graphics.canvasImage import CanvasImage
 
@@ -86,6 +87,7 @@ else:
             f"{current_directory}/DrawLibrary/C/Utils/shapes.c",
             f"{current_directory}/DrawLibrary/C/Utils/cursor.c",
             f"{current_directory}/DrawLibrary/C/Utils/utils.c",
+            f"{current_directory}/DrawLibrary/C/Utils/output.c",
             f"{current_directory}/main.c",
             f"{current_directory}/DrawLibrary/C/SDL2_gfx/SDL2_gfxPrimitives.c",
             f"{current_directory}/DrawLibrary/C/SDL2_gfx/SDL2_rotozoom.c",
@@ -116,9 +118,6 @@ else:
         except subprocess.CalledProcessError as e:
             print(f"Failed to launch {current_directory}/DrawLibrary/C/SDL2/main.exe: {e}")
 
-        with open(f'{current_directory}/Data/Outputs/drawing_positions.txt', "r") as file:
-            lines = file.readlines()
-
-        for i in range(len(lines)):
-            line = lines[i]
-            x, y = line.strip().split(',')
+        with read_layers(f'{current_directory}/Data/Outputs/{LAYERS_FILE}') as layers:
+            for layer in layers.layers:
+                x, y = layer.x, layer.y